@@ -4,6 +4,7 @@ Agents Module
 This module provides AI agents for the PersonaMirror research study.
 """
 
-from .persona_agent import PersonaAgent
+from .persona_agent import AnswerDistribution, PersonaAgent, list_personas
+from .survey_journal import SurveyJournal
 
-__all__ = ["PersonaAgent"]
+__all__ = ["AnswerDistribution", "PersonaAgent", "SurveyJournal", "list_personas"]
@@ -0,0 +1,219 @@
+"""
+LLM Backends Module
+
+This module provides the pluggable backend interface PersonaAgent uses to
+obtain its chat completion clients. A backend is a named factory returning
+a (sync, async) pair of OpenAI-compatible clients: "openrouter" talks to the
+live endpoint from settings and "mock" to the offline MockLLM stand-in.
+
+Live clients come from a process-wide registry, so every agent shares one
+tuned HTTP connection pool (keep-alive, pool limits, HTTP/2 when available)
+instead of opening its own. The OpenAI SDK and the mock backend are
+imported on first use, so importing PersonaAgent stays cheap.
+"""
+
+import asyncio
+import importlib.util
+import threading
+import weakref
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from src.settings import app_settings
+from src.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+    from scripts.agent_pretest.mock_llm import AsyncMockOpenAI, MockLLM, MockOpenAI
+
+logger = get_logger(__name__)
+
+DEFAULT_BACKEND = "openrouter"
+
+BackendFactory = Callable[[], tuple[Any, Any]]
+
+_BACKENDS: dict[str, BackendFactory] = {}
+
+
+def register_backend(name: str, factory: BackendFactory) -> None:
+    """
+    Register a backend under a name.
+
+    Args:
+        name: Backend name used in settings and on the command line
+        factory: Zero-argument callable returning (sync_client, async_client),
+            both exposing ``chat.completions.create``
+    """
+    _BACKENDS[name] = factory
+
+
+def available_backends() -> list[str]:
+    """Return the names of all registered backends."""
+    return sorted(_BACKENDS)
+
+
+def create_clients(name: Optional[str] = None) -> tuple[Any, Any]:
+    """
+    Create the (sync, async) chat completion clients for a backend.
+
+    Args:
+        name: Backend name (defaults to settings)
+
+    Returns:
+        Tuple of sync and async OpenAI-compatible clients
+    """
+    name = name or app_settings.backend.name
+    if name not in _BACKENDS:
+        raise ValueError(
+            f"Unknown LLM backend '{name}', expected one of {available_backends()}")
+    return _BACKENDS[name]()
+
+
+def _http_transport_options() -> dict:
+    """Connection pool, timeout and protocol options for shared HTTP clients."""
+    import httpx
+
+    settings = app_settings.http
+
+    http2 = settings.http2 and importlib.util.find_spec("h2") is not None
+    if settings.http2 and not http2:
+        logger.debug("h2 package not installed, using HTTP/1.1 keep-alive")
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        ),
+        "timeout": httpx.Timeout(
+            app_settings.scheduler.request_timeout,
+            connect=settings.connect_timeout,
+        ),
+        "http2": http2,
+    }
+
+
+@lru_cache()
+def get_openai_client(base_url: str, api_key: str) -> "OpenAI":
+    """
+    Get the process-wide sync client for an endpoint.
+
+    Args:
+        base_url: OpenAI-compatible API base URL
+        api_key: API key for the endpoint
+
+    Returns:
+        Shared OpenAI client backed by a pooled HTTP transport
+    """
+    from openai import DefaultHttpxClient, OpenAI
+
+    logger.debug("Creating shared HTTP client for %s", base_url)
+    # Retries are handled by the request scheduler, so the client's own
+    # retries are disabled.
+    return OpenAI(
+        base_url=base_url,
+        api_key=api_key,
+        max_retries=0,
+        http_client=DefaultHttpxClient(**_http_transport_options()),
+    )
+
+
+class _LoopLocalAsyncClient:
+    """
+    AsyncOpenAI stand-in that resolves to one shared client per event loop.
+
+    Async connection pools are bound to the event loop that opened them, so
+    a single client cannot be reused across ``asyncio.run`` calls. Attribute
+    access is delegated to the client registered for the running loop,
+    creating it on first use.
+    """
+
+    def __init__(self, base_url: str, api_key: str):
+        self._base_url = base_url
+        self._api_key = api_key
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def _current(self) -> "AsyncOpenAI":
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None:
+                logger.debug(
+                    "Creating shared async HTTP client for %s", self._base_url)
+                client = AsyncOpenAI(
+                    base_url=self._base_url,
+                    api_key=self._api_key,
+                    max_retries=0,
+                    http_client=DefaultAsyncHttpxClient(
+                        **_http_transport_options()),
+                )
+                self._clients[loop] = client
+        return client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._current(), name)
+
+
+@lru_cache()
+def get_async_openai_client(base_url: str, api_key: str) -> _LoopLocalAsyncClient:
+    """
+    Get the process-wide async client for an endpoint.
+
+    Args:
+        base_url: OpenAI-compatible API base URL
+        api_key: API key for the endpoint
+
+    Returns:
+        Shared async client, pooled per running event loop
+    """
+    return _LoopLocalAsyncClient(base_url, api_key)
+
+
+def _openrouter_clients() -> tuple["OpenAI", _LoopLocalAsyncClient]:
+    """Shared clients for the live OpenRouter endpoint (OpenAI-compatible API)."""
+    base_url = app_settings.openrouter.base_url
+    api_key = app_settings.openrouter.api_key
+    return (
+        get_openai_client(base_url, api_key),
+        get_async_openai_client(base_url, api_key),
+    )
+
+
+@lru_cache()
+def get_mock_llm() -> "MockLLM":
+    """Get the process-wide MockLLM configured in settings."""
+    from scripts.agent_pretest.mock_llm import MockLLM
+
+    settings = app_settings.backend
+    logger.info(
+        "Using mock LLM backend (latency %sms, 429 rate %s, timeout rate %s)",
+        settings.mock_latency_ms, settings.mock_rate_limit_rate,
+        settings.mock_timeout_rate,
+    )
+    return MockLLM(
+        latency_ms=settings.mock_latency_ms,
+        latency_sigma=settings.mock_latency_sigma,
+        token_latency_ms=settings.mock_token_latency_ms,
+        preamble=settings.mock_preamble,
+        rate_limit_rate=settings.mock_rate_limit_rate,
+        timeout_rate=settings.mock_timeout_rate,
+        seed=settings.mock_seed,
+    )
+
+
+def _mock_clients() -> tuple["MockOpenAI", "AsyncMockOpenAI"]:
+    """Clients for the shared in-process MockLLM."""
+    from scripts.agent_pretest.mock_llm import AsyncMockOpenAI, MockOpenAI
+
+    llm = get_mock_llm()
+    return MockOpenAI(llm), AsyncMockOpenAI(llm)
+
+
+register_backend(DEFAULT_BACKEND, _openrouter_clients)
+register_backend("mock", _mock_clients)
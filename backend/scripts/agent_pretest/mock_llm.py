@@ -0,0 +1,383 @@
+"""
+Mock LLM Module
+
+This module provides an in-process stand-in for the OpenAI-compatible chat
+completions API. Answers are deterministic and conditioned on the persona
+system prompt, latency follows a configurable log-normal distribution
+(time to first token, plus a per-chunk delay when streaming), and 429s and
+timeouts can be injected at fixed rates. It lets the agent, cache,
+scheduler and pipeline run offline with repeatable numbers.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional
+
+import httpx
+from openai import APITimeoutError, RateLimitError
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+QUESTIONS_PATH = (
+    Path(__file__).resolve().parent.parent.parent / "data" / "bfi2" / "questions.json"
+)
+
+# Persona keywords that push the matching BFI-2 domain up
+TRAIT_KEYWORDS = {
+    "E": ("extraverted", "extroverted"),
+    "A": ("agreeable",),
+    "C": ("conscientious",),
+    "N": ("neurotic",),
+    "O": ("open-minded", "open minded"),
+}
+
+SINGLE_QUESTION_PATTERN = re.compile(r'Question: "I am someone who (.+?)"')
+BATCH_QUESTION_PATTERN = re.compile(r"^(\d+)\. I am someone who", re.MULTILINE)
+
+# Characters per streamed chunk, roughly one token
+STREAM_CHUNK_CHARS = 4
+
+
+class MockStream:
+    """Blocking chunk iterator mimicking ``openai.Stream``."""
+
+    def __init__(self, chunks: list[ChatCompletionChunk], chunk_delay: float):
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+        self.closed = False
+
+    def __iter__(self):
+        for index, chunk in enumerate(self.chunks):
+            if self.closed:
+                return
+            if index:
+                time.sleep(self.chunk_delay)
+            yield chunk
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class AsyncMockStream:
+    """Async chunk iterator mimicking ``openai.AsyncStream``."""
+
+    def __init__(self, chunks: list[ChatCompletionChunk], chunk_delay: float):
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+        self.closed = False
+
+    async def __aiter__(self):
+        for index, chunk in enumerate(self.chunks):
+            if self.closed:
+                return
+            if index:
+                await asyncio.sleep(self.chunk_delay)
+            yield chunk
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class MockLLM:
+    """
+    Deterministic, persona-conditioned survey answerer.
+
+    Each item gets a latent score of 3 shifted by ``trait_shift`` toward the
+    persona's highlighted trait (away from it for reverse-keyed items). The
+    response distribution is a discretized normal around that latent score
+    whose spread grows with temperature. The sampled answer is a pure
+    function of the request content, including its ``seed`` parameter, and
+    the mock's own ``seed``: requests that differ only in their seed (such
+    as replicates) get independent draws, and the same request always gets
+    the same answer whatever order requests arrive in.
+    """
+
+    MOCK_REQUEST = httpx.Request("POST", "http://mock-llm.local/v1/chat/completions")
+
+    def __init__(
+        self,
+        latency_ms: float = 300.0,
+        latency_sigma: float = 0.5,
+        token_latency_ms: float = 20.0,
+        preamble: str = "",
+        rate_limit_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        retry_after: float = 1.0,
+        trait_shift: float = 1.5,
+        seed: int = 0,
+    ):
+        """
+        Initialize the MockLLM.
+
+        Args:
+            latency_ms: Median request latency in milliseconds
+            latency_sigma: Log-normal shape parameter (0 for fixed latency)
+            token_latency_ms: Delay between streamed chunks in milliseconds
+            preamble: Text a verbose model puts before single answers
+            rate_limit_rate: Fraction of requests failing with a 429
+            timeout_rate: Fraction of requests failing with a timeout
+            retry_after: Retry-After seconds sent with injected 429s
+            trait_shift: How far the persona trait moves the latent score
+            seed: Seed for answers, latencies and injected failures
+        """
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.token_latency_ms = token_latency_ms
+        self.preamble = preamble
+        self.rate_limit_rate = rate_limit_rate
+        self.timeout_rate = timeout_rate
+        self.retry_after = retry_after
+        self.trait_shift = trait_shift
+        self.seed = seed
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        items = json.loads(QUESTIONS_PATH.read_text())["items"]
+        self.questions = {item["id"]: item for item in items}
+        self._ids_by_text = {item["text"].lower(): item["id"] for item in items}
+
+        self.total_requests = 0
+
+    def _trait_shifts(self, system_prompt: str) -> dict[str, float]:
+        """Latent score shift per domain implied by the persona prompt."""
+        prompt = system_prompt.lower()
+        return {
+            domain: self.trait_shift
+            if any(f"highly {keyword}" in prompt for keyword in keywords)
+            else 0.0
+            for domain, keywords in TRAIT_KEYWORDS.items()
+        }
+
+    def _uniform(self, *parts) -> float:
+        """Deterministic uniform [0, 1) draw from the given parts."""
+        digest = hashlib.sha256(
+            "|".join(str(part) for part in (self.seed, *parts)).encode()
+        ).digest()
+        return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+    def distribution(
+        self, system_prompt: str, question_id: int, temperature: float
+    ) -> list[float]:
+        """Response probabilities P(1..5) for one item."""
+        question = self.questions[question_id]
+        shift = self._trait_shifts(system_prompt)[question["domain"]]
+        latent = 3.0 + (-shift if question["reverse"] else shift)
+
+        spread = 0.5 + temperature
+        weights = [
+            math.exp(-((value - latent) ** 2) / (2 * spread ** 2))
+            for value in range(1, 6)
+        ]
+        total = sum(weights)
+        return [w / total for w in weights]
+
+    def answer(
+        self,
+        model: str,
+        system_prompt: str,
+        question_id: int,
+        temperature: float,
+        sample_seed: Optional[int] = None,
+    ) -> int:
+        """Deterministically sample a 1-5 answer for one item."""
+        probabilities = self.distribution(system_prompt, question_id, temperature)
+        parts = [model, hashlib.sha256(system_prompt.encode()).hexdigest(),
+                 question_id, temperature]
+        if sample_seed is not None:
+            parts.append(sample_seed)
+        u = self._uniform(*parts)
+
+        cumulative = 0.0
+        for value, p in enumerate(probabilities, start=1):
+            cumulative += p
+            if u < cumulative:
+                return value
+        return 5
+
+    def _draw_latency(self) -> float:
+        """Draw one request latency in seconds."""
+        with self._lock:
+            z = self._rng.gauss(0.0, 1.0)
+        return self.latency_ms / 1000.0 * math.exp(self.latency_sigma * z)
+
+    def _draw_failure(self) -> Optional[Exception]:
+        """Pick an injected failure for this request, if any."""
+        with self._lock:
+            self.total_requests += 1
+            u = self._rng.random()
+
+        if u < self.rate_limit_rate:
+            response = httpx.Response(
+                429,
+                request=self.MOCK_REQUEST,
+                headers={"retry-after": str(self.retry_after)},
+            )
+            return RateLimitError(
+                "Rate limit exceeded (injected)", response=response, body=None)
+        if u < self.rate_limit_rate + self.timeout_rate:
+            return APITimeoutError(request=self.MOCK_REQUEST)
+        return None
+
+    def _question_ids(self, user_prompt: str) -> list[int]:
+        """Find the survey items a prompt asks about."""
+        batch_ids = [int(i) for i in BATCH_QUESTION_PATTERN.findall(user_prompt)]
+        if batch_ids:
+            return batch_ids
+
+        match = SINGLE_QUESTION_PATTERN.search(user_prompt)
+        if match and match.group(1).lower() in self._ids_by_text:
+            return [self._ids_by_text[match.group(1).lower()]]
+        return []
+
+    def complete(self, **request) -> ChatCompletion:
+        """Build the completion for a chat request (without latency/failures)."""
+        messages = request["messages"]
+        system_prompt = next(
+            (m["content"] for m in messages if m["role"] == "system"), "")
+        user_prompt = messages[-1]["content"]
+        model = request.get("model", "mock")
+        temperature = request.get("temperature", 1.0)
+        max_tokens = request.get("max_tokens") or 16
+        sample_seed = request.get("seed")
+
+        question_ids = self._question_ids(user_prompt)
+        answers = {
+            question_id: self.answer(
+                model, system_prompt, question_id, temperature, sample_seed)
+            for question_id in question_ids
+        }
+
+        logprobs = None
+        if len(question_ids) > 1 or request.get("response_format"):
+            content = json.dumps(
+                {"answers": {str(k): v for k, v in answers.items()}})
+        elif answers:
+            content = str(next(iter(answers.values())))
+            if request.get("logprobs"):
+                probabilities = self.distribution(
+                    system_prompt, question_ids[0], temperature)
+                top_logprobs = [
+                    {"token": str(value), "logprob": math.log(max(p, 1e-12)),
+                     "bytes": None}
+                    for value, p in enumerate(probabilities, start=1)
+                ]
+                top_logprobs.sort(key=lambda alt: alt["logprob"], reverse=True)
+                logprobs = {"content": [{
+                    "token": content,
+                    "logprob": next(alt["logprob"] for alt in top_logprobs
+                                    if alt["token"] == content),
+                    "bytes": None,
+                    "top_logprobs": top_logprobs,
+                }]}
+            else:
+                content = self.preamble + content
+        else:
+            content = "I'm not sure how to answer that."
+
+        # Generation stops at max_tokens, as with a real model
+        content = content[:max_tokens * STREAM_CHUNK_CHARS]
+        prompt_tokens = sum(len(m["content"]) for m in messages) // 4
+        completion_tokens = max(1, math.ceil(len(content) / STREAM_CHUNK_CHARS))
+
+        return ChatCompletion.model_validate({
+            "id": f"mock-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content},
+                "logprobs": logprobs,
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    def _stream_chunks(self, completion: ChatCompletion) -> list[ChatCompletionChunk]:
+        """Split a completion into token-sized streaming chunks."""
+        content = completion.choices[0].message.content
+        pieces = [
+            content[i:i + STREAM_CHUNK_CHARS]
+            for i in range(0, len(content), STREAM_CHUNK_CHARS)
+        ]
+        return [
+            ChatCompletionChunk.model_validate({
+                "id": completion.id,
+                "object": "chat.completion.chunk",
+                "created": completion.created,
+                "model": completion.model,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": piece},
+                    "finish_reason": "stop" if i == len(pieces) - 1 else None,
+                }],
+            })
+            for i, piece in enumerate(pieces)
+        ]
+
+    def _generation_time(self, completion: ChatCompletion) -> float:
+        """Seconds to generate every token after the first."""
+        return (completion.usage.completion_tokens - 1) * self.token_latency_ms / 1000.0
+
+    def create(self, **request):
+        """Blocking chat completion with simulated latency and failures."""
+        time.sleep(self._draw_latency())
+        failure = self._draw_failure()
+        if failure is not None:
+            raise failure
+
+        completion = self.complete(**request)
+        if request.get("stream"):
+            return MockStream(
+                self._stream_chunks(completion), self.token_latency_ms / 1000.0)
+
+        time.sleep(self._generation_time(completion))
+        return completion
+
+    async def acreate(self, **request):
+        """Async chat completion with simulated latency and failures."""
+        await asyncio.sleep(self._draw_latency())
+        failure = self._draw_failure()
+        if failure is not None:
+            raise failure
+
+        completion = self.complete(**request)
+        if request.get("stream"):
+            return AsyncMockStream(
+                self._stream_chunks(completion), self.token_latency_ms / 1000.0)
+
+        await asyncio.sleep(self._generation_time(completion))
+        return completion
+
+
+class MockOpenAI:
+    """Drop-in for ``OpenAI`` exposing ``chat.completions.create``."""
+
+    def __init__(self, llm: MockLLM):
+        self.llm = llm
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=llm.create))
+
+
+class AsyncMockOpenAI:
+    """Drop-in for ``AsyncOpenAI`` exposing ``chat.completions.create``."""
+
+    def __init__(self, llm: MockLLM):
+        self.llm = llm
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=llm.acreate))
@@ -6,17 +6,69 @@ based on a defined persona profile. The agent uses an LLM to respond to survey
 questions in a manner consistent with its assigned personality traits.
 """
 
+import asyncio
+import hashlib
 import json
+import math
+import re
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
-
-from openai import OpenAI
+from typing import Callable, Optional
 
+from scripts.agent_pretest.llm_backends import DEFAULT_BACKEND, create_clients
+from scripts.agent_pretest.request_metrics import MetricsRegistry, get_metrics
+from scripts.agent_pretest.request_scheduler import (
+    RequestScheduler,
+    get_request_scheduler,
+)
+from scripts.agent_pretest.response_cache import ResponseCache, get_response_cache
+from scripts.agent_pretest.survey_journal import SurveyJournal
+from scripts.analysis.incremental_scorer import IncrementalScorer, UpdateCallback
 from src.settings import app_settings
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+DATA_PATH = Path(__file__).resolve().parent.parent.parent / "data"
+
+# A standalone 1-5 digit, so "1-5" or "10" in a preamble is not taken as the answer
+ANSWER_DIGIT_PATTERN = re.compile(r"(?<![\d\-–/])([1-5])(?![\d\-–/])")
+
+
+def list_personas() -> list[str]:
+    """Return the names of all persona profiles in the prompts folder."""
+    return sorted(path.stem for path in (DATA_PATH / "prompts").glob("*.md"))
+
+
+@dataclass(frozen=True)
+class AnswerDistribution:
+    """Probability distribution over the 1-5 responses for one survey item."""
+    probabilities: tuple[float, ...]  # P(1), ..., P(5), summing to 1
+
+    @property
+    def expected(self) -> float:
+        """Expected response value (1.0-5.0)."""
+        return sum(p * value for value, p in enumerate(self.probabilities, start=1))
+
+    @property
+    def entropy(self) -> float:
+        """Shannon entropy of the distribution in bits (0 to log2(5))."""
+        return -sum(p * math.log2(p) for p in self.probabilities if p > 0)
+
+    @property
+    def mode(self) -> int:
+        """Most likely response (1-5)."""
+        return max(range(len(self.probabilities)), key=self.probabilities.__getitem__) + 1
+
+    def to_dict(self) -> dict:
+        """Convert distribution to dictionary for JSON serialization."""
+        return {
+            "probabilities": list(self.probabilities),
+            "expected": round(self.expected, 4),
+            "entropy": round(self.entropy, 4),
+        }
+
 
 class PersonaAgent:
     """
@@ -30,12 +82,32 @@ class PersonaAgent:
     # Constants
     RESPONSE_MIN = 1
     RESPONSE_MAX = 5
+    VALID_ANSWERS = frozenset(
+        str(value) for value in range(RESPONSE_MIN, RESPONSE_MAX + 1))
     RESPONSE_NEUTRAL = 3
+    DEFAULT_CONCURRENCY = 8
+    DEFAULT_BATCH_SIZE = 60
+    MAX_BATCH_ROUNDS = 3
+    BATCH_TOKENS_PER_ITEM = 12
+    TEMPERATURE = 0.3  # Lower temperature for more consistent responses
+    CHARS_PER_TOKEN = 4  # Rough estimate used for token rate limiting
+    TOP_LOGPROBS = 20  # Maximum alternatives the API returns per token
+    STREAM_MAX_TOKENS = 64  # Room for preamble; streams close at the first answer
 
     def __init__(
         self,
         persona_name: str,
         model: Optional[str] = None,
+        temperature: float = TEMPERATURE,
+        replicate: int = 0,
+        cache: Optional[ResponseCache] = None,
+        use_cache: bool = True,
+        refresh_cache: bool = False,
+        scheduler: Optional[RequestScheduler] = None,
+        backend: Optional[str] = None,
+        stream: bool = False,
+        metrics: Optional[MetricsRegistry] = None,
+        run_id: Optional[str] = None,
     ):
         """
         Initialize the PersonaAgent.
@@ -43,28 +115,69 @@ class PersonaAgent:
         Args:
             persona_name: Name of the persona profile (e.g., "high_agreeableness")
             model: Model to use for responses (defaults to settings)
+            temperature: Sampling temperature for survey answers
+            replicate: Replicate index; distinct replicates get distinct
+                cache entries so repeated runs sample independently
+            cache: Response cache to use (defaults to the shared cache
+                from settings when caching is enabled)
+            use_cache: Set to False to bypass the cache entirely
+            refresh_cache: Skip cache lookups but store fresh responses,
+                overwriting existing entries
+            scheduler: Request scheduler for rate limiting and retries
+                (defaults to the shared process-wide scheduler)
+            backend: LLM backend name, e.g. "openrouter" or "mock"
+                (defaults to settings)
+            stream: Stream single-question completions and stop reading
+                as soon as the first valid 1-5 answer appears
+            metrics: Registry that every completion request is reported to
+                (defaults to the shared process-wide registry)
+            run_id: Run the agent's requests are reported under, so one
+                run's metrics can be told apart in a shared registry
         """
         self.persona_name = persona_name
         self.model = model or app_settings.openrouter.model_name
+        self.temperature = temperature
+        self.replicate = replicate
+        self.stream = stream
+        self.refresh_cache = refresh_cache
 
-        # Initialize OpenRouter client (OpenAI-compatible API)
-        self.client = OpenAI(
-            base_url=app_settings.openrouter.base_url,
-            api_key=app_settings.openrouter.api_key,
-        )
+        if not use_cache:
+            self.cache = None
+        elif cache is not None:
+            self.cache = cache
+        elif app_settings.cache.enabled:
+            self.cache = get_response_cache()
+        else:
+            self.cache = None
+
+        self.scheduler = scheduler or get_request_scheduler()
+        self.metrics = metrics or get_metrics()
+        self.run_id = run_id
+
+        # Initialize chat completion clients (OpenAI-compatible API)
+        self.backend = backend or app_settings.backend.name
+        self.client, self.async_client = create_clients(self.backend)
 
         # Set up paths
-        self.backend_path = Path(__file__).resolve().parent.parent.parent
-        self.data_path = self.backend_path / "data"
+        self.backend_path = DATA_PATH.parent
+        self.data_path = DATA_PATH
 
         # Load persona and survey data
         self.system_prompt = self._load_persona_prompt()
         self.questions = self._load_questions()
         self.responses: dict[int, int] = {}
+        self.distributions: dict[int, AnswerDistribution] = {}
+        # Per question: latency_ms, prompt/completion tokens and cache status
+        # of the request that answered it
+        self.item_stats: dict[int, dict] = {}
+        # Running scores of the survey in progress, fed answer by answer
+        self.live_scores = IncrementalScorer()
+        self.stopped_early = False
 
         logger.info(
-            f"Initialized PersonaAgent",
-            extra={"persona": persona_name, "model": self.model},
+            "Initialized PersonaAgent",
+            extra={"persona": persona_name, "model": self.model,
+                   "backend": self.backend},
         )
 
     def _load_persona_prompt(self) -> str:
@@ -72,7 +185,7 @@ class PersonaAgent:
         prompt_path = self.data_path / "prompts" / f"{self.persona_name}.md"
 
         if not prompt_path.exists():
-            logger.error(f"Persona prompt not found: {prompt_path}")
+            logger.error("Persona prompt not found: %s", prompt_path)
             raise FileNotFoundError(f"Persona prompt not found: {prompt_path}")
 
         content = prompt_path.read_text()
@@ -101,7 +214,7 @@ class PersonaAgent:
         questions_path = self.data_path / "bfi2" / "questions.json"
 
         data = json.loads(questions_path.read_text())
-        logger.debug(f"Loaded {len(data['items'])} survey questions")
+        logger.debug("Loaded %d survey questions", len(data["items"]))
 
         return data["items"]
 
@@ -122,60 +235,732 @@ Based on your personality, which response (1-5) best describes you?
 
 IMPORTANT: Respond with ONLY a single number (1, 2, 3, 4, or 5). No explanation needed."""
 
-    def answer_question(self, question: dict) -> int:
+    def _create_batch_prompt(self, questions: list[dict]) -> str:
+        """Create a prompt for the agent to answer several survey questions at once."""
+        statements = "\n".join(
+            f"{question['id']}. I am someone who {question['text'].lower()}"
+            for question in questions
+        )
+
+        return f"""You are taking a personality survey. Answer each of the following statements based on your personality and how you genuinely see yourself.
+
+Statements:
+{statements}
+
+Response options:
+1 - Disagree strongly
+2 - Disagree a little
+3 - Neutral; no opinion
+4 - Agree a little
+5 - Agree strongly
+
+IMPORTANT: Respond with ONLY a JSON object with an "answers" key that maps every statement number to a single number (1, 2, 3, 4, or 5), for example {{"answers": {{"{questions[0]['id']}": 4}}}}. No explanation needed."""
+
+    def _build_messages(self, user_prompt: str) -> list[dict]:
+        """Build the chat messages for a single survey prompt."""
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    def _parse_answer(self, answer_text: str, question: dict) -> int:
         """
-        Have the agent answer a single survey question.
+        Parse a completion into a 1-5 response, defaulting to neutral.
 
         Args:
-            question: Question dict with 'id', 'text', 'domain', 'facet', 'reverse'
+            answer_text: Raw completion text
+            question: Question dict the completion answers
 
         Returns:
             Integer response (1-5)
         """
-        user_prompt = self._create_survey_prompt(question)
+        answer_text = answer_text.strip()
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            max_tokens=10,
-            temperature=0.3,  # Lower temperature for more consistent responses
-        )
-
-        answer_text = response.choices[0].message.content.strip()
-
-        # Parse the response to get the number
         try:
             # Get first character in case of extra text
             answer = int(answer_text[0])
             if not (self.RESPONSE_MIN <= answer <= self.RESPONSE_MAX):
                 logger.warning(
-                    f"Invalid response {answer} for Q{question['id']}, defaulting to neutral"
+                    "Invalid response %d for Q%s, defaulting to neutral",
+                    answer, question["id"],
                 )
                 answer = self.RESPONSE_NEUTRAL
+                self._mark_parse_failure(question["id"])
         except (ValueError, IndexError):
             logger.warning(
-                f"Failed to parse response '{answer_text}' for Q{question['id']}, defaulting to neutral"
+                "Failed to parse response '%s' for Q%s, defaulting to neutral",
+                answer_text, question["id"],
             )
             answer = self.RESPONSE_NEUTRAL
+            self._mark_parse_failure(question["id"])
+
+        return answer
+
+    def _is_valid_answer(self, answer_text: str) -> bool:
+        """Whether a completion parses as a 1-5 response, without logging."""
+        return answer_text.strip()[:1] in self.VALID_ANSWERS
+
+    def _mark_parse_failure(self, question_id: int) -> None:
+        """Flag the stats of a question whose completion did not parse."""
+        stats = self.item_stats.get(question_id)
+        if stats is not None:
+            stats["parse_failed"] = True
+
+    def _parse_batch_answers(
+        self, answer_text: str, questions: list[dict], warn: bool = True
+    ) -> dict[int, int]:
+        """
+        Parse a batched JSON completion into validated responses.
+
+        Items that are missing, out of range or not integers are left out of
+        the result so the caller can re-ask them.
+
+        Args:
+            answer_text: Raw completion text
+            questions: Questions that were asked in the batch
+            warn: Log completions that hold no decodable JSON object
+
+        Returns:
+            Dictionary mapping question IDs to valid responses (1-5)
+        """
+        # Tolerate code fences or preamble around the JSON object
+        start_idx = answer_text.find("{")
+        end_idx = answer_text.rfind("}")
+        if start_idx == -1 or end_idx < start_idx:
+            if warn:
+                logger.warning(
+                    "No JSON object in batched response for %d questions",
+                    len(questions))
+            return {}
+
+        try:
+            data = json.loads(answer_text[start_idx:end_idx + 1])
+        except json.JSONDecodeError:
+            if warn:
+                logger.warning(
+                    "Failed to decode batched response for %d questions",
+                    len(questions))
+            return {}
+
+        if isinstance(data, dict) and isinstance(data.get("answers"), dict):
+            data = data["answers"]
+        if not isinstance(data, dict):
+            return {}
+
+        answers = {}
+        for question in questions:
+            value = data.get(str(question["id"]))
+            if isinstance(value, str) and value.strip().isdigit():
+                value = int(value.strip())
+            if (
+                isinstance(value, int)
+                and not isinstance(value, bool)
+                and self.RESPONSE_MIN <= value <= self.RESPONSE_MAX
+            ):
+                answers[question["id"]] = value
+
+        return answers
+
+    def _cache_key(
+        self, user_prompt: str, max_tokens: int, attempt: int, params: dict
+    ) -> Optional[str]:
+        """Return the cache key for a request, or None when caching is off."""
+        if self.cache is None:
+            return None
+
+        if attempt:
+            params = {**params, "attempt": attempt}
+        if self.backend != DEFAULT_BACKEND:
+            params = {**params, "backend": self.backend}
+
+        return ResponseCache.make_key(
+            model=self.model,
+            system_prompt=self.system_prompt,
+            user_prompt=user_prompt,
+            temperature=self.temperature,
+            max_tokens=max_tokens,
+            replicate=self.replicate,
+            **params,
+        )
+
+    def _request_seed(self, attempt: int = 0) -> int:
+        """
+        Sampling seed for a request, derived from its replicate and attempt.
+
+        Replicates and re-asks draw distinct samples, and a given request
+        draws the same one however concurrent requests are ordered (on
+        backends that honor ``seed``, including the mock).
+        """
+        digest = hashlib.sha256(f"{self.replicate}:{attempt}".encode()).digest()
+        return int.from_bytes(digest[:4], "big") >> 1
+
+    def _estimate_tokens(self, user_prompt: str, max_tokens: int) -> int:
+        """Estimate prompt + completion tokens for rate limiting."""
+        prompt_chars = len(self.system_prompt) + len(user_prompt)
+        return prompt_chars // self.CHARS_PER_TOKEN + max_tokens
+
+    @staticmethod
+    def _fill_stats(
+        stats: Optional[dict], started: float, response=None, cached: bool = False
+    ) -> None:
+        """Record a completion call's latency, token usage and cache status."""
+        if stats is None:
+            return
+
+        usage = getattr(response, "usage", None)
+        stats.update(
+            latency_ms=round((time.perf_counter() - started) * 1000, 2),
+            prompt_tokens=0 if cached else getattr(usage, "prompt_tokens", None),
+            completion_tokens=0 if cached else getattr(usage, "completion_tokens", None),
+            cached=cached,
+        )
+
+    def _record_request(
+        self,
+        question_id,
+        stats: dict,
+        parse_failures: Optional[int] = None,
+    ) -> None:
+        """
+        Report a completion request to the metrics registry.
+
+        Args:
+            question_id: Question ID, or the list of IDs of a batched request
+            stats: The request's stats (see _fill_stats)
+            parse_failures: Items that failed to parse (defaults to the
+                ``parse_failed`` flag of a single-question request)
+        """
+        if parse_failures is None:
+            parse_failures = int(stats.get("parse_failed", False))
+        self.metrics.record_request(
+            self.persona_name, self.model, question_id, stats, parse_failures,
+            run_id=self.run_id)
+
+    def _record_failure(self, question_id, stats: dict, exc: BaseException) -> None:
+        """Report a completion request that failed after all retries."""
+        stats["error"] = type(exc).__name__
+        self._record_request(question_id, stats, parse_failures=0)
+
+    @staticmethod
+    def _message_text(response) -> str:
+        """Extract the completion text from a chat completion response."""
+        return response.choices[0].message.content or ""
+
+    @staticmethod
+    def _first_token_logprobs(response) -> str:
+        """
+        Extract the first generated token's top alternatives as JSON.
+
+        The payload is a JSON object with the completion ``content`` and a
+        ``top_logprobs`` list of ``[token, logprob]`` pairs, so it can be
+        cached like any other completion text.
+        """
+        choice = response.choices[0]
+        top_logprobs = []
+        if choice.logprobs is not None and choice.logprobs.content:
+            top_logprobs = [
+                [alt.token, alt.logprob]
+                for alt in choice.logprobs.content[0].top_logprobs
+            ]
+        return json.dumps({
+            "content": choice.message.content or "",
+            "top_logprobs": top_logprobs,
+        })
+
+    def _complete(
+        self,
+        user_prompt: str,
+        max_tokens: int,
+        attempt: int = 0,
+        extract: Optional[Callable] = None,
+        stats: Optional[dict] = None,
+        cacheable: Optional[Callable[[str], bool]] = None,
+        **params,
+    ) -> str:
+        """
+        Get the completion text for a survey prompt, using the cache if enabled.
 
+        Args:
+            user_prompt: Survey prompt
+            max_tokens: Completion token limit
+            attempt: Retry index, so re-asks are not served the cached failure
+            extract: Function turning the API response into the cached
+                string (defaults to the message text)
+            stats: Dict to fill with the call's latency, token usage and
+                cache status
+            cacheable: Check that the completion parsed, so only usable
+                answers are cached (defaults to a single 1-5 answer)
+            **params: Extra parameters passed to the completions API
+
+        Returns:
+            Completion text (or the string produced by ``extract``)
+        """
+        started = time.perf_counter()
+        key = self._cache_key(user_prompt, max_tokens, attempt, params)
+        if key is not None and not self.refresh_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._fill_stats(stats, started, cached=True)
+                return cached
+
+        response = self.scheduler.call(
+            lambda: self.client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(user_prompt),
+                max_tokens=max_tokens,
+                temperature=self.temperature,
+                seed=self._request_seed(attempt),
+                **params,
+            ),
+            estimated_tokens=self._estimate_tokens(user_prompt, max_tokens),
+            stats=stats,
+        )
+        answer_text = (extract or self._message_text)(response)
+        self._fill_stats(stats, started, response)
+
+        if key is not None and (cacheable or self._is_valid_answer)(answer_text):
+            self.cache.set(key, answer_text, self.model)
+        return answer_text
+
+    async def _complete_async(
+        self,
+        user_prompt: str,
+        max_tokens: int,
+        attempt: int = 0,
+        extract: Optional[Callable] = None,
+        stats: Optional[dict] = None,
+        cacheable: Optional[Callable[[str], bool]] = None,
+        **params,
+    ) -> str:
+        """Async variant of _complete using the AsyncOpenAI client."""
+        started = time.perf_counter()
+        key = self._cache_key(user_prompt, max_tokens, attempt, params)
+        if key is not None and not self.refresh_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._fill_stats(stats, started, cached=True)
+                return cached
+
+        response = await self.scheduler.acall(
+            lambda: self.async_client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(user_prompt),
+                max_tokens=max_tokens,
+                temperature=self.temperature,
+                seed=self._request_seed(attempt),
+                **params,
+            ),
+            estimated_tokens=self._estimate_tokens(user_prompt, max_tokens),
+            stats=stats,
+        )
+        answer_text = (extract or self._message_text)(response)
+        self._fill_stats(stats, started, response)
+
+        if key is not None and (cacheable or self._is_valid_answer)(answer_text):
+            self.cache.set(key, answer_text, self.model)
+        return answer_text
+
+    @staticmethod
+    def _find_streamed_answer(text: str, done: bool) -> Optional[str]:
+        """
+        Find the first standalone 1-5 digit in partially streamed text.
+
+        A digit at the very end of the text is only accepted once the stream
+        is done, since the next chunk could turn it into "10" or "1-5".
+        """
+        match = ANSWER_DIGIT_PATTERN.search(text)
+        if match is None or (match.end() == len(text) and not done):
+            return None
+        return match.group(1)
+
+    def _read_stream(
+        self, stream, started: Optional[float] = None, stats: Optional[dict] = None
+    ) -> str:
+        """
+        Read a completion stream until the answer appears, then close it.
+
+        Args:
+            stream: Completion stream
+            started: perf_counter() time the request started
+            stats: Dict to record the time to first content chunk in
+
+        Returns:
+            The answer digit, or the full text if no valid answer appeared
+        """
+        text = ""
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if not text and stats is not None:
+                        stats["ttft_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                    text += chunk.choices[0].delta.content
+                    answer = self._find_streamed_answer(text, done=False)
+                    if answer is not None:
+                        return answer
+        finally:
+            stream.close()
+
+        return self._find_streamed_answer(text, done=True) or text
+
+    async def _read_stream_async(
+        self, stream, started: Optional[float] = None, stats: Optional[dict] = None
+    ) -> str:
+        """Async variant of _read_stream."""
+        text = ""
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if not text and stats is not None:
+                        stats["ttft_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                    text += chunk.choices[0].delta.content
+                    answer = self._find_streamed_answer(text, done=False)
+                    if answer is not None:
+                        return answer
+        finally:
+            await stream.close()
+
+        return self._find_streamed_answer(text, done=True) or text
+
+    def _complete_stream(
+        self, user_prompt: str, stats: Optional[dict] = None
+    ) -> str:
+        """
+        Stream the completion for a survey prompt with early exit.
+
+        Streams carry no usage, so only latency, time to first token,
+        retries and cache status go into ``stats``.
+
+        Returns:
+            The answer digit, or the full text if no valid answer appeared
+        """
+        started = time.perf_counter()
+        max_tokens = self.STREAM_MAX_TOKENS
+        key = self._cache_key(user_prompt, max_tokens, 0, {"stream": True})
+        if key is not None and not self.refresh_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._fill_stats(stats, started, cached=True)
+                return cached
+
+        # Reading happens inside the scheduled call so errors mid-stream are
+        # retried like any other request failure
+        answer_text = self.scheduler.call(
+            lambda: self._read_stream(
+                self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._build_messages(user_prompt),
+                    max_tokens=max_tokens,
+                    temperature=self.temperature,
+                    seed=self._request_seed(),
+                    stream=True,
+                ),
+                started,
+                stats,
+            ),
+            estimated_tokens=self._estimate_tokens(user_prompt, max_tokens),
+            stats=stats,
+        )
+        self._fill_stats(stats, started)
+
+        if key is not None and self._is_valid_answer(answer_text):
+            self.cache.set(key, answer_text, self.model)
+        return answer_text
+
+    async def _complete_stream_async(
+        self, user_prompt: str, stats: Optional[dict] = None
+    ) -> str:
+        """Async variant of _complete_stream."""
+        started = time.perf_counter()
+        max_tokens = self.STREAM_MAX_TOKENS
+        key = self._cache_key(user_prompt, max_tokens, 0, {"stream": True})
+        if key is not None and not self.refresh_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._fill_stats(stats, started, cached=True)
+                return cached
+
+        async def _request() -> str:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(user_prompt),
+                max_tokens=max_tokens,
+                temperature=self.temperature,
+                seed=self._request_seed(),
+                stream=True,
+            )
+            return await self._read_stream_async(stream, started, stats)
+
+        answer_text = await self.scheduler.acall(
+            _request,
+            estimated_tokens=self._estimate_tokens(user_prompt, max_tokens),
+            stats=stats,
+        )
+        self._fill_stats(stats, started)
+
+        if key is not None and self._is_valid_answer(answer_text):
+            self.cache.set(key, answer_text, self.model)
+        return answer_text
+
+    def answer_question(self, question: dict) -> int:
+        """
+        Have the agent answer a single survey question.
+
+        Args:
+            question: Question dict with 'id', 'text', 'domain', 'facet', 'reverse'
+
+        Returns:
+            Integer response (1-5)
+        """
+        user_prompt = self._create_survey_prompt(question)
+        stats = self.item_stats[question["id"]] = {}
+        try:
+            if self.stream:
+                answer_text = self._complete_stream(user_prompt, stats=stats)
+            else:
+                answer_text = self._complete(user_prompt, max_tokens=10, stats=stats)
+        except Exception as exc:
+            self._record_failure(question["id"], stats, exc)
+            raise
+
+        answer = self._parse_answer(answer_text, question)
+        self._record_request(question["id"], stats)
         return answer
 
-    def take_survey(self, verbose: bool = True) -> dict[int, int]:
+    def answer_batch(
+        self, questions: list[dict], attempt: int = 0
+    ) -> dict[int, int]:
+        """
+        Have the agent answer several survey questions in a single request.
+
+        Args:
+            questions: Question dicts to ask together
+            attempt: Re-ask round for these questions (0 for the first ask)
+
+        Returns:
+            Dictionary mapping question IDs to valid responses (1-5); items
+            the model skipped or answered malformed are omitted
+        """
+        user_prompt = self._create_batch_prompt(questions)
+        stats = {}
+        try:
+            answer_text = self._complete(
+                user_prompt,
+                max_tokens=self.BATCH_TOKENS_PER_ITEM * len(questions) + 20,
+                attempt=attempt,
+                stats=stats,
+                cacheable=lambda text: len(
+                    self._parse_batch_answers(text, questions, warn=False)
+                ) == len(questions),
+                response_format={"type": "json_object"},
+            )
+        except Exception as exc:
+            self._record_failure([question["id"] for question in questions], stats, exc)
+            raise
+
+        answers = self._parse_batch_answers(answer_text, questions)
+        self._record_request(
+            [question["id"] for question in questions], stats,
+            parse_failures=len(questions) - len(answers))
+
+        # Each answered item gets the request latency and an even token share
+        item_stats = {**stats, "batch_size": len(questions)}
+        for field in ("prompt_tokens", "completion_tokens"):
+            if item_stats[field] is not None:
+                item_stats[field] = round(item_stats[field] / len(questions), 2)
+        for question_id in answers:
+            self.item_stats[question_id] = dict(item_stats)
+        return answers
+
+    async def answer_question_async(self, question: dict) -> int:
+        """
+        Async variant of answer_question using the AsyncOpenAI client.
+
+        Args:
+            question: Question dict with 'id', 'text', 'domain', 'facet', 'reverse'
+
+        Returns:
+            Integer response (1-5)
+        """
+        user_prompt = self._create_survey_prompt(question)
+        stats = self.item_stats[question["id"]] = {}
+        try:
+            if self.stream:
+                answer_text = await self._complete_stream_async(user_prompt, stats=stats)
+            else:
+                answer_text = await self._complete_async(
+                    user_prompt, max_tokens=10, stats=stats)
+        except Exception as exc:
+            self._record_failure(question["id"], stats, exc)
+            raise
+
+        answer = self._parse_answer(answer_text, question)
+        self._record_request(question["id"], stats)
+        return answer
+
+    def _has_valid_distribution(self, payload: str) -> bool:
+        """Whether a logprob payload yields a distribution without falling back."""
+        data = json.loads(payload)
+        return any(
+            token.strip() in self.VALID_ANSWERS for token, _ in data["top_logprobs"]
+        ) or self._is_valid_answer(data["content"])
+
+    def _parse_distribution(
+        self, payload: str, question: dict
+    ) -> AnswerDistribution:
+        """
+        Turn a first-token logprob payload into a response distribution.
+
+        Probability mass on tokens "1".."5" is summed and renormalized. If the
+        model put no mass on any valid digit, falls back to a point mass on
+        the parsed completion text.
+
+        Args:
+            payload: JSON produced by _first_token_logprobs
+            question: Question dict the completion answers
+
+        Returns:
+            AnswerDistribution over responses 1-5
+        """
+        data = json.loads(payload)
+
+        mass = [0.0] * (self.RESPONSE_MAX - self.RESPONSE_MIN + 1)
+        for token, logprob in data["top_logprobs"]:
+            token = token.strip()
+            if token.isdigit() and self.RESPONSE_MIN <= int(token) <= self.RESPONSE_MAX:
+                mass[int(token) - self.RESPONSE_MIN] += math.exp(logprob)
+
+        total = sum(mass)
+        if total <= 0:
+            logger.warning(
+                "No logprob mass on valid responses for Q%s, "
+                "falling back to the sampled answer",
+                question["id"],
+            )
+            answer = self._parse_answer(data["content"], question)
+            mass = [0.0] * len(mass)
+            mass[answer - self.RESPONSE_MIN] = 1.0
+            total = 1.0
+
+        return AnswerDistribution(tuple(p / total for p in mass))
+
+    def answer_question_distribution(self, question: dict) -> AnswerDistribution:
+        """
+        Get the agent's full response distribution for a question in one call.
+
+        Requests a single token with its top logprobs instead of sampling the
+        question repeatedly.
+
+        Args:
+            question: Question dict with 'id', 'text', 'domain', 'facet', 'reverse'
+
+        Returns:
+            AnswerDistribution over responses 1-5
+        """
+        user_prompt = self._create_survey_prompt(question)
+        stats = self.item_stats[question["id"]] = {}
+        try:
+            payload = self._complete(
+                user_prompt,
+                max_tokens=1,
+                extract=self._first_token_logprobs,
+                stats=stats,
+                cacheable=self._has_valid_distribution,
+                logprobs=True,
+                top_logprobs=self.TOP_LOGPROBS,
+            )
+        except Exception as exc:
+            self._record_failure(question["id"], stats, exc)
+            raise
+
+        distribution = self._parse_distribution(payload, question)
+        self._record_request(question["id"], stats)
+        return distribution
+
+    def _resume_journal(
+        self, journal: Optional[SurveyJournal], mode: str
+    ) -> dict[int, dict]:
+        """
+        Start or resume a survey journal.
+
+        Args:
+            journal: Journal for this run, or None to run without one
+            mode: Survey mode, recorded in the journal header
+
+        Returns:
+            Already-answered records per question ID (empty for a new run)
+        """
+        if journal is None:
+            return {}
+
+        journal.start(
+            persona=self.persona_name,
+            model=self.model,
+            temperature=self.temperature,
+            replicate=self.replicate,
+            mode=mode,
+        )
+        answered = journal.answered()
+
+        if answered:
+            logger.info(
+                "Resuming run %s: %d questions already answered",
+                journal.run_id, len(answered))
+        return answered
+
+    def _start_live_scores(self) -> None:
+        """Reset live scoring for a new survey."""
+        self.live_scores = IncrementalScorer()
+        self.stopped_early = False
+
+    def _update_live_scores(
+        self,
+        question_id: int,
+        answer: float,
+        on_update: Optional[UpdateCallback],
+    ) -> bool:
+        """
+        Fold one answer into the live scores and run the update callback.
+
+        Returns:
+            True once the callback has asked to stop the survey
+        """
+        self.live_scores.update(question_id, answer)
+        if (
+            not self.stopped_early
+            and on_update is not None
+            and on_update(self.live_scores)
+        ):
+            self.stopped_early = True
+            logger.warning(
+                "Survey stopped early by callback after %d questions",
+                self.live_scores.answered)
+        return self.stopped_early
+
+    def take_survey(
+        self,
+        verbose: bool = True,
+        journal: Optional[SurveyJournal] = None,
+        on_update: Optional[UpdateCallback] = None,
+    ) -> dict[int, int]:
         """
         Have the agent complete the entire BFI-2 survey.
 
         Args:
             verbose: Whether to print progress
+            journal: Journal to record each answer to; items it already
+                holds are not asked again
+            on_update: Called with ``self.live_scores`` after every answer;
+                returning True stops the survey early
 
         Returns:
             Dictionary mapping question IDs to responses (1-5)
         """
         self.responses = {}
+        self.item_stats = {}
+        self._start_live_scores()
+        answered = self._resume_journal(journal, "sequential")
 
-        logger.info(f"Starting BFI-2 survey for persona: {self.persona_name}")
+        logger.info("Starting BFI-2 survey for persona: %s", self.persona_name)
 
         if verbose:
             print(f"\n{'=' * 60}")
@@ -183,7 +968,109 @@ IMPORTANT: Respond with ONLY a single number (1, 2, 3, 4, or 5). No explanation
             print(f"{'=' * 60}\n")
 
         for question in self.questions:
-            answer = self.answer_question(question)
+            if question["id"] in answered:
+                answer = answered[question["id"]]["answer"]
+            else:
+                answer = self.answer_question(question)
+                if journal is not None:
+                    journal.record(question["id"], answer)
+            self.responses[question["id"]] = answer
+
+            if verbose:
+                print(
+                    f"Q{question['id']:2d} [{question['domain']}] "
+                    f"{question['text'][:40]:<40} -> {answer}"
+                )
+
+            if self._update_live_scores(question["id"], answer, on_update):
+                break
+
+        logger.info(
+            "Survey complete: %d questions answered", len(self.responses))
+
+        if verbose:
+            print(f"\n{'=' * 60}")
+            print(
+                f"Survey complete! {len(self.responses)} questions answered.")
+            print(f"{'=' * 60}\n")
+
+        return self.responses
+
+    async def take_survey_async(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        verbose: bool = True,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        journal: Optional[SurveyJournal] = None,
+        on_update: Optional[UpdateCallback] = None,
+    ) -> dict[int, int]:
+        """
+        Have the agent complete the BFI-2 survey with overlapping requests.
+
+        Questions are answered concurrently with at most ``concurrency``
+        requests in flight; responses are still returned in question order.
+        Live scores are updated in completion order.
+
+        Args:
+            concurrency: Maximum number of in-flight requests
+            verbose: Whether to print progress
+            semaphore: Shared semaphore bounding in-flight requests across
+                several agents; overrides ``concurrency`` when given
+            journal: Journal to record each answer to; items it already
+                holds are not asked again
+            on_update: Called with ``self.live_scores`` after every answer;
+                returning True cancels the requests still outstanding
+
+        Returns:
+            Dictionary mapping question IDs to responses (1-5)
+        """
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be >= 1, got {concurrency}")
+
+        self.responses = {}
+        self.item_stats = {}
+        self._start_live_scores()
+        semaphore = semaphore or asyncio.Semaphore(concurrency)
+        answered = self._resume_journal(journal, "async")
+
+        logger.info(
+            "Starting async BFI-2 survey for persona: %s (concurrency=%d)",
+            self.persona_name, concurrency,
+        )
+
+        if verbose:
+            print(f"\n{'=' * 60}")
+            print(f"Agent '{self.persona_name}' taking BFI-2 survey "
+                  f"(concurrency={concurrency})...")
+            print(f"{'=' * 60}\n")
+
+        async def _answer(question: dict) -> tuple[int, int]:
+            if question["id"] in answered:
+                return question["id"], answered[question["id"]]["answer"]
+
+            async with semaphore:
+                answer = await self.answer_question_async(question)
+            if journal is not None:
+                journal.record(question["id"], answer)
+            return question["id"], answer
+
+        tasks = [asyncio.ensure_future(_answer(question)) for question in self.questions]
+        answers = {}
+        try:
+            for next_answer in asyncio.as_completed(tasks):
+                question_id, answer = await next_answer
+                answers[question_id] = answer
+                if self._update_live_scores(question_id, answer, on_update):
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        for question in self.questions:
+            if question["id"] not in answers:
+                continue
+            answer = answers[question["id"]]
             self.responses[question["id"]] = answer
 
             if verbose:
@@ -193,7 +1080,7 @@ IMPORTANT: Respond with ONLY a single number (1, 2, 3, 4, or 5). No explanation
                 )
 
         logger.info(
-            f"Survey complete: {len(self.responses)} questions answered")
+            "Survey complete: %d questions answered", len(self.responses))
 
         if verbose:
             print(f"\n{'=' * 60}")
@@ -203,6 +1090,191 @@ IMPORTANT: Respond with ONLY a single number (1, 2, 3, 4, or 5). No explanation
 
         return self.responses
 
+    def take_survey_batched(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_rounds: int = MAX_BATCH_ROUNDS,
+        verbose: bool = True,
+        journal: Optional[SurveyJournal] = None,
+        on_update: Optional[UpdateCallback] = None,
+    ) -> dict[int, int]:
+        """
+        Have the agent complete the BFI-2 survey in batched requests.
+
+        Questions are asked ``batch_size`` at a time with a JSON answer
+        format. Missing or malformed items are re-asked in follow-up batches
+        for up to ``max_rounds`` rounds, after which any remaining items are
+        asked one by one.
+
+        Args:
+            batch_size: Number of questions per request
+            max_rounds: Maximum batched attempts per chunk
+            verbose: Whether to print progress
+            journal: Journal to record answers to after each request; items
+                it already holds are not asked again
+            on_update: Called with ``self.live_scores`` after every answer;
+                returning True stops before the next request
+
+        Returns:
+            Dictionary mapping question IDs to responses (1-5)
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+
+        self.responses = {}
+        self.item_stats = {}
+        self._start_live_scores()
+        answered = self._resume_journal(journal, "batched")
+        answers: dict[int, int] = {}
+        requests_made = 0
+
+        def _record(new_answers: dict[int, int], resumed: bool = False) -> None:
+            for question_id, answer in new_answers.items():
+                answers[question_id] = answer
+                if journal is not None and not resumed:
+                    journal.record(question_id, answer)
+                self._update_live_scores(question_id, answer, on_update)
+
+        _record(
+            {question_id: record["answer"] for question_id, record in answered.items()},
+            resumed=True,
+        )
+
+        logger.info(
+            "Starting batched BFI-2 survey for persona: %s (batch_size=%d)",
+            self.persona_name, batch_size,
+        )
+
+        if verbose:
+            print(f"\n{'=' * 60}")
+            print(f"Agent '{self.persona_name}' taking BFI-2 survey "
+                  f"(batch_size={batch_size})...")
+            print(f"{'=' * 60}\n")
+
+        for start in range(0, len(self.questions), batch_size):
+            if self.stopped_early:
+                break
+            pending = [
+                q for q in self.questions[start:start + batch_size]
+                if q["id"] not in answers
+            ]
+
+            for round_idx in range(max_rounds):
+                if not pending or self.stopped_early:
+                    break
+                if round_idx > 0:
+                    logger.warning(
+                        "Re-asking %d missing or malformed questions (round %d/%d)",
+                        len(pending), round_idx + 1, max_rounds,
+                    )
+                _record(self.answer_batch(pending, attempt=round_idx))
+                requests_made += 1
+                pending = [q for q in pending if q["id"] not in answers]
+
+            for question in pending:
+                if self.stopped_early:
+                    break
+                _record({question["id"]: self.answer_question(question)})
+                requests_made += 1
+
+        for question in self.questions:
+            if question["id"] not in answers:
+                continue
+            answer = answers[question["id"]]
+            self.responses[question["id"]] = answer
+
+            if verbose:
+                print(
+                    f"Q{question['id']:2d} [{question['domain']}] "
+                    f"{question['text'][:40]:<40} -> {answer}"
+                )
+
+        logger.info(
+            "Survey complete: %d questions answered in %d requests",
+            len(self.responses), requests_made)
+
+        if verbose:
+            print(f"\n{'=' * 60}")
+            print(
+                f"Survey complete! {len(self.responses)} questions answered "
+                f"in {requests_made} requests.")
+            print(f"{'=' * 60}\n")
+
+        return self.responses
+
+    def take_survey_distribution(
+        self,
+        verbose: bool = True,
+        journal: Optional[SurveyJournal] = None,
+        on_update: Optional[UpdateCallback] = None,
+    ) -> dict[int, AnswerDistribution]:
+        """
+        Have the agent complete the BFI-2 survey recording soft responses.
+
+        Each item is answered with one logprob request. ``self.responses``
+        is set to the most likely response per item for compatibility.
+
+        Args:
+            verbose: Whether to print progress
+            journal: Journal to record each distribution to; items it
+                already holds are not asked again
+            on_update: Called with ``self.live_scores`` (fed expected
+                values) after every answer; returning True stops the survey
+
+        Returns:
+            Dictionary mapping question IDs to response distributions
+        """
+        self.responses = {}
+        self.item_stats = {}
+        self.distributions = {}
+        self._start_live_scores()
+        answered = self._resume_journal(journal, "logprobs")
+
+        logger.info(
+            "Starting logprob BFI-2 survey for persona: %s", self.persona_name)
+
+        if verbose:
+            print(f"\n{'=' * 60}")
+            print(f"Agent '{self.persona_name}' taking BFI-2 survey (logprobs)...")
+            print(f"{'=' * 60}\n")
+
+        for question in self.questions:
+            record = answered.get(question["id"])
+            if record is not None and "probabilities" in record:
+                distribution = AnswerDistribution(tuple(record["probabilities"]))
+            else:
+                distribution = self.answer_question_distribution(question)
+                if journal is not None:
+                    journal.record(
+                        question["id"],
+                        distribution.mode,
+                        probabilities=list(distribution.probabilities),
+                    )
+            self.distributions[question["id"]] = distribution
+            self.responses[question["id"]] = distribution.mode
+
+            if verbose:
+                print(
+                    f"Q{question['id']:2d} [{question['domain']}] "
+                    f"{question['text'][:40]:<40} -> "
+                    f"{distribution.expected:.2f} (H={distribution.entropy:.2f})"
+                )
+
+            if self._update_live_scores(
+                    question["id"], distribution.expected, on_update):
+                break
+
+        logger.info(
+            "Survey complete: %d questions answered", len(self.distributions))
+
+        if verbose:
+            print(f"\n{'=' * 60}")
+            print(
+                f"Survey complete! {len(self.distributions)} questions answered.")
+            print(f"{'=' * 60}\n")
+
+        return self.distributions
+
     def save_responses(self, output_path: Optional[Path] = None) -> Path:
         """Save survey responses to a JSON file."""
         if output_path is None:
@@ -213,11 +1285,17 @@ IMPORTANT: Respond with ONLY a single number (1, 2, 3, 4, or 5). No explanation
         output_data = {
             "persona": self.persona_name,
             "model": self.model,
+            "replicate": self.replicate,
             "responses": self.responses,
         }
+        if self.distributions:
+            output_data["distributions"] = {
+                question_id: distribution.to_dict()
+                for question_id, distribution in self.distributions.items()
+            }
 
         output_path.write_text(json.dumps(output_data, indent=2))
-        logger.info(f"Saved responses to {output_path}")
+        logger.info("Saved responses to %s", output_path)
 
         return output_path
 
@@ -236,7 +1314,7 @@ def main():
     output_path = agent.save_responses()
 
     print(f"\nResponses saved to: {output_path}")
-    logger.info(f"Demo complete, responses saved to: {output_path}")
+    logger.info("Demo complete, responses saved to: %s", output_path)
 
     return responses
 
@@ -0,0 +1,363 @@
+"""
+Request Metrics Module
+
+This module provides per-request instrumentation for LLM survey calls.
+PersonaAgent reports every completion request (latency, time to first
+token, prompt/completion tokens, retries, cache hit, parse failures and,
+for requests that failed after all retries, the error), tagged with
+persona, model, question ID and run ID, to a process-wide MetricsRegistry.
+
+The registry keeps Prometheus-style histograms and counters per persona
+and model, plus a ring buffer of the most recent requests. Both can be
+exported as JSON lines, the histograms and counters also in the
+Prometheus text exposition format.
+"""
+
+import json
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+LATENCY_BUCKETS_MS = (
+    5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10_000, 30_000, 60_000)
+TOKEN_BUCKETS = (
+    1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10_000)
+
+# Histogram name -> (help text, buckets, request field observed)
+HISTOGRAMS = {
+    "llm_request_latency_ms": (
+        "Completion request latency including retries and rate-limit waits",
+        LATENCY_BUCKETS_MS, "latency_ms"),
+    "llm_time_to_first_token_ms": (
+        "Time to the first streamed content chunk",
+        LATENCY_BUCKETS_MS, "ttft_ms"),
+    "llm_prompt_tokens": (
+        "Prompt tokens per completion request",
+        TOKEN_BUCKETS, "prompt_tokens"),
+    "llm_completion_tokens": (
+        "Completion tokens per completion request",
+        TOKEN_BUCKETS, "completion_tokens"),
+}
+
+COUNTERS = {
+    "llm_requests_total": "Completion requests, including cache hits and failures",
+    "llm_request_errors_total": "Completion requests that failed after all retries",
+    "llm_cache_hits_total": "Completion requests served from the response cache",
+    "llm_retries_total": "Retried API attempts",
+    "llm_parse_failures_total": "Survey items whose completion could not be parsed",
+    "llm_prompt_tokens_total": "Prompt tokens used",
+    "llm_completion_tokens_total": "Completion tokens used",
+}
+
+# Most recent requests kept for the JSONL request log and summaries
+DEFAULT_MAX_EVENTS = 5_000
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a running count and sum."""
+
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(buckets)
+        # One slot per bucket upper bound plus +Inf, not cumulative
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """(upper bound, cumulative count) pairs, ending with +Inf."""
+        pairs, total = [], 0
+        for bound, count in zip((*self.buckets, math.inf), self.counts):
+            total += count
+            pairs.append(("+Inf" if bound == math.inf else f"{bound:g}", total))
+        return pairs
+
+    def to_dict(self) -> dict:
+        return {
+            "buckets": dict(self.cumulative()),
+            "count": self.count,
+            "sum": round(self.sum, 3),
+        }
+
+
+def _percentile(values: list[float], q: float) -> Optional[float]:
+    """Exact percentile (linear interpolation) of a list of values."""
+    if not values:
+        return None
+    values = sorted(values)
+    pos = (len(values) - 1) * q
+    low = math.floor(pos)
+    high = min(low + 1, len(values) - 1)
+    return round(values[low] + (values[high] - values[low]) * (pos - low), 2)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{key}="{_escape(value)}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of request histograms, counters and request records.
+
+    Series are labelled by persona and model; question IDs only appear in
+    the request log, to keep the number of series small.
+    """
+
+    def __init__(self, max_events: int = DEFAULT_MAX_EVENTS):
+        """
+        Initialize the MetricsRegistry.
+
+        Args:
+            max_events: Most recent requests kept for the request log and
+                summaries
+        """
+        self._lock = threading.Lock()
+        self._histograms: dict[tuple[str, Labels], Histogram] = {}
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self.events: deque = deque(maxlen=max_events)
+
+    def _increment(self, name: str, labels: Labels, value: float = 1) -> None:
+        key = (name, labels)
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def record_request(
+        self,
+        persona: str,
+        model: str,
+        question_id: Union[int, list[int], None],
+        stats: dict,
+        parse_failures: int = 0,
+        run_id: Optional[str] = None,
+    ) -> None:
+        """
+        Record one completion request.
+
+        Args:
+            persona: Persona that made the request
+            model: Model the request went to
+            question_id: Question answered (a list for batched requests)
+            stats: Request stats as filled by PersonaAgent (latency_ms,
+                ttft_ms, prompt_tokens, completion_tokens, retries, cached,
+                and error for a failed request)
+            parse_failures: Items of the request that could not be parsed
+            run_id: Run the request belongs to
+        """
+        labels = (("persona", persona), ("model", model))
+        cached = bool(stats.get("cached"))
+        event = {
+            "time": round(time.time(), 3),
+            "run_id": run_id,
+            "persona": persona,
+            "model": model,
+            "question_id": question_id,
+            "latency_ms": stats.get("latency_ms"),
+            "ttft_ms": stats.get("ttft_ms"),
+            "prompt_tokens": stats.get("prompt_tokens"),
+            "completion_tokens": stats.get("completion_tokens"),
+            "retries": stats.get("retries", 0),
+            "cached": cached,
+            "parse_failures": parse_failures,
+            "error": stats.get("error"),
+        }
+
+        with self._lock:
+            self.events.append(event)
+            self._increment("llm_requests_total", labels)
+            if cached:
+                self._increment("llm_cache_hits_total", labels)
+            if event["error"]:
+                self._increment("llm_request_errors_total", labels)
+            if event["retries"]:
+                self._increment("llm_retries_total", labels, event["retries"])
+            if parse_failures:
+                self._increment("llm_parse_failures_total", labels, parse_failures)
+            if event["prompt_tokens"]:
+                self._increment("llm_prompt_tokens_total", labels, event["prompt_tokens"])
+            if event["completion_tokens"]:
+                self._increment(
+                    "llm_completion_tokens_total", labels, event["completion_tokens"])
+
+            # Cache hits would drown the API latency and token distributions,
+            # and failed requests have no completion to measure
+            if cached or event["error"]:
+                return
+            for name, (_, buckets, field) in HISTOGRAMS.items():
+                value = event[field]
+                if value is None:
+                    continue
+                histogram = self._histograms.get((name, labels))
+                if histogram is None:
+                    histogram = self._histograms[(name, labels)] = Histogram(buckets)
+                histogram.observe(value)
+
+    def summary(
+        self,
+        persona: Optional[str] = None,
+        model: Optional[str] = None,
+        run_id: Optional[str] = None,
+    ) -> dict:
+        """
+        Summarize the recent requests, optionally for one persona/model/run.
+
+        Only requests still in the ring buffer (the last ``max_events``)
+        are included.
+
+        Returns:
+            Dict with request, cache hit, error, retry and parse failure
+            counts, the error rate, token totals and exact latency/TTFT
+            percentiles of successful API requests
+        """
+        with self._lock:
+            events = [
+                event for event in self.events
+                if (persona is None or event["persona"] == persona)
+                and (model is None or event["model"] == model)
+                and (run_id is None or event["run_id"] == run_id)
+            ]
+
+        errors = sum(1 for event in events if event["error"])
+        api_events = [e for e in events if not e["cached"] and not e["error"]]
+        latencies = [e["latency_ms"] for e in api_events if e["latency_ms"] is not None]
+        ttfts = [e["ttft_ms"] for e in api_events if e["ttft_ms"] is not None]
+        return {
+            "requests": len(events),
+            "cache_hits": sum(1 for event in events if event["cached"]),
+            "errors": errors,
+            "error_rate": round(errors / len(events), 4) if events else 0.0,
+            "retries": sum(event["retries"] for event in events),
+            "parse_failures": sum(event["parse_failures"] for event in events),
+            "prompt_tokens": sum(e["prompt_tokens"] or 0 for e in events),
+            "completion_tokens": sum(e["completion_tokens"] or 0 for e in events),
+            "latency_ms": {
+                "p50": _percentile(latencies, 0.5),
+                "p95": _percentile(latencies, 0.95),
+                "p99": _percentile(latencies, 0.99),
+                "max": max(latencies, default=None),
+            },
+            "ttft_ms": {
+                "p50": _percentile(ttfts, 0.5),
+                "p95": _percentile(ttfts, 0.95),
+            },
+        }
+
+    def to_prometheus(self) -> str:
+        """Render histograms and counters in the Prometheus text format."""
+        lines = []
+        with self._lock:
+            for name, (help_text, _, _) in HISTOGRAMS.items():
+                series = [(labels, h) for (n, labels), h in self._histograms.items() if n == name]
+                if not series:
+                    continue
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in series:
+                    for bound, count in histogram.cumulative():
+                        le = f'le="{bound}"'
+                        lines.append(f"{name}_bucket{_format_labels(labels, le)} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:g}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+            for name, help_text in COUNTERS.items():
+                series = [(labels, v) for (n, labels), v in self._counters.items() if n == name]
+                if not series:
+                    continue
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in series:
+                    lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path) -> None:
+        """Write the Prometheus text exposition to a file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.to_prometheus(), encoding="utf-8")
+        logger.info("Wrote Prometheus metrics to %s", path)
+
+    def write_jsonl(self, path: Path, include_requests: bool = True) -> None:
+        """
+        Write histograms, counters and (optionally) the request log as JSONL.
+
+        Each line has a "type" of "histogram", "counter" or "request".
+        """
+        with self._lock:
+            histograms = list(self._histograms.items())
+            counters = list(self._counters.items())
+            events = list(self.events) if include_requests else []
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for (name, labels), histogram in histograms:
+                f.write(json.dumps({
+                    "type": "histogram", "name": name, "labels": dict(labels),
+                    **histogram.to_dict(),
+                }) + "\n")
+            for (name, labels), value in counters:
+                f.write(json.dumps({
+                    "type": "counter", "name": name, "labels": dict(labels),
+                    "value": value,
+                }) + "\n")
+            for event in events:
+                f.write(json.dumps({"type": "request", **event}) + "\n")
+
+        logger.info("Wrote %d metric series and %d requests to %s",
+                    len(histograms) + len(counters), len(events), path)
+
+    def reset(self) -> None:
+        """Drop all recorded metrics."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.events.clear()
+
+
+def format_summary(summary: dict) -> str:
+    """Human-readable multi-line rendering of MetricsRegistry.summary()."""
+    latency = summary["latency_ms"]
+    ttft = summary["ttft_ms"]
+
+    def _ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.1f}ms"
+
+    lines = [
+        f"Requests:        {summary['requests']} "
+        f"({summary['cache_hits']} cache hits, {summary['retries']} retries)",
+        f"Errors:          {summary['errors']} ({summary['error_rate']:.1%})",
+        f"Parse failures:  {summary['parse_failures']}",
+        f"Tokens:          {summary['prompt_tokens']:g} prompt / "
+        f"{summary['completion_tokens']:g} completion",
+        f"Latency:         p50 {_ms(latency['p50'])} | p95 {_ms(latency['p95'])} | "
+        f"p99 {_ms(latency['p99'])} | max {_ms(latency['max'])}",
+    ]
+    if ttft["p50"] is not None:
+        lines.append(
+            f"Time to first:   p50 {_ms(ttft['p50'])} | p95 {_ms(ttft['p95'])}")
+    return "\n".join(lines)
+
+
+@lru_cache()
+def get_metrics() -> MetricsRegistry:
+    """Get the process-wide request metrics registry."""
+    return MetricsRegistry()
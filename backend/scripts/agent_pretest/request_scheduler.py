@@ -0,0 +1,404 @@
+"""
+Request Scheduler Module
+
+This module provides a process-wide scheduler for LLM requests. It combines
+token-bucket rate limiting (requests/min and tokens/min), retries with
+jittered exponential backoff that honor Retry-After headers, and a circuit
+breaker that pauses requests to an endpoint that keeps failing.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from src.settings import app_settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: timeouts, conflicts, throttling, server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at a per-minute rate.
+
+    The bucket holds at most one minute's worth of tokens, so short bursts
+    are allowed while the long-run rate stays at ``rate_per_minute``.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, amount: float) -> float:
+        """
+        Take ``amount`` tokens if available.
+
+        Args:
+            amount: Tokens required (clamped to the bucket capacity)
+
+        Returns:
+            0.0 if the tokens were taken, otherwise seconds to wait before
+            enough tokens will have accumulated
+        """
+        amount = min(amount, self.capacity)
+
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated_at) * self.rate
+            )
+            self.updated_at = now
+
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+
+            return (amount - self.tokens) / self.rate
+
+    def release(self, amount: float) -> None:
+        """Return tokens taken by try_acquire that ended up unused."""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    callers wait out a ``cooldown`` second pause. After the cooldown a single
+    caller is let through as a half-open probe while the others keep
+    waiting; a success closes the circuit and a failure re-opens it.
+    """
+
+    # Seconds between checks of callers waiting on a half-open probe
+    PROBE_POLL_INTERVAL = 0.5
+
+    def __init__(self, failure_threshold: int, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_started_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the circuit is open (cooling down or probing)."""
+        with self._lock:
+            return self.opened_at is not None
+
+    def before_call(self) -> float:
+        """
+        Check whether a request may go out now.
+
+        Returns:
+            0.0 if the call may proceed (the circuit is closed, or this
+            caller is the half-open probe), otherwise seconds to wait before
+            checking again
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return 0.0
+
+            now = time.monotonic()
+            remaining = self.opened_at + self.cooldown - now
+            if remaining > 0:
+                return remaining
+
+            # A probe that never reported back (e.g. a cancelled task) is
+            # given up on after one more cooldown
+            if (self.probe_started_at is None
+                    or now - self.probe_started_at > self.cooldown):
+                self.probe_started_at = now
+                logger.info("Circuit breaker half-open; sending probe request")
+                return 0.0
+
+            return min(self.PROBE_POLL_INTERVAL, self.cooldown)
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info("Circuit breaker closed after successful probe")
+            self.failures = 0
+            self.opened_at = None
+            self.probe_started_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self.probe_started_at = None
+            if self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.error(
+                        "Circuit breaker opened after %d consecutive failures",
+                        self.failures,
+                    )
+                self.opened_at = time.monotonic()
+
+    def release_probe(self) -> None:
+        """End a probe whose outcome says nothing about endpoint health."""
+        with self._lock:
+            self.probe_started_at = None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether an API exception is transient and worth retrying."""
+    # Imported here so the scheduler can be imported without the OpenAI SDK
+    from openai import APIConnectionError, APIStatusError
+
+    if isinstance(exc, APIConnectionError):  # Includes APITimeoutError
+        return True
+    if isinstance(exc, APIStatusError):
+        return exc.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+def get_retry_after(exc: BaseException) -> Optional[float]:
+    """
+    Extract the server-requested delay from an API error, if any.
+
+    Supports ``retry-after-ms``, ``retry-after`` in seconds and
+    ``retry-after`` as an HTTP date.
+    """
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RequestScheduler:
+    """
+    Shared scheduler that every PersonaAgent routes its API calls through.
+
+    Each call waits for request and token budget, then runs with retries.
+    Retryable failures back off with full jitter, or for the server-provided
+    Retry-After; a 429 with Retry-After pauses all callers, not just the one
+    that was throttled.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+        breaker_threshold: Optional[int] = None,
+        breaker_cooldown: Optional[float] = None,
+    ):
+        """
+        Initialize the RequestScheduler (all arguments default to settings).
+
+        Args:
+            requests_per_minute: Request rate limit
+            tokens_per_minute: Token rate limit (prompt + completion estimate)
+            max_retries: Retries per call after the first attempt
+            backoff_base: Base delay in seconds for exponential backoff
+            backoff_max: Maximum backoff delay in seconds
+            breaker_threshold: Consecutive failures that open the circuit
+            breaker_cooldown: Seconds the circuit stays open
+        """
+        settings = app_settings.scheduler
+
+        self.request_bucket = TokenBucket(
+            requests_per_minute or settings.requests_per_minute)
+        self.token_bucket = TokenBucket(
+            tokens_per_minute or settings.tokens_per_minute)
+        self.max_retries = (
+            settings.max_retries if max_retries is None else max_retries)
+        self.backoff_base = backoff_base or settings.backoff_base
+        self.backoff_max = backoff_max or settings.backoff_max
+        self.breaker = CircuitBreaker(
+            breaker_threshold or settings.breaker_threshold,
+            breaker_cooldown or settings.breaker_cooldown,
+        )
+
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+        self.total_requests = 0
+        self.total_retries = 0
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        """Try to reserve budget for one request; return seconds to wait."""
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            return pause
+
+        wait = self.request_bucket.try_acquire(1)
+        if wait:
+            return wait
+
+        wait = self.token_bucket.try_acquire(estimated_tokens)
+        if wait:
+            # Give back the request slot we could not use yet
+            self.request_bucket.release(1)
+        return wait
+
+    def _check_breaker(self, estimated_tokens: int) -> float:
+        """
+        Ask the circuit breaker for a go-ahead once budget is reserved.
+
+        Checked after the rate limits so a caller granted the half-open probe
+        sends it right away; on a wait the reserved budget is given back.
+        """
+        wait = self.breaker.before_call()
+        if wait:
+            self.request_bucket.release(1)
+            self.token_bucket.release(estimated_tokens)
+        return wait
+
+    def _backoff_delay(self, attempt: int, exc: BaseException) -> float:
+        """Delay before the next attempt, honoring Retry-After when present."""
+        retry_after = get_retry_after(exc)
+        if retry_after is not None:
+            delay = min(retry_after, self.backoff_max)
+            if getattr(exc, "status_code", None) == 429:
+                with self._lock:
+                    self._paused_until = max(
+                        self._paused_until, time.monotonic() + delay)
+            # Small jitter so throttled callers do not resume in lockstep
+            return delay + random.uniform(0, self.backoff_base)
+
+        # Full jitter: uniform over [0, min(max, base * 2^attempt)]
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _handle_failure(
+        self, attempt: int, exc: BaseException, stats: Optional[dict] = None
+    ) -> float:
+        """Record a failed attempt; re-raise if it should not be retried."""
+        if stats is not None:
+            stats["retries"] = attempt
+
+        if not is_retryable(exc):
+            self.breaker.release_probe()
+            raise exc
+
+        # Throttling is handled by the rate limits and the shared pause; it
+        # says nothing about whether the endpoint is healthy
+        if getattr(exc, "status_code", None) == 429:
+            self.breaker.release_probe()
+        else:
+            self.breaker.record_failure()
+
+        if attempt >= self.max_retries:
+            logger.error("Request failed after %d attempts: %r", attempt + 1, exc)
+            raise exc
+
+        delay = self._backoff_delay(attempt, exc)
+        with self._lock:
+            self.total_retries += 1
+        logger.warning(
+            "Retryable error (%s), attempt %d/%d, retrying in %.2fs",
+            type(exc).__name__, attempt + 1, self.max_retries + 1, delay,
+        )
+        return delay
+
+    def call(
+        self,
+        fn: Callable[[], T],
+        estimated_tokens: int = 0,
+        stats: Optional[dict] = None,
+    ) -> T:
+        """
+        Run a blocking API call under the rate limits with retries.
+
+        Args:
+            fn: Zero-argument callable performing the request
+            estimated_tokens: Prompt + completion tokens the call may use
+            stats: Dict to record the call's retry count in (also set when
+                the call fails)
+
+        Returns:
+            The return value of ``fn``
+        """
+        attempt = 0
+        while True:
+            wait = self._reserve(estimated_tokens) or self._check_breaker(estimated_tokens)
+            if wait:
+                time.sleep(wait)
+                continue
+
+            with self._lock:
+                self.total_requests += 1
+            try:
+                result = fn()
+            except Exception as exc:
+                time.sleep(self._handle_failure(attempt, exc, stats))
+                attempt += 1
+                continue
+
+            self.breaker.record_success()
+            if stats is not None:
+                stats["retries"] = attempt
+            return result
+
+    async def acall(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        estimated_tokens: int = 0,
+        stats: Optional[dict] = None,
+    ) -> T:
+        """Async variant of call for coroutine-returning callables."""
+        attempt = 0
+        while True:
+            wait = self._reserve(estimated_tokens) or self._check_breaker(estimated_tokens)
+            if wait:
+                await asyncio.sleep(wait)
+                continue
+
+            with self._lock:
+                self.total_requests += 1
+            try:
+                result = await fn()
+            except Exception as exc:
+                await asyncio.sleep(self._handle_failure(attempt, exc, stats))
+                attempt += 1
+                continue
+
+            self.breaker.record_success()
+            if stats is not None:
+                stats["retries"] = attempt
+            return result
+
+
+@lru_cache()
+def get_request_scheduler() -> RequestScheduler:
+    """Get the process-wide request scheduler configured in settings."""
+    return RequestScheduler()
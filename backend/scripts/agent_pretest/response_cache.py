@@ -0,0 +1,243 @@
+"""
+Response Cache Module
+
+This module provides a persistent, content-addressed cache for LLM
+completions. Entries are keyed on everything that determines a completion
+(model, system prompt, user prompt, sampling parameters and replicate index)
+and stored in SQLite with age- and size-based eviction.
+"""
+
+import atexit
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from src.settings import app_settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache mapping request fingerprints to completion text.
+
+    The cache is safe to share between PersonaAgent instances and threads in
+    one process. Entries older than ``max_age_days`` are dropped, and once
+    more than ``max_entries`` are stored the least recently used are evicted.
+    Access times of hits are buffered in memory and written in batches, so
+    reads do not each pay for a write.
+    """
+
+    # Run eviction after this many writes
+    EVICT_EVERY = 500
+
+    # Write buffered access times after this many distinct hits
+    ACCESS_FLUSH_EVERY = 500
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_entries: Optional[int] = None,
+        max_age_days: Optional[float] = None,
+    ):
+        """
+        Initialize the ResponseCache.
+
+        Args:
+            path: SQLite database file (defaults to settings)
+            max_entries: Maximum number of cached responses (defaults to settings)
+            max_age_days: Maximum age of a cached response (defaults to settings)
+        """
+        self.path = Path(path or app_settings.cache.path)
+        self.max_entries = (
+            app_settings.cache.max_entries if max_entries is None else max_entries)
+        self.max_age_days = (
+            app_settings.cache.max_age_days if max_age_days is None else max_age_days)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+        self._pending_access: dict[str, float] = {}
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed_at "
+            "ON responses (accessed_at)"
+        )
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+
+        evicted = self.evict()
+        logger.debug(
+            "Opened response cache at %s (%d entries evicted)", self.path, evicted)
+
+    @staticmethod
+    def make_key(
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        replicate: int = 0,
+        **params,
+    ) -> str:
+        """
+        Build the content-addressed key for a completion request.
+
+        Args:
+            model: Model identifier
+            system_prompt: Persona system prompt
+            user_prompt: Survey prompt
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            replicate: Replicate index, so repeated samples get distinct entries
+            **params: Any other request parameters that affect the completion
+
+        Returns:
+            Hex SHA-256 digest identifying the request
+        """
+        fingerprint = {
+            "model": model,
+            "system_prompt": hashlib.sha256(system_prompt.encode()).hexdigest(),
+            "user_prompt": user_prompt,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "replicate": replicate,
+            "params": params,
+        }
+        payload = json.dumps(fingerprint, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, or None on a miss."""
+        now = time.time()
+        min_created = now - self.max_age_days * 86400
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND created_at >= ?",
+                (key, min_created),
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._pending_access[key] = now
+            if len(self._pending_access) >= self.ACCESS_FLUSH_EVERY:
+                self._write_access_times()
+                self._conn.commit()
+            self.hits += 1
+
+        return row[0]
+
+    def _write_access_times(self) -> None:
+        """Apply buffered hit times; the caller holds the lock and commits."""
+        if not self._pending_access:
+            return
+        self._conn.executemany(
+            "UPDATE responses SET accessed_at = ? WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in self._pending_access.items()],
+        )
+        self._pending_access.clear()
+
+    def set(self, key: str, response: str, model: str) -> None:
+        """Store (or overwrite) the response for a key."""
+        now = time.time()
+
+        with self._lock:
+            self._pending_access.pop(key, None)
+            self._write_access_times()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+            self._conn.commit()
+            self._writes_since_evict += 1
+            should_evict = self._writes_since_evict >= self.EVICT_EVERY
+
+        if should_evict:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Drop expired entries and trim the cache to ``max_entries``.
+
+        Returns:
+            Number of entries removed
+        """
+        min_created = time.time() - self.max_age_days * 86400
+
+        with self._lock:
+            # Recency must be up to date before trimming least recently used
+            self._write_access_times()
+            removed = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (min_created,)
+            ).rowcount
+
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM responses").fetchone()
+            if count > self.max_entries:
+                removed += self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                ).rowcount
+
+            self._conn.commit()
+            self._writes_since_evict = 0
+
+        if removed:
+            logger.info("Evicted %d entries from response cache", removed)
+        return removed
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            self._pending_access.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Write buffered access times and close the database connection."""
+        with self._lock:
+            self._write_access_times()
+            self._conn.commit()
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM responses").fetchone()
+        return count
+
+
+@lru_cache()
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache configured in settings."""
+    cache = ResponseCache()
+    atexit.register(cache.close)
+    return cache
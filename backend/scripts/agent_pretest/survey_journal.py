@@ -0,0 +1,152 @@
+"""
+Survey Journal Module
+
+This module provides an append-only JSONL journal of answered survey items.
+Each answer is written as soon as it is received, so a run that dies partway
+through can be resumed by its run ID and only the unanswered items re-asked.
+"""
+
+import json
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_JOURNAL_DIR = (
+    Path(__file__).resolve().parent.parent / "analysis" / "results" / "journals"
+)
+
+
+class SurveyJournal:
+    """
+    Append-only journal for a single survey run.
+
+    The first line of the file is a header record with run metadata; every
+    following line records one answered item. A partially written last line
+    (from a crash mid-write) is ignored when the journal is read back.
+    """
+
+    def __init__(self, run_id: str, journal_dir: Optional[Path] = None):
+        """
+        Initialize the SurveyJournal.
+
+        Args:
+            run_id: Identifier of the run; names the journal file
+            journal_dir: Folder holding journals (defaults to results/journals)
+        """
+        self.run_id = run_id
+        self.journal_dir = Path(journal_dir or DEFAULT_JOURNAL_DIR)
+        self.path = self.journal_dir / f"{run_id}.jsonl"
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_run_id(persona_name: str) -> str:
+        """Generate a unique run ID for a persona."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"{persona_name}_{timestamp}_{uuid.uuid4().hex[:8]}"
+
+    @property
+    def exists(self) -> bool:
+        """Whether the journal file has been created."""
+        return self.path.exists()
+
+    def _append(self, record: dict) -> None:
+        """Append one record and flush it to disk."""
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            self.journal_dir.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a") as f:
+                f.write(line)
+                f.flush()
+
+    def _read(self) -> tuple[Optional[dict], dict[int, dict]]:
+        """Read the header and the latest record per answered item."""
+        header = None
+        records: dict[int, dict] = {}
+
+        if not self.exists:
+            return header, records
+
+        with self.path.open() as f:
+            for line_no, line in enumerate(f, start=1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(
+                        "Skipping unreadable line %d in journal %s", line_no, self.path)
+                    continue
+
+                if record.get("type") == "header":
+                    header = record
+                elif record.get("type") == "answer":
+                    records[record["question_id"]] = record
+
+        return header, records
+
+    def start(self, **metadata) -> None:
+        """
+        Write the header record if this is a new journal.
+
+        When the journal already exists, checks that the recorded persona
+        and model match so a run is never resumed with a different setup.
+
+        Args:
+            **metadata: Run metadata (persona, model, ...) to record
+        """
+        header, _ = self._read()
+
+        if self.exists:
+            # Terminate a line torn by a crash so the next record starts cleanly
+            with self._lock, self.path.open("rb+") as f:
+                f.seek(0, 2)
+                if f.tell() > 0:
+                    f.seek(-1, 2)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+
+        if header is None:
+            self._append({
+                "type": "header",
+                "run_id": self.run_id,
+                "started_at": datetime.now().isoformat(),
+                **metadata,
+            })
+            return
+
+        for key in ("persona", "model"):
+            if key in metadata and header.get(key) != metadata[key]:
+                raise ValueError(
+                    f"Journal {self.run_id} was recorded with {key}="
+                    f"{header.get(key)!r}, cannot resume with {metadata[key]!r}"
+                )
+
+    def record(self, question_id: int, answer: float, **extra) -> None:
+        """
+        Record one answered item.
+
+        Args:
+            question_id: Question ID
+            answer: Response for the item
+            **extra: Additional fields to store (e.g. a probability vector)
+        """
+        self._append({
+            "type": "answer",
+            "question_id": question_id,
+            "answer": answer,
+            **extra,
+        })
+
+    def header(self) -> Optional[dict]:
+        """Return the header record, or None for a new journal."""
+        header, _ = self._read()
+        return header
+
+    def answered(self) -> dict[int, dict]:
+        """Return the recorded answer record per question ID."""
+        _, records = self._read()
+        return records
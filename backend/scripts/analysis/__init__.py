@@ -5,6 +5,14 @@ This module provides tools for analyzing personality survey data
 in the PersonaMirror research study.
 """
 
-from .bfi2_scorer import BFI2Scorer, BFI2Result, DomainScore, FacetScore
+from .bfi2_scorer import (
+    BFI2BatchResult,
+    BFI2Result,
+    BFI2Scorer,
+    DomainScore,
+    FacetScore,
+)
+from .scoring_plan import ScoringPlan, get_scoring_plan
 
-__all__ = ["BFI2Scorer", "BFI2Result", "DomainScore", "FacetScore"]
+__all__ = ["BFI2Scorer", "BFI2Result", "BFI2BatchResult", "DomainScore", "FacetScore",
+           "ScoringPlan", "get_scoring_plan"]
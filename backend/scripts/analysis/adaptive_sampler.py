@@ -0,0 +1,458 @@
+"""
+Adaptive Replicate Sampler
+
+This script estimates how stable a persona's BFI-2 profile is without a
+fixed replicate count:
+1. Draws a few full replicate surveys
+2. Computes a confidence interval for every domain score
+3. Keeps sampling until every interval is narrower than the target width,
+   either by drawing whole replicate surveys or by re-asking only the items
+   that contribute most to the remaining uncertainty
+4. Reports the domain estimates and the API calls saved against a fixed
+   number of replicates
+"""
+
+import argparse
+import asyncio
+import math
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from scripts.agent_pretest.llm_backends import available_backends
+from scripts.agent_pretest.persona_agent import PersonaAgent, list_personas
+from scripts.agent_pretest.request_metrics import MetricsRegistry
+from scripts.analysis.bfi2_scorer import BFI2Scorer
+from src.settings import app_settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+STRATEGIES = ("replicates", "items")
+
+DEFAULT_TARGET_WIDTH = 0.3
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_MIN_REPLICATES = 3
+DEFAULT_MAX_REPLICATES = 30
+DEFAULT_ITEMS_PER_ROUND = 4
+
+
+# Variance of one Likert answer's rounding to a whole scale step; floors
+# every variance estimate so identical replicates do not give a zero-width CI
+MIN_RESPONSE_VARIANCE = 1 / 12
+
+
+def _t_cdf(t: float, df: int) -> float:
+    """
+    Exact Student-t CDF for integer degrees of freedom.
+
+    Uses the finite trigonometric series for P(|T| < t) (Abramowitz and
+    Stegun 26.7.3 and 26.7.4).
+    """
+    theta = math.atan(abs(t) / math.sqrt(df))
+    sin, cos2 = math.sin(theta), math.cos(theta) ** 2
+
+    if df % 2:
+        series, term = 0.0, math.cos(theta)
+        for k in range(1, (df - 1) // 2 + 1):
+            series += term
+            term *= cos2 * (2 * k) / (2 * k + 1)
+        central = 2 / math.pi * (theta + sin * series)
+    else:
+        series, term = 0.0, 1.0
+        for k in range(1, df // 2 + 1):
+            series += term
+            term *= cos2 * (2 * k - 1) / (2 * k)
+        central = sin * series
+
+    return 0.5 + math.copysign(central / 2, t)
+
+
+def t_quantile(p: float, df: int) -> float:
+    """Student-t quantile, found by bisection on the exact CDF."""
+    if not 0 < p < 1:
+        raise ValueError("p must be between 0 and 1")
+    if p < 0.5:
+        return -t_quantile(1 - p, df)
+
+    high = 1.0
+    while _t_cdf(high, df) < p:
+        high *= 2
+    low = 0.0
+    for _ in range(100):
+        mid = (low + high) / 2
+        if _t_cdf(mid, df) < p:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+@dataclass
+class AdaptiveSamplingResult:
+    """Outcome of an adaptive sampling run."""
+    persona: str
+    model: str
+    strategy: str
+    target_width: float
+    confidence: float
+    converged: bool
+    replicates: int  # Full replicate surveys drawn
+    domain_means: dict[str, float]
+    ci_widths: dict[str, float]
+    calls_made: int  # API requests (cache hits excluded)
+    draws_made: int  # Item responses drawn, including cache hits
+    baseline_calls: int
+    item_draws: dict[int, int] = field(default_factory=dict)
+
+    @property
+    def calls_saved(self) -> int:
+        return self.baseline_calls - self.calls_made
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "calls_saved": self.calls_saved}
+
+
+class AdaptiveSampler:
+    """
+    Sequential sampler that stops once every domain CI is narrow enough.
+
+    With the "replicates" strategy each round is one more full survey and
+    the CI is a t interval over replicate domain scores. With the "items"
+    strategy, after the initial replicates only the items with the largest
+    variance-per-draw in still-wide domains are re-asked; a domain's
+    variance is then the sum of its item-mean variances. Variances are
+    floored at MIN_RESPONSE_VARIANCE per answer.
+    """
+
+    def __init__(
+        self,
+        persona_name: str,
+        model: Optional[str] = None,
+        strategy: str = "replicates",
+        target_width: float = DEFAULT_TARGET_WIDTH,
+        confidence: float = DEFAULT_CONFIDENCE,
+        min_replicates: int = DEFAULT_MIN_REPLICATES,
+        max_replicates: int = DEFAULT_MAX_REPLICATES,
+        items_per_round: int = DEFAULT_ITEMS_PER_ROUND,
+        concurrency: int = PersonaAgent.DEFAULT_CONCURRENCY,
+        use_cache: bool = True,
+        backend: Optional[str] = None,
+    ):
+        """
+        Initialize the AdaptiveSampler.
+
+        Args:
+            persona_name: Name of the persona profile
+            model: Model to use (defaults to settings)
+            strategy: "replicates" or "items"
+            target_width: Required full width of every domain CI
+            confidence: CI confidence level
+            min_replicates: Full surveys drawn before the first check (>= 2)
+            max_replicates: Budget in full surveys; also the fixed-replicate
+                baseline the savings are reported against
+            items_per_round: Items re-asked per wide domain per round
+                ("items" strategy)
+            concurrency: Maximum in-flight requests
+            use_cache: Whether to read and write the LLM response cache
+            backend: LLM backend name (defaults to settings)
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy '{strategy}', expected one of {STRATEGIES}")
+        if min_replicates < 2:
+            raise ValueError("min_replicates must be >= 2 to estimate variance")
+        if items_per_round < 1:
+            raise ValueError("items_per_round must be >= 1")
+
+        self.persona_name = persona_name
+        self.model = model or app_settings.openrouter.model_name
+        self.strategy = strategy
+        self.target_width = target_width
+        self.confidence = confidence
+        self.min_replicates = min_replicates
+        self.max_replicates = max(max_replicates, min_replicates)
+        self.items_per_round = items_per_round
+        self.concurrency = concurrency
+        self.use_cache = use_cache
+        self.backend = backend
+
+        self.scorer = BFI2Scorer()
+        self.plan = self.scorer.plan
+        self._agents: dict[int, PersonaAgent] = {}
+        # Own registry, so calls_made counts only this sampler's requests;
+        # the draw budget bounds how many requests it has to hold
+        self.metrics = MetricsRegistry(
+            max_events=self.max_replicates * len(self.plan.item_ids))
+        self.draws_made = 0
+
+    @property
+    def calls_made(self) -> int:
+        """API requests made so far (cache hits excluded)."""
+        summary = self.metrics.summary()
+        return summary["requests"] - summary["cache_hits"]
+
+    def _agent(self, replicate: int) -> PersonaAgent:
+        """Agent for one replicate index (its own cache entries)."""
+        if replicate not in self._agents:
+            self._agents[replicate] = PersonaAgent(
+                persona_name=self.persona_name,
+                model=self.model,
+                replicate=replicate,
+                use_cache=self.use_cache,
+                backend=self.backend,
+                metrics=self.metrics,
+            )
+        return self._agents[replicate]
+
+    async def _draw_replicate(
+        self, replicate: int, semaphore: asyncio.Semaphore
+    ) -> dict[int, int]:
+        """Take one full replicate survey."""
+        responses = await self._agent(replicate).take_survey_async(
+            verbose=False, semaphore=semaphore)
+        self.draws_made += len(responses)
+        return responses
+
+    async def _draw_items(
+        self, draws: dict[int, list[float]], items: list[int],
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        """Re-ask items, each under its next unused replicate index."""
+        questions = {q["id"]: q for q in self._agent(0).questions}
+
+        async def _ask(item: int) -> None:
+            agent = self._agent(len(draws[item]))
+            async with semaphore:
+                answer = await agent.answer_question_async(questions[item])
+            draws[item].append(answer)
+
+        await asyncio.gather(*(_ask(item) for item in items))
+        self.draws_made += len(items)
+
+    def _replicate_intervals(
+        self, domain_scores: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Domain means and t-interval widths over replicate scores."""
+        n = domain_scores.shape[0]
+        means = domain_scores.mean(axis=0)
+        # A domain score averages its items, so its rounding variance does too
+        floor = np.array([
+            MIN_RESPONSE_VARIANCE / len(domain.items) for domain in self.plan.domains])
+        variance = np.maximum(domain_scores.var(axis=0, ddof=1), floor)
+        sem = np.sqrt(variance / n)
+        t = t_quantile(0.5 + self.confidence / 2, n - 1)
+        return means, 2 * t * sem
+
+    def _item_intervals(
+        self, draws: dict[int, list[float]]
+    ) -> tuple[np.ndarray, np.ndarray, dict[int, float]]:
+        """Domain means, t-interval widths and per-item variance-per-draw."""
+        # Degrees of freedom of the least-sampled item keep the interval honest
+        # while only the initial replicates have been drawn
+        df = min(len(values) for values in draws.values()) - 1
+        t = t_quantile(0.5 + self.confidence / 2, df)
+        item_mean_var = {
+            item: max(float(np.var(values, ddof=1)), MIN_RESPONSE_VARIANCE) / len(values)
+            for item, values in draws.items()
+        }
+
+        means, widths = [], []
+        for domain in self.plan.domains:
+            item_means = [
+                6 - np.mean(draws[item]) if is_reverse else np.mean(draws[item])
+                for item, is_reverse in zip(domain.items, domain.reverse_mask)
+            ]
+            variance = sum(item_mean_var[item] for item in domain.items)
+            means.append(np.mean(item_means))
+            widths.append(2 * t * math.sqrt(variance) / len(domain.items))
+
+        return np.array(means), np.array(widths), item_mean_var
+
+    async def run_async(self, verbose: bool = True) -> AdaptiveSamplingResult:
+        """Sample until every domain CI is narrow enough or the budget is spent."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        n_items = len(self.plan.item_ids)
+        budget = self.max_replicates * n_items
+        codes = self.plan.domain_codes
+
+        replicate_rows = [
+            await self._draw_replicate(replicate, semaphore)
+            for replicate in range(self.min_replicates)
+        ]
+        draws = {
+            item: [row[item] for row in replicate_rows] for item in self.plan.item_ids
+        }
+
+        while True:
+            if self.strategy == "replicates":
+                domain_scores = self.scorer.score_batch(replicate_rows).domain_scores
+                means, widths = self._replicate_intervals(domain_scores)
+            else:
+                means, widths, item_mean_var = self._item_intervals(draws)
+
+            wide = widths > self.target_width
+            if verbose:
+                print(
+                    f"[{self.calls_made:5d} calls] " + "  ".join(
+                        f"{code}={mean:.2f}±{width / 2:.2f}"
+                        for code, mean, width in zip(codes, means, widths))
+                )
+            if not wide.any() or self.draws_made >= budget:
+                break
+
+            if self.strategy == "replicates":
+                replicate_rows.append(
+                    await self._draw_replicate(len(replicate_rows), semaphore))
+                continue
+
+            # Re-ask the items whose next draw shrinks the variance most
+            items = []
+            for domain, is_wide in zip(self.plan.domains, wide):
+                if not is_wide:
+                    continue
+                ranked = sorted(
+                    domain.items,
+                    key=lambda item: item_mean_var[item] / (len(draws[item]) + 1),
+                    reverse=True,
+                )
+                items.extend(ranked[:self.items_per_round])
+            await self._draw_items(draws, items[:budget - self.draws_made], semaphore)
+
+        result = AdaptiveSamplingResult(
+            persona=self.persona_name,
+            model=self.model,
+            strategy=self.strategy,
+            target_width=self.target_width,
+            confidence=self.confidence,
+            converged=not wide.any(),
+            replicates=len(replicate_rows),
+            domain_means={code: round(float(m), 3) for code, m in zip(codes, means)},
+            ci_widths={code: round(float(w), 3) for code, w in zip(codes, widths)},
+            calls_made=self.calls_made,
+            draws_made=self.draws_made,
+            baseline_calls=budget,
+            item_draws={item: len(values) for item, values in draws.items()},
+        )
+
+        logger.info(
+            "Adaptive sampling for %s %s after %d calls "
+            "(%d saved vs %d fixed replicates)",
+            self.persona_name,
+            "converged" if result.converged else "hit its budget",
+            result.calls_made, result.calls_saved, self.max_replicates,
+        )
+        return result
+
+    def run(self, verbose: bool = True) -> AdaptiveSamplingResult:
+        """Blocking wrapper around run_async."""
+        return asyncio.run(self.run_async(verbose=verbose))
+
+
+def main():
+    """Main entry point with CLI argument parsing."""
+    parser = argparse.ArgumentParser(
+        description="Sample replicate BFI-2 surveys until domain CIs are narrow"
+    )
+    parser.add_argument(
+        "--persona",
+        "-p",
+        type=str,
+        default="high_agreeableness",
+        choices=list_personas(),
+        help="Persona name (default: high_agreeableness)",
+    )
+    parser.add_argument(
+        "--model",
+        "-m",
+        type=str,
+        default=None,
+        help=f"Model to use (default: from settings - {app_settings.openrouter.model_name})",
+    )
+    parser.add_argument(
+        "--strategy",
+        "-s",
+        choices=STRATEGIES,
+        default="replicates",
+        help="Draw whole replicate surveys or re-ask high-variance items "
+        "(default: replicates)",
+    )
+    parser.add_argument(
+        "--target-width",
+        "-w",
+        type=float,
+        default=DEFAULT_TARGET_WIDTH,
+        help=f"Required CI width for every domain (default: {DEFAULT_TARGET_WIDTH})",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=DEFAULT_CONFIDENCE,
+        help=f"CI confidence level (default: {DEFAULT_CONFIDENCE})",
+    )
+    parser.add_argument(
+        "--min-replicates",
+        type=int,
+        default=DEFAULT_MIN_REPLICATES,
+        help=f"Full surveys before the first check (default: {DEFAULT_MIN_REPLICATES})",
+    )
+    parser.add_argument(
+        "--max-replicates",
+        type=int,
+        default=DEFAULT_MAX_REPLICATES,
+        help=f"Budget and fixed-replicate baseline (default: {DEFAULT_MAX_REPLICATES})",
+    )
+    parser.add_argument(
+        "--concurrency",
+        "-c",
+        type=int,
+        default=PersonaAgent.DEFAULT_CONCURRENCY,
+        help=f"Maximum in-flight requests (default: {PersonaAgent.DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default=None,
+        choices=available_backends(),
+        help=f"LLM backend (default: from settings - {app_settings.backend.name})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the LLM response cache",
+    )
+    parser.add_argument(
+        "--quiet",
+        "-q",
+        action="store_true",
+        help="Suppress verbose output",
+    )
+
+    args = parser.parse_args()
+
+    result = AdaptiveSampler(
+        persona_name=args.persona,
+        model=args.model,
+        strategy=args.strategy,
+        target_width=args.target_width,
+        confidence=args.confidence,
+        min_replicates=args.min_replicates,
+        max_replicates=args.max_replicates,
+        concurrency=args.concurrency,
+        use_cache=not args.no_cache,
+        backend=args.backend,
+    ).run(verbose=not args.quiet)
+
+    print(f"\n{'=' * 70}")
+    print(f"ADAPTIVE SAMPLING: {result.persona} ({result.strategy})")
+    print(f"{'=' * 70}")
+    for code, mean in result.domain_means.items():
+        print(f"  {code}: {mean:.2f}  (CI width {result.ci_widths[code]:.3f})")
+    print(f"\n  Converged: {result.converged}  |  Replicates: {result.replicates}")
+    print(f"  API calls: {result.calls_made} of {result.baseline_calls} "
+          f"({result.calls_saved} saved, {result.draws_made} responses drawn)")
+    print(f"{'=' * 70}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,20 @@ calculating domain scores (Big Five traits) and facet scores.
 """
 
 import json
+from array import array
 from pathlib import Path
-from dataclasses import dataclass, field
-
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from scripts.analysis.scoring_plan import (
+    SCORING_CONFIG_PATH,
+    DomainPlan,
+    FacetPlan,
+    ScoringPlan,
+    get_scoring_plan,
+)
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -20,8 +31,8 @@ class FacetScore:
     name: str
     score: float
     items: list[int]
-    raw_responses: dict[int, int]
-    scored_responses: dict[int, int]  # After reverse scoring
+    raw_responses: dict[int, float]  # Expected values for soft responses
+    scored_responses: dict[int, float]  # After reverse scoring
 
 
 @dataclass
@@ -33,23 +44,110 @@ class DomainScore:
     interpretation: str
     items: list[int]
     facets: dict[str, FacetScore]
-    raw_responses: dict[int, int]
-    scored_responses: dict[int, int]
+    raw_responses: dict[int, float]
+    scored_responses: dict[int, float]
+
+
+def pack_responses(values: Sequence[float]) -> array:
+    """
+    Pack a response vector into compact array storage.
+
+    Whole-number responses (the usual 1-5 answers) are stored one byte each;
+    anything else, such as expected values from soft scoring, as doubles.
+    """
+    if all(float(value).is_integer() and -128 <= value <= 127 for value in values):
+        return array("b", (int(value) for value in values))
+    return array("d", values)
 
 
-@dataclass
 class BFI2Result:
-    """Complete BFI-2 scoring result."""
-    persona: str
-    total_questions: int
-    domains: dict[str, DomainScore]
-    summary: dict[str, float] = field(default_factory=dict)
-
-    def __post_init__(self):
-        """Generate summary after initialization."""
-        self.summary = {
-            domain.code: domain.score
-            for domain in self.domains.values()
+    """
+    Complete BFI-2 scoring result.
+
+    Stored as one response vector (in plan item order, missing items filled
+    with 3) and one score array (domains, then facets, in plan order). The
+    per-domain and per-facet views, summary and to_dict output are built on
+    demand from those arrays.
+    """
+
+    __slots__ = ("persona", "total_questions", "plan", "responses", "scores")
+
+    def __init__(
+        self,
+        persona: str,
+        total_questions: int,
+        plan: ScoringPlan,
+        responses: array,
+        scores: array,
+    ):
+        self.persona = persona
+        self.total_questions = total_questions
+        self.plan = plan
+        self.responses = responses
+        self.scores = scores
+
+    def __repr__(self) -> str:
+        return (
+            f"BFI2Result(persona={self.persona!r}, "
+            f"total_questions={self.total_questions}, summary={self.summary})"
+        )
+
+    def _group_responses(
+        self, group_idx: int
+    ) -> tuple[dict[int, float], dict[int, float]]:
+        """Raw and reverse-scored responses for one domain/facet."""
+        group = self.plan.groups[group_idx]
+        raw_responses = {
+            item: self.responses[column]
+            for item, column in zip(group.items, self.plan.group_columns[group_idx])
+        }
+        scored_responses = {
+            item: 6 - response if is_reverse else response
+            for (item, response), is_reverse in zip(
+                raw_responses.items(), group.reverse_mask)
+        }
+        return raw_responses, scored_responses
+
+    @property
+    def domains(self) -> dict[str, DomainScore]:
+        """Per-domain score views, built from the compact arrays."""
+        domains = {}
+        facet_idx = len(self.plan.domains)
+
+        for domain_idx, domain in enumerate(self.plan.domains):
+            facets = {}
+            for facet in domain.facets:
+                raw_responses, scored_responses = self._group_responses(facet_idx)
+                facets[facet.name] = FacetScore(
+                    name=facet.name,
+                    score=self.scores[facet_idx],
+                    items=list(facet.items),
+                    raw_responses=raw_responses,
+                    scored_responses=scored_responses,
+                )
+                facet_idx += 1
+
+            raw_responses, scored_responses = self._group_responses(domain_idx)
+            score = self.scores[domain_idx]
+            domains[domain.name] = DomainScore(
+                name=domain.name,
+                code=domain.code,
+                score=score,
+                interpretation=self.plan.interpret(score),
+                items=list(domain.items),
+                facets=facets,
+                raw_responses=raw_responses,
+                scored_responses=scored_responses,
+            )
+
+        return domains
+
+    @property
+    def summary(self) -> dict[str, float]:
+        """Domain score per domain code."""
+        return {
+            domain.code: self.scores[idx]
+            for idx, domain in enumerate(self.plan.domains)
         }
 
     def to_dict(self) -> dict:
@@ -83,35 +181,94 @@ class BFI2Result:
         }
 
 
+@dataclass
+class BFI2BatchResult:
+    """
+    BFI-2 scores for a batch of response sets.
+
+    Row ``i`` of every array belongs to the ``i``-th response set; columns
+    follow ``domain_codes`` / ``facet_names`` in scoring-config order.
+    """
+    personas: list[str]
+    domain_names: list[str]
+    domain_codes: list[str]
+    facet_names: list[str]
+    domain_scores: np.ndarray  # N × 5
+    facet_scores: np.ndarray  # N × 15
+    interpretation_codes: np.ndarray  # N × 5 int8 codes into interpretation_labels
+    interpretation_labels: tuple[str, ...]
+    responses: Optional[np.ndarray] = None  # N × 60 input matrix
+    plan: Optional[ScoringPlan] = None
+
+    def __len__(self) -> int:
+        return self.domain_scores.shape[0]
+
+    @property
+    def interpretations(self) -> np.ndarray:
+        """N × 5 domain interpretation labels (built on access)."""
+        labels = np.asarray(self.interpretation_labels, dtype=object)
+        return labels[self.interpretation_codes]
+
+    def interpretation(self, index: int) -> list[str]:
+        """Domain interpretation labels for one response set."""
+        return [self.interpretation_labels[code] for code in self.interpretation_codes[index]]
+
+    def result(self, index: int) -> BFI2Result:
+        """Full BFI2Result for one response set of the batch."""
+        if self.responses is None or self.plan is None:
+            raise ValueError("Batch result was built without its responses")
+
+        row = np.asarray(self.responses[index], dtype=np.float64)
+        answered = ~np.isnan(row)
+        return BFI2Result(
+            persona=self.personas[index],
+            total_questions=int(answered.sum()),
+            plan=self.plan,
+            responses=pack_responses(np.where(answered, row, 3.0).tolist()),
+            scores=array("d", np.concatenate(
+                [self.domain_scores[index], self.facet_scores[index]]).tolist()),
+        )
+
+    def summary(self, index: int) -> dict[str, float]:
+        """Domain score summary (code -> score) for one response set."""
+        return {
+            code: float(score)
+            for code, score in zip(self.domain_codes, self.domain_scores[index])
+        }
+
+
 class BFI2Scorer:
     """
     Scores BFI-2 survey responses to calculate Big Five personality traits.
 
     Calculates both domain-level scores (Extraversion, Agreeableness,
     Conscientiousness, Neuroticism, Open-Mindedness) and facet-level scores.
+    The scoring configuration is compiled once per process into a shared
+    ScoringPlan, so constructing a scorer is cheap.
     """
 
-    def __init__(self):
-        """Initialize the scorer with scoring configuration."""
+    # Rows scored per matrix product in score_batch, bounding temporary memory
+    BATCH_BLOCK_ROWS = 65_536
+
+    def __init__(self, scoring_path: Optional[Path] = None):
+        """
+        Initialize the scorer with scoring configuration.
+
+        Args:
+            scoring_path: Scoring config to use (defaults to data/bfi2/scoring.json)
+        """
         self.backend_path = Path(__file__).resolve().parent.parent.parent
-        self.scoring_config = self._load_scoring_config()
+        self.plan = get_scoring_plan(scoring_path or SCORING_CONFIG_PATH)
+        self.scoring_config = self.plan.config
         self.interpretation_ranges = self.scoring_config["interpretation"]["ranges"]
         logger.debug("Initialized BFI2Scorer")
 
-    def _load_scoring_config(self) -> dict:
-        """Load the BFI-2 scoring configuration."""
-        scoring_path = self.backend_path / "data" / "bfi2" / "scoring.json"
-
-        data = json.loads(scoring_path.read_text())
-        logger.debug(f"Loaded scoring config from {scoring_path}")
-        return data
-
-    def _reverse_score(self, response: int, is_reverse: bool) -> int:
+    def _reverse_score(self, response: float, is_reverse: bool) -> float:
         """
         Apply reverse scoring if needed.
 
         Args:
-            response: Original response (1-5)
+            response: Original response (1-5, or an expected value)
             is_reverse: Whether this item should be reverse scored
 
         Returns:
@@ -131,21 +288,57 @@ class BFI2Scorer:
         Returns:
             Interpretation label (e.g., "High", "Very High")
         """
-        for range_name, range_info in self.interpretation_ranges.items():
-            if range_info["min"] <= score < range_info["max"]:
-                return range_info["label"]
-
-        # Handle edge case for max score
-        if score >= 5.0:
-            return "Very High"
-        return "Average"
+        return self.plan.interpret(score)
 
-    def _calculate_mean(self, values: list[int]) -> float:
+    def _calculate_mean(self, values: list[float]) -> float:
         """Calculate mean and round to 2 decimal places."""
         if not values:
             return 0.0
         return round(sum(values) / len(values), 2)
 
+    def _score_items(
+        self, group: Union[DomainPlan, FacetPlan], responses: dict[int, int]
+    ) -> tuple[float, dict[int, float], dict[int, float]]:
+        """Mean score plus raw and reverse-scored responses for a compiled group."""
+        raw_responses = {item: responses.get(item, 3) for item in group.items}
+        scored_responses = {
+            item: self._reverse_score(resp, is_reverse)
+            for (item, resp), is_reverse in zip(
+                raw_responses.items(), group.reverse_mask)
+        }
+        score = self._calculate_mean(list(scored_responses.values()))
+        return score, raw_responses, scored_responses
+
+    def _score_facet_plan(
+        self, facet: FacetPlan, responses: dict[int, int]
+    ) -> FacetScore:
+        score, raw_responses, scored_responses = self._score_items(facet, responses)
+        return FacetScore(
+            name=facet.name,
+            score=score,
+            items=list(facet.items),
+            raw_responses=raw_responses,
+            scored_responses=scored_responses
+        )
+
+    def _score_domain_plan(
+        self, domain: DomainPlan, responses: dict[int, int]
+    ) -> DomainScore:
+        score, raw_responses, scored_responses = self._score_items(domain, responses)
+        return DomainScore(
+            name=domain.name,
+            code=domain.code,
+            score=score,
+            interpretation=self._interpret_score(score),
+            items=list(domain.items),
+            facets={
+                facet.name: self._score_facet_plan(facet, responses)
+                for facet in domain.facets
+            },
+            raw_responses=raw_responses,
+            scored_responses=scored_responses
+        )
+
     def score_facet(
         self,
         facet_name: str,
@@ -163,24 +356,8 @@ class BFI2Scorer:
         Returns:
             FacetScore object
         """
-        items = facet_config["items"]
-        reverse_items = set(facet_config.get("reverseItems", []))
-
-        raw_responses = {item: responses.get(item, 3) for item in items}
-        scored_responses = {
-            item: self._reverse_score(resp, item in reverse_items)
-            for item, resp in raw_responses.items()
-        }
-
-        score = self._calculate_mean(list(scored_responses.values()))
-
-        return FacetScore(
-            name=facet_name,
-            score=score,
-            items=items,
-            raw_responses=raw_responses,
-            scored_responses=scored_responses
-        )
+        return self._score_facet_plan(
+            FacetPlan.compile(facet_name, facet_config), responses)
 
     def score_domain(
         self,
@@ -199,60 +376,152 @@ class BFI2Scorer:
         Returns:
             DomainScore object
         """
-        items = domain_config["items"]
-        reverse_items = set(domain_config.get("reverseItems", []))
-
-        # Calculate raw and scored responses for domain
-        raw_responses = {item: responses.get(item, 3) for item in items}
-        scored_responses = {
-            item: self._reverse_score(resp, item in reverse_items)
-            for item, resp in raw_responses.items()
-        }
+        return self._score_domain_plan(
+            DomainPlan.compile(domain_name, domain_config), responses)
 
-        # Calculate domain score
-        domain_score = self._calculate_mean(list(scored_responses.values()))
+    def score(self, responses: dict[int, int], persona: str = "unknown") -> BFI2Result:
+        """
+        Score a complete set of BFI-2 responses.
 
-        # Calculate facet scores
-        facets = {}
-        for facet_name, facet_config in domain_config.get("facets", {}).items():
-            facets[facet_name] = self.score_facet(
-                facet_name, facet_config, responses)
+        Args:
+            responses: Dictionary mapping question IDs to responses (1-5)
+            persona: Name of the persona (for labeling)
 
-        return DomainScore(
-            name=domain_name,
-            code=domain_config["code"],
-            score=domain_score,
-            interpretation=self._interpret_score(domain_score),
-            items=items,
-            facets=facets,
-            raw_responses=raw_responses,
-            scored_responses=scored_responses
+        Returns:
+            BFI2Result object with all domain and facet scores
+        """
+        plan = self.plan
+        vector = [responses.get(item, 3) for item in plan.item_ids]
+
+        scores = array("d", (
+            self._calculate_mean([
+                6 - vector[column] if is_reverse else vector[column]
+                for column, is_reverse in zip(columns, group.reverse_mask)
+            ])
+            for group, columns in zip(plan.groups, plan.group_columns)
+        ))
+
+        logger.debug("Scored %d responses for persona: %s", len(responses), persona)
+        return BFI2Result(
+            persona=persona,
+            total_questions=len(responses),
+            plan=plan,
+            responses=pack_responses(vector),
+            scores=scores,
         )
 
-    def score(self, responses: dict[int, int], persona: str = "unknown") -> BFI2Result:
+    def score_distributions(
+        self,
+        distributions: dict[int, Sequence[float]],
+        persona: str = "unknown",
+    ) -> BFI2Result:
         """
-        Score a complete set of BFI-2 responses.
+        Score soft BFI-2 responses given as per-item probability vectors.
+
+        Each item is scored at its expected value, so one distribution per
+        item stands in for the average over many sampled surveys.
 
         Args:
-            responses: Dictionary mapping question IDs to responses (1-5)
+            distributions: Dictionary mapping question IDs to P(1..5), either
+                as sequences or objects with a ``probabilities`` attribute
             persona: Name of the persona (for labeling)
 
         Returns:
             BFI2Result object with all domain and facet scores
+
+        Raises:
+            ValueError: If an item's probabilities sum to zero
         """
-        domains = {}
+        responses = {}
+        for item, probabilities in distributions.items():
+            probabilities = getattr(probabilities, "probabilities", probabilities)
+            total = sum(probabilities)
+            if total <= 0:
+                raise ValueError(f"Item {item} has no probability mass on any response")
+            responses[item] = sum(
+                p * value for value, p in enumerate(probabilities, start=1)
+            ) / total
+
+        return self.score(responses, persona)
+
+    def responses_to_matrix(
+        self, response_sets: Sequence[dict[int, float]]
+    ) -> np.ndarray:
+        """
+        Stack response dictionaries into an N × 60 matrix.
+
+        Args:
+            response_sets: Dictionaries mapping question IDs (int or str) to
+                responses
+
+        Returns:
+            Float matrix with one row per response set; missing items are NaN
+        """
+        column_index = self.plan.column_index
+
+        matrix = np.full((len(response_sets), len(column_index)), np.nan)
+        for row, responses in enumerate(response_sets):
+            for item, response in responses.items():
+                idx = column_index.get(int(item))
+                if idx is not None:
+                    matrix[row, idx] = response
+        return matrix
+
+    def score_batch(
+        self,
+        responses: Union[np.ndarray, Sequence[dict[int, float]]],
+        personas: Optional[Sequence[str]] = None,
+    ) -> BFI2BatchResult:
+        """
+        Score many BFI-2 response sets at once.
+
+        Args:
+            responses: N × 60 matrix (columns in question-ID order, NaN for
+                missing items) or a sequence of response dictionaries
+            personas: Optional label per response set
 
-        for domain_name, domain_config in self.scoring_config["domains"].items():
-            domains[domain_name] = self.score_domain(
-                domain_name, domain_config, responses
+        Returns:
+            BFI2BatchResult with N × 5 domain and N × 15 facet score arrays
+        """
+        plan = self.plan
+
+        if not isinstance(responses, np.ndarray):
+            responses = self.responses_to_matrix(responses)
+        if responses.ndim == 1:
+            responses = responses[np.newaxis, :]
+        if responses.shape[1] != len(plan.item_ids):
+            raise ValueError(
+                f"Expected {len(plan.item_ids)} response columns, "
+                f"got {responses.shape[1]}"
             )
 
-        logger.info(
-            f"Scored {len(responses)} responses for persona: {persona}")
-        return BFI2Result(
-            persona=persona,
-            total_questions=len(responses),
-            domains=domains
+        n_sets = responses.shape[0]
+        n_domains = len(plan.domains)
+        scores = np.empty((n_sets, plan.weights.shape[1]))
+
+        for start in range(0, n_sets, self.BATCH_BLOCK_ROWS):
+            block = responses[start:start + self.BATCH_BLOCK_ROWS].astype(np.float64)
+            # Missing items count as neutral, as in score()
+            np.nan_to_num(block, copy=False, nan=3.0)
+            np.matmul(block, plan.weights, out=scores[start:start + len(block)])
+
+        scores += plan.offsets
+        np.round(scores, 2, out=scores)
+
+        domain_scores = scores[:, :n_domains]
+        logger.debug("Batch scored %d response sets", n_sets)
+
+        return BFI2BatchResult(
+            personas=list(personas) if personas is not None else ["unknown"] * n_sets,
+            domain_names=plan.domain_names,
+            domain_codes=plan.domain_codes,
+            facet_names=plan.facet_names,
+            domain_scores=domain_scores,
+            facet_scores=scores[:, n_domains:],
+            interpretation_codes=plan.interpret_codes(domain_scores),
+            interpretation_labels=plan.interpretation_labels,
+            responses=responses,
+            plan=plan,
         )
 
     def score_from_file(self, responses_path: Path) -> BFI2Result:
@@ -271,7 +540,7 @@ class BFI2Scorer:
         responses = {int(k): v for k, v in data["responses"].items()}
         persona = data.get("persona", "unknown")
 
-        logger.info(f"Loaded responses from: {responses_path}")
+        logger.info("Loaded responses from: %s", responses_path)
         return self.score(responses, persona)
 
 
@@ -312,14 +581,31 @@ def main():
 
     scorer = BFI2Scorer()
 
-    # Check for existing responses file
+    # Check for an existing run: the latest one in the results store, or a
+    # per-run JSON file written with --output-format json
+    from scripts.analysis.results_store import ResultsStore
+
     backend_path = Path(__file__).resolve().parent.parent.parent
-    responses_path = (
-        backend_path / "scripts" / "analysis" /
-        "results" / "high_agreeableness_responses.json"
-    )
+    results_dir = backend_path / "scripts" / "analysis" / "results"
+    json_paths = sorted(results_dir.glob("high_agreeableness_responses*.json"))
+
+    store = ResultsStore(results_dir / "store")
+    table = store.load()
+    rows = np.flatnonzero(table.persona == "high_agreeableness")
 
-    if responses_path.exists():
+    if len(rows):
+        print(f"Loading latest high_agreeableness run from: {store.root}")
+        row = table.responses[rows[-1]]
+        result = scorer.score(
+            {
+                item_id: int(value)
+                for item_id, value in zip(table.item_ids, row)
+                if not np.isnan(value)
+            },
+            persona="high_agreeableness",
+        )
+    elif json_paths:
+        responses_path = max(json_paths, key=lambda path: path.stat().st_mtime)
         print(f"Loading responses from: {responses_path}")
         result = scorer.score_from_file(responses_path)
     else:
@@ -340,14 +626,13 @@ def main():
     print_results(result)
 
     # Save results
-    results_dir = backend_path / "scripts" / "analysis" / "results"
     results_dir.mkdir(parents=True, exist_ok=True)
 
     output_path = results_dir / f"{result.persona}_scored.json"
     output_path.write_text(json.dumps(result.to_dict(), indent=2))
 
     print(f"Scored results saved to: {output_path}")
-    logger.info(f"Demo complete, results saved to: {output_path}")
+    logger.info("Demo complete, results saved to: %s", output_path)
 
     return result
 
@@ -0,0 +1,152 @@
+"""
+Incremental Scorer Module
+
+This module provides online BFI-2 scoring for surveys in progress. The
+IncrementalScorer keeps a running sum and count per domain and facet, so
+each answer is folded in with O(1) work and partial scores (the mean of the
+items answered so far) are available at any point. PersonaAgent feeds it
+answer by answer and hands it to an ``on_update`` callback, which can stop
+the survey early by returning True.
+"""
+
+from typing import Callable, Optional
+
+from scripts.analysis.bfi2_scorer import BFI2Result, BFI2Scorer
+from scripts.analysis.scoring_plan import ScoringPlan, get_scoring_plan
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Callback invoked after every answer; returning True stops the survey
+UpdateCallback = Callable[["IncrementalScorer"], Optional[bool]]
+
+
+class IncrementalScorer:
+    """
+    Running domain and facet scores over a stream of answers.
+
+    Partial scores average only the items answered so far (unlike
+    BFI2Scorer, which counts missing items as 3); once every item is in,
+    they equal the full scores. Answering an item again replaces its
+    previous response.
+    """
+
+    def __init__(self, plan: Optional[ScoringPlan] = None):
+        """
+        Initialize the IncrementalScorer.
+
+        Args:
+            plan: Scoring plan to use (defaults to the shared plan)
+        """
+        self.plan = plan or get_scoring_plan()
+
+        # Item -> ((group index, is reverse keyed), ...) over domains and facets
+        item_groups: dict[int, list[tuple[int, bool]]] = {}
+        for group_idx, group in enumerate(self.plan.groups):
+            for item, is_reverse in zip(group.items, group.reverse_mask):
+                item_groups.setdefault(item, []).append((group_idx, is_reverse))
+        self._item_groups = {
+            item: tuple(groups) for item, groups in item_groups.items()}
+
+        self._sums = [0.0] * len(self.plan.groups)
+        self._counts = [0] * len(self.plan.groups)
+        self.responses: dict[int, float] = {}
+        self.last_question_id: Optional[int] = None
+
+    def update(self, question_id: int, answer: float) -> None:
+        """
+        Fold one answer into the running sums.
+
+        Args:
+            question_id: Question ID
+            answer: Response (1-5, or an expected value)
+        """
+        groups = self._item_groups.get(question_id)
+        if groups is None:
+            logger.warning("Ignoring answer to unknown item Q%s", question_id)
+            return
+
+        previous = self.responses.get(question_id)
+        for group_idx, is_reverse in groups:
+            if previous is None:
+                self._counts[group_idx] += 1
+            else:
+                self._sums[group_idx] -= 6 - previous if is_reverse else previous
+            self._sums[group_idx] += 6 - answer if is_reverse else answer
+
+        self.responses[question_id] = answer
+        self.last_question_id = question_id
+
+    @property
+    def answered(self) -> int:
+        """Number of distinct items answered so far."""
+        return len(self.responses)
+
+    def _group_score(self, group_idx: int) -> Optional[float]:
+        count = self._counts[group_idx]
+        if not count:
+            return None
+        return round(self._sums[group_idx] / count, 2)
+
+    def domain_scores(self) -> dict[str, Optional[float]]:
+        """Partial score per domain code (None until an item is answered)."""
+        return {
+            domain.code: self._group_score(idx)
+            for idx, domain in enumerate(self.plan.domains)
+        }
+
+    def domain_counts(self) -> dict[str, int]:
+        """Items answered per domain code."""
+        return {
+            domain.code: self._counts[idx]
+            for idx, domain in enumerate(self.plan.domains)
+        }
+
+    def facet_scores(self) -> dict[str, Optional[float]]:
+        """Partial score per facet name (None until an item is answered)."""
+        offset = len(self.plan.domains)
+        return {
+            name: self._group_score(offset + idx)
+            for idx, name in enumerate(self.plan.facet_names)
+        }
+
+    def snapshot(self) -> dict:
+        """Current partial scores, for logging or a live dashboard."""
+        return {
+            "answered": self.answered,
+            "domains": self.domain_scores(),
+            "facets": self.facet_scores(),
+        }
+
+    def result(self, persona: str = "unknown") -> BFI2Result:
+        """Full BFI2Result for the answers so far (missing items count as 3)."""
+        return BFI2Scorer().score(self.responses, persona=persona)
+
+
+def stop_when_below(
+    domain_code: str, threshold: float, min_items: int = 6
+) -> UpdateCallback:
+    """
+    Build an ``on_update`` callback that aborts a failed persona manipulation.
+
+    Args:
+        domain_code: Domain the persona should score high on (e.g. "N")
+        threshold: Partial score below which the manipulation has failed
+        min_items: Items of that domain to see before judging
+
+    Returns:
+        Callback returning True once the domain has at least ``min_items``
+        answers and its partial score is below ``threshold``
+    """
+    def _check(scorer: IncrementalScorer) -> bool:
+        if scorer.domain_counts()[domain_code] < min_items:
+            return False
+        score = scorer.domain_scores()[domain_code]
+        if score < threshold:
+            logger.warning(
+                "Stopping survey early: %s = %.2f after %d+ items, below %s",
+                domain_code, score, min_items, threshold)
+            return True
+        return False
+
+    return _check
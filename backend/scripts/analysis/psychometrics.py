@@ -0,0 +1,431 @@
+"""
+Psychometrics Module
+
+This module provides reliability and item statistics for the BFI-2 domains
+and facets defined in scoring.json: Cronbach's alpha, McDonald's omega
+(one-factor, principal axis), corrected item-total correlations and
+inter-item correlation matrices, with percentile bootstrap confidence
+intervals.
+
+Everything is computed from covariance matrices, batched over resamples:
+a block of bootstrap resamples is a matrix of multinomial row counts, so
+all of its covariance matrices come out of one matrix product. Blocks are
+spread over a process pool, each with its own child of one SeedSequence,
+so results are reproducible for a given seed whatever the pool size.
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from scripts.analysis.scoring_plan import ScoringPlan, get_scoring_plan
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_RESAMPLES = 1000
+DEFAULT_CONFIDENCE = 0.95
+
+# Resamples per pool task; fixed so the seed streams do not depend on the
+# number of workers
+RESAMPLES_PER_TASK = 50
+
+# Principal axis iterations for the one-factor omega model
+OMEGA_ITERATIONS = 30
+
+# Responses matrix shared with pool workers via the initializer
+_worker_responses: Optional[np.ndarray] = None
+
+
+@dataclass
+class ScaleReliability:
+    """Reliability and item statistics for one domain or facet."""
+    name: str
+    kind: str  # "domain" or "facet"
+    items: tuple[int, ...]
+    alpha: float
+    omega: float
+    mean_inter_item_r: float
+    item_total: dict[int, float]  # Corrected item-total correlation per item
+    inter_item: np.ndarray  # k × k correlation matrix, in ``items`` order
+    alpha_ci: Optional[tuple[float, float]] = None
+    omega_ci: Optional[tuple[float, float]] = None
+    mean_inter_item_r_ci: Optional[tuple[float, float]] = None
+    item_total_ci: dict[int, tuple[float, float]] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "items": list(self.items),
+            "alpha": self.alpha,
+            "alpha_ci": self.alpha_ci,
+            "omega": self.omega,
+            "omega_ci": self.omega_ci,
+            "mean_inter_item_r": self.mean_inter_item_r,
+            "mean_inter_item_r_ci": self.mean_inter_item_r_ci,
+            "item_total": self.item_total,
+            "item_total_ci": self.item_total_ci,
+            "inter_item": self.inter_item.round(4).tolist(),
+        }
+
+
+@dataclass
+class PsychometricsReport:
+    """Reliability of every domain and facet for one set of responses."""
+    n_observations: int
+    n_resamples: int
+    confidence: float
+    seed: Optional[int]
+    scales: dict[str, ScaleReliability]
+
+    def to_dict(self) -> dict:
+        return {
+            "n_observations": self.n_observations,
+            "n_resamples": self.n_resamples,
+            "confidence": self.confidence,
+            "seed": self.seed,
+            "scales": {name: scale.to_dict() for name, scale in self.scales.items()},
+        }
+
+
+def reverse_key(responses: np.ndarray, plan: Optional[ScoringPlan] = None) -> np.ndarray:
+    """Return an N × 60 copy with reverse-keyed items scored as 6 - x."""
+    plan = plan or get_scoring_plan()
+    keyed = np.array(responses, dtype=np.float64)
+    for domain in plan.domains:
+        for item, is_reverse in zip(domain.items, domain.reverse_mask):
+            if is_reverse:
+                column = plan.column_index[item]
+                keyed[:, column] = 6 - keyed[:, column]
+    return keyed
+
+
+def _one_factor_omega(corr: np.ndarray) -> np.ndarray:
+    """
+    McDonald's omega total from a one-factor principal axis solution.
+
+    Args:
+        corr: (..., k, k) correlation matrices
+
+    Returns:
+        (...) omega per matrix
+    """
+    k = corr.shape[-1]
+    diag = np.arange(k)
+
+    # Squared multiple correlations as starting communalities
+    communalities = 1 - 1 / np.diagonal(np.linalg.pinv(corr), axis1=-2, axis2=-1)
+    reduced = corr.copy()
+    for _ in range(OMEGA_ITERATIONS):
+        reduced[..., diag, diag] = communalities
+        values, vectors = np.linalg.eigh(reduced)
+        loadings = vectors[..., -1] * np.sqrt(np.clip(values[..., -1], 0, None))[..., None]
+        # Cap communalities below 1 to avoid Heywood cases
+        communalities = np.clip(loadings ** 2, 0, 0.995)
+
+    loadings = loadings * np.sign(loadings.sum(axis=-1, keepdims=True))
+    common = loadings.sum(axis=-1) ** 2
+    unique = (1 - loadings ** 2).sum(axis=-1)
+    return common / (common + unique)
+
+
+def scale_statistics(cov: np.ndarray, columns: tuple[int, ...]) -> dict[str, np.ndarray]:
+    """
+    Reliability statistics of one scale from (batched) item covariances.
+
+    Args:
+        cov: (..., 60, 60) covariance matrices of reverse-keyed items
+        columns: Positions of the scale's items
+
+    Returns:
+        Dict of alpha, omega, mean_r (each (...)), item_total (..., k) and
+        corr (..., k, k)
+    """
+    cols = np.asarray(columns)
+    scale_cov = cov[..., cols[:, None], cols]
+    k = len(cols)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variances = np.diagonal(scale_cov, axis1=-2, axis2=-1)
+        total = scale_cov.sum(axis=(-2, -1))
+        alpha = k / (k - 1) * (1 - variances.sum(axis=-1) / total)
+
+        sd = np.sqrt(variances)
+        corr = scale_cov / (sd[..., :, None] * sd[..., None, :])
+        mean_r = (corr.sum(axis=(-2, -1)) - k) / (k * (k - 1))
+
+        # Correlation of each item with the sum of the other items
+        row_sums = scale_cov.sum(axis=-1)
+        item_total = (row_sums - variances) / np.sqrt(
+            variances * (total[..., None] - 2 * row_sums + variances))
+
+        omega = np.full(alpha.shape, np.nan)
+        valid = np.isfinite(corr).all(axis=(-2, -1))
+        if valid.any():
+            omega[valid] = _one_factor_omega(corr[valid])
+
+    return {
+        "alpha": alpha,
+        "omega": omega,
+        "mean_r": mean_r,
+        "item_total": item_total,
+        "corr": corr,
+    }
+
+
+def bootstrap_covariances(responses: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Covariance matrices of many bootstrap resamples at once.
+
+    Args:
+        responses: N × p data matrix
+        counts: B × N multinomial row counts, one resample per row
+
+    Returns:
+        B × p × p sample covariance matrices
+    """
+    n, p = responses.shape
+    means = counts @ responses / n
+
+    # One weighted cross-product per resample keeps memory at O(B·p²)
+    # instead of materializing a B × N × p array
+    second = np.empty((len(counts), p, p))
+    for b, row_counts in enumerate(counts):
+        np.matmul(responses.T * row_counts, responses, out=second[b])
+    second /= n
+    return (second - means[:, :, None] * means[:, None, :]) * (n / (n - 1))
+
+
+def _init_worker(responses: np.ndarray) -> None:
+    global _worker_responses
+    _worker_responses = responses
+
+
+def _bootstrap_task(
+    seed: np.random.SeedSequence, n_resamples: int, scale_columns: list[tuple[int, ...]]
+) -> list[dict[str, np.ndarray]]:
+    """Statistics of every scale over one block of resamples (pool worker)."""
+    responses = _worker_responses
+    n = responses.shape[0]
+    rng = np.random.default_rng(seed)
+    counts = rng.multinomial(n, np.full(n, 1 / n), size=n_resamples).astype(np.float64)
+
+    cov = bootstrap_covariances(responses, counts)
+    stats = []
+    for columns in scale_columns:
+        scale = scale_statistics(cov, columns)
+        del scale["corr"]
+        stats.append(scale)
+    return stats
+
+
+def _percentile_ci(values: np.ndarray, confidence: float) -> np.ndarray:
+    """Percentile interval over the resample axis (axis 0), ignoring NaNs."""
+    tail = (1 - confidence) / 2 * 100
+    return np.nanpercentile(values, [tail, 100 - tail], axis=0)
+
+
+def analyze_reliability(
+    responses: np.ndarray,
+    n_resamples: int = DEFAULT_RESAMPLES,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: Optional[int] = 0,
+    workers: Optional[int] = None,
+    plan: Optional[ScoringPlan] = None,
+) -> PsychometricsReport:
+    """
+    Compute reliability and item statistics for every domain and facet.
+
+    Args:
+        responses: N × 60 response matrix (columns in plan item order, as
+            from score_batch inputs or ResultsTable.responses); rows with
+            missing items are dropped
+        n_resamples: Bootstrap resamples (0 to skip confidence intervals)
+        confidence: Confidence level of the percentile intervals
+        seed: Seed of the bootstrap SeedSequence (None for fresh entropy)
+        workers: Process pool size (defaults to the CPU count; 1 runs
+            in-process)
+        plan: Scoring plan defining the scales (defaults to the shared plan)
+
+    Returns:
+        PsychometricsReport keyed by domain and facet name
+    """
+    plan = plan or get_scoring_plan()
+    responses = np.asarray(responses, dtype=np.float64)
+
+    complete = ~np.isnan(responses).any(axis=1)
+    if not complete.all():
+        logger.warning(
+            "Dropping %d response sets with missing items", int((~complete).sum()))
+    keyed = reverse_key(responses[complete], plan)
+    n = keyed.shape[0]
+    if n < 3:
+        raise ValueError(f"Need at least 3 complete response sets, got {n}")
+
+    cov = np.cov(keyed, rowvar=False)
+    scale_columns = list(plan.group_columns)
+    point_stats = [scale_statistics(cov, columns) for columns in scale_columns]
+
+    boot_stats: list[list[dict[str, np.ndarray]]] = []
+    if n_resamples > 0:
+        block_sizes = [RESAMPLES_PER_TASK] * (n_resamples // RESAMPLES_PER_TASK)
+        if n_resamples % RESAMPLES_PER_TASK:
+            block_sizes.append(n_resamples % RESAMPLES_PER_TASK)
+        seeds = np.random.SeedSequence(seed).spawn(len(block_sizes))
+        workers = min(workers or os.cpu_count() or 1, len(block_sizes))
+
+        logger.info(
+            "Bootstrapping %d resamples of %d response sets in %d blocks on %d workers",
+            n_resamples, n, len(block_sizes), workers)
+
+        if workers == 1:
+            _init_worker(keyed)
+            boot_stats = [
+                _bootstrap_task(block_seed, size, scale_columns)
+                for block_seed, size in zip(seeds, block_sizes)
+            ]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(keyed,)
+            ) as pool:
+                boot_stats = list(pool.map(
+                    _bootstrap_task, seeds, block_sizes,
+                    [scale_columns] * len(block_sizes)))
+
+    scales = {}
+    for group_idx, (group, stats) in enumerate(zip(plan.groups, point_stats)):
+        kind = "domain" if group_idx < len(plan.domains) else "facet"
+        scale = ScaleReliability(
+            name=group.name,
+            kind=kind,
+            items=group.items,
+            alpha=round(float(stats["alpha"]), 4),
+            omega=round(float(stats["omega"]), 4),
+            mean_inter_item_r=round(float(stats["mean_r"]), 4),
+            item_total={
+                item: round(float(r), 4)
+                for item, r in zip(group.items, stats["item_total"])
+            },
+            inter_item=stats["corr"],
+        )
+
+        if boot_stats:
+            resampled = {
+                name: np.concatenate([block[group_idx][name] for block in boot_stats])
+                for name in ("alpha", "omega", "mean_r", "item_total")
+            }
+            ci = {
+                name: _percentile_ci(values, confidence).round(4)
+                for name, values in resampled.items()
+            }
+            scale.alpha_ci = tuple(ci["alpha"].tolist())
+            scale.omega_ci = tuple(ci["omega"].tolist())
+            scale.mean_inter_item_r_ci = tuple(ci["mean_r"].tolist())
+            scale.item_total_ci = {
+                item: (float(ci["item_total"][0, idx]), float(ci["item_total"][1, idx]))
+                for idx, item in enumerate(group.items)
+            }
+
+        scales[group.name] = scale
+
+    return PsychometricsReport(
+        n_observations=n,
+        n_resamples=n_resamples,
+        confidence=confidence,
+        seed=seed,
+        scales=scales,
+    )
+
+
+def print_report(report: PsychometricsReport) -> None:
+    """Pretty print a reliability report to console."""
+    print(f"\n{'=' * 78}")
+    print(f"BFI-2 RELIABILITY (N = {report.n_observations}, "
+          f"{report.n_resamples} bootstrap resamples, "
+          f"{report.confidence:.0%} CIs)")
+    print(f"{'=' * 78}")
+    print(f"{'Scale':<28}{'alpha':>20}{'omega':>20}{'mean r':>10}")
+
+    for scale in report.scales.values():
+        def _fmt(value: float, ci: Optional[tuple[float, float]]) -> str:
+            if ci is None:
+                return f"{value:.3f}"
+            return f"{value:.3f} [{ci[0]:.2f}, {ci[1]:.2f}]"
+
+        indent = "" if scale.kind == "domain" else "  "
+        print(
+            f"{indent + scale.name:<28}"
+            f"{_fmt(scale.alpha, scale.alpha_ci):>20}"
+            f"{_fmt(scale.omega, scale.omega_ci):>20}"
+            f"{scale.mean_inter_item_r:>10.3f}"
+        )
+
+    print(f"{'=' * 78}\n")
+
+
+def main():
+    """Main entry point with CLI argument parsing."""
+    parser = argparse.ArgumentParser(
+        description="Reliability and item statistics for stored BFI-2 responses"
+    )
+    parser.add_argument(
+        "--results-dir",
+        type=Path,
+        default=None,
+        help="Load per-run JSON response files from this folder instead of "
+        "the columnar results store",
+    )
+    parser.add_argument(
+        "--resamples",
+        "-n",
+        type=int,
+        default=DEFAULT_RESAMPLES,
+        help=f"Bootstrap resamples (default: {DEFAULT_RESAMPLES})",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=DEFAULT_CONFIDENCE,
+        help=f"Confidence level (default: {DEFAULT_CONFIDENCE})",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Bootstrap seed (default: 0)",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=None,
+        help="Process pool size (default: CPU count)",
+    )
+
+    args = parser.parse_args()
+
+    if args.results_dir is not None:
+        from scripts.analysis.results_loader import load_results
+        table = load_results(args.results_dir)
+    else:
+        from scripts.analysis.results_store import ResultsStore
+        table = ResultsStore().load()
+
+    report = analyze_reliability(
+        table.responses,
+        n_resamples=args.resamples,
+        confidence=args.confidence,
+        seed=args.seed,
+        workers=args.workers,
+    )
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Results Loader Module
+
+This module provides a bulk loader for the survey runs in the results
+directory: the columnar results store that run_pipeline appends to by
+default, plus any per-run JSON response files (``--output-format json``
+and older runs). Files are read and parsed in
+a process (or thread) pool, using orjson when it is installed and the
+standard json module otherwise, deduplicated by content hash (the "latest"
+copies repeat a timestamped file byte for byte) and assembled into one
+columnar table: a metadata column per field plus an N × 60 response matrix.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from scripts.analysis.bfi2_scorer import BFI2BatchResult, BFI2Scorer
+from scripts.analysis.scoring_plan import get_scoring_plan
+from src.utils.logger import get_logger
+
+try:
+    import orjson
+except ImportError:  # Optional fast decoder
+    orjson = None
+
+logger = get_logger(__name__)
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+RESPONSE_FILE_PATTERN = "*_responses*.json"
+
+# Files handed to a worker per task; amortizes pool overhead on small files
+LOAD_CHUNKSIZE = 64
+
+
+@dataclass
+class ResultsTable:
+    """
+    Columnar table of survey runs, one row per run.
+
+    Response columns follow ``item_ids``; unanswered items are NaN. Score
+    columns are only present when loaded from the columnar results store.
+    Rows with ``stopped_early`` set are partial runs whose stored scores
+    count the missing items as neutral.
+    """
+    persona: np.ndarray
+    model: np.ndarray
+    run_id: np.ndarray
+    timestamp: np.ndarray
+    replicate: np.ndarray
+    path: np.ndarray
+    item_ids: tuple[int, ...]
+    responses: np.ndarray  # N × 60
+    domain_scores: Optional[np.ndarray] = None  # N × 5, when stored with scores
+    facet_scores: Optional[np.ndarray] = None  # N × 15
+    n_answered: Optional[np.ndarray] = None  # N answered items
+    stopped_early: Optional[np.ndarray] = None  # N flags, run ended early
+
+    def __len__(self) -> int:
+        return self.responses.shape[0]
+
+    def score(self, scorer: Optional[BFI2Scorer] = None) -> BFI2BatchResult:
+        """Score every row through the vectorized batch path."""
+        scorer = scorer or BFI2Scorer()
+        return scorer.score_batch(self.responses, personas=self.persona.tolist())
+
+
+def _decode(raw: bytes):
+    """Parse JSON bytes with the fastest available decoder."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def parse_responses(responses, column_index: dict[int, int]) -> list[float]:
+    """
+    Convert a ``responses`` mapping into a row in column order.
+
+    Raises:
+        ValueError: If responses is not a dict of question ID to an answer
+            from 1 to 5 (None for unanswered)
+    """
+    if not isinstance(responses, dict):
+        raise ValueError(f"responses is a {type(responses).__name__}, not a dict")
+
+    row = [float("nan")] * len(column_index)
+    for item, response in responses.items():
+        if response is None:
+            continue
+        if isinstance(response, bool) or not isinstance(response, (int, float)):
+            raise ValueError(f"Response to item {item} is not a number: {response!r}")
+        if not 1 <= response <= 5:
+            raise ValueError(f"Response to item {item} is out of range: {response}")
+        idx = column_index.get(int(item))
+        if idx is not None:
+            row[idx] = float(response)
+    return row
+
+
+def _load_file(path: str) -> Optional[tuple[str, dict, list[float]]]:
+    """
+    Read, hash and parse one response file (runs in a pool worker).
+
+    Returns:
+        Tuple of (content hash, metadata, response row), or None if the
+        file cannot be read or is not a well-formed response file
+    """
+    try:
+        raw = Path(path).read_bytes()
+        data = _decode(raw)
+        if not isinstance(data, dict):
+            raise ValueError("top level is not an object")
+        row = parse_responses(data["responses"], get_scoring_plan().column_index)
+        metadata = {
+            "persona": str(data.get("persona", "unknown")),
+            "model": str(data.get("model", "")),
+            "run_id": str(data.get("run_id", "")),
+            "timestamp": str(data.get("timestamp", "")),
+            "replicate": int(data.get("replicate", 0)),
+            "stopped_early": bool(data.get("stopped_early", False)),
+            "path": path,
+        }
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        logger.debug("Skipping response file %s: %r", path, exc)
+        return None
+
+    return hashlib.sha256(raw).hexdigest(), metadata, row
+
+
+def find_response_files(results_dir: Optional[Path] = None) -> list[Path]:
+    """List every response file under the results directory."""
+    results_dir = Path(results_dir or RESULTS_DIR)
+    return sorted(results_dir.rglob(RESPONSE_FILE_PATTERN))
+
+
+def load_results(
+    results_dir: Optional[Path] = None,
+    workers: Optional[int] = None,
+    use_processes: bool = True,
+    include_store: bool = True,
+) -> ResultsTable:
+    """
+    Load every run in the results directory into one table.
+
+    Args:
+        results_dir: Folder to scan recursively (defaults to results/)
+        workers: Pool size (defaults to the CPU count; 1 loads in-process)
+        use_processes: Parse in a process pool (True) or thread pool (False)
+        include_store: Also load the columnar results store in the
+            folder's ``store/`` subdirectory
+
+    Returns:
+        ResultsTable with the store's rows followed by one row per distinct
+        JSON file content; score columns are kept only when every row came
+        from the store
+    """
+    table = _load_response_files(results_dir, workers, use_processes)
+    if not include_store:
+        return table
+
+    # Imported here: the store module builds on ResultsTable
+    from scripts.analysis.results_store import ResultsStore
+
+    store = ResultsStore(Path(results_dir or RESULTS_DIR) / "store")
+    stored = store.load(mmap=False)
+    logger.info("Loaded %d runs from the results store at %s", len(stored), store.root)
+    if not len(table):
+        return stored
+    if not len(stored):
+        return table
+
+    return ResultsTable(
+        **{
+            name: np.concatenate([getattr(stored, name), getattr(table, name)])
+            for name in (
+                "persona", "model", "run_id", "timestamp", "replicate", "path",
+                "responses", "n_answered", "stopped_early",
+            )
+        },
+        item_ids=table.item_ids,
+    )
+
+
+def _load_response_files(
+    results_dir: Optional[Path], workers: Optional[int], use_processes: bool
+) -> ResultsTable:
+    """Load the JSON response files under the results directory."""
+    paths = [str(path) for path in find_response_files(results_dir)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(paths) <= LOAD_CHUNKSIZE:
+        loaded = [_load_file(path) for path in paths]
+    else:
+        pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with pool_class(max_workers=workers) as pool:
+            loaded = list(pool.map(_load_file, paths, chunksize=LOAD_CHUNKSIZE))
+
+    seen: set[str] = set()
+    metadata: list[dict] = []
+    rows: list[list[float]] = []
+    skipped = duplicates = 0
+
+    for entry in loaded:
+        if entry is None:
+            skipped += 1
+            continue
+        digest, meta, row = entry
+        if digest in seen:
+            duplicates += 1
+            continue
+        seen.add(digest)
+        metadata.append(meta)
+        rows.append(row)
+
+    logger.info(
+        "Loaded %d runs from %d files (%d duplicates, %d unreadable or malformed)",
+        len(rows), len(paths), duplicates, skipped)
+
+    plan = get_scoring_plan()
+    responses = (
+        np.array(rows, dtype=np.float64) if rows
+        else np.empty((0, len(plan.item_ids)))
+    )
+    return ResultsTable(
+        persona=np.array([m["persona"] for m in metadata], dtype=object),
+        model=np.array([m["model"] for m in metadata], dtype=object),
+        run_id=np.array([m["run_id"] for m in metadata], dtype=object),
+        timestamp=np.array([m["timestamp"] for m in metadata], dtype=object),
+        replicate=np.array([m["replicate"] for m in metadata], dtype=np.int64),
+        path=np.array([m["path"] for m in metadata], dtype=object),
+        item_ids=plan.item_ids,
+        responses=responses,
+        n_answered=(~np.isnan(responses)).sum(axis=1),
+        stopped_early=np.array([m["stopped_early"] for m in metadata], dtype=bool),
+    )
@@ -0,0 +1,281 @@
+"""
+Results Store Module
+
+This module provides the columnar, append-only store that run_pipeline
+writes survey results to. Every append creates one immutable shard: a
+directory holding one ``.npy`` file per numeric column (item responses,
+domain scores, facet scores, replicate, answered item count and an
+early-stop flag) and a compact ``meta.json`` with the string columns
+(persona, model, run ID, timestamp). Shards are written
+to a temporary directory and renamed into place, so readers never see a
+partial shard, and numeric columns are read back memory-mapped. A merged
+shard written by compact() lists the shards it replaces, so a compaction
+interrupted before they are deleted never shows rows twice.
+"""
+
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+
+from scripts.analysis.results_loader import ResultsTable
+from scripts.analysis.scoring_plan import get_scoring_plan
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_STORE_DIR = Path(__file__).resolve().parent / "results" / "store"
+
+STRING_COLUMNS = ("persona", "model", "run_id", "timestamp")
+ARRAY_COLUMNS = (
+    "responses", "domain_scores", "facet_scores", "replicate",
+    "n_answered", "stopped_early",
+)
+
+META_FILE = "meta.json"
+# Names of the shards a merged shard supersedes
+REPLACES_FILE = "replaces.json"
+
+
+class ResultsStore:
+    """
+    Append-only columnar store of scored survey runs.
+
+    One row per survey: metadata columns, the 60 item responses (NaN when
+    unanswered), 5 domain scores and 15 facet scores, with column order
+    given by the shared ScoringPlan. Runs that stopped early are flagged
+    in ``stopped_early``, since their scores count missing items as neutral.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        """
+        Initialize the ResultsStore.
+
+        Args:
+            root: Folder holding the shards (defaults to results/store)
+        """
+        self.root = Path(root or DEFAULT_STORE_DIR)
+
+    def shard_paths(self) -> list[Path]:
+        """Live shard directories in append order (superseded ones skipped)."""
+        if not self.root.exists():
+            return []
+        paths = sorted(
+            path for path in self.root.iterdir()
+            if path.is_dir() and not path.name.startswith(".")
+        )
+
+        superseded = set()
+        for path in paths:
+            if (path / REPLACES_FILE).exists():
+                superseded.update(json.loads((path / REPLACES_FILE).read_text()))
+        return [path for path in paths if path.name not in superseded]
+
+    def append(
+        self,
+        metadata: Sequence[dict],
+        responses: np.ndarray,
+        domain_scores: np.ndarray,
+        facet_scores: np.ndarray,
+        replaces: Sequence[Path] = (),
+    ) -> Path:
+        """
+        Append rows as a new shard.
+
+        Args:
+            metadata: One dict per row with persona, model, run_id,
+                timestamp, replicate and stopped_early
+            responses: N × 60 response matrix
+            domain_scores: N × 5 domain scores
+            facet_scores: N × 15 facet scores
+            replaces: Shards whose rows this shard supersedes, in append
+                order (for compact); the new shard takes the last one's
+                place in the order
+
+        Returns:
+            Path of the new shard
+        """
+        plan = get_scoring_plan()
+        responses = np.asarray(responses, dtype=np.float64).reshape(
+            -1, len(plan.item_ids))
+        columns = {
+            "responses": responses,
+            "domain_scores": np.asarray(domain_scores, dtype=np.float64).reshape(
+                -1, len(plan.domains)),
+            "facet_scores": np.asarray(facet_scores, dtype=np.float64).reshape(
+                -1, len(plan.facet_names)),
+            "replicate": np.array(
+                [row.get("replicate", 0) for row in metadata], dtype=np.int64),
+            "n_answered": (~np.isnan(responses)).sum(axis=1).astype(np.int64),
+            "stopped_early": np.array(
+                [bool(row.get("stopped_early", False)) for row in metadata], dtype=bool),
+        }
+        n_rows = len(metadata)
+        for name, column in columns.items():
+            if len(column) != n_rows:
+                raise ValueError(
+                    f"Column {name} has {len(column)} rows, expected {n_rows}")
+
+        # Shards sort by their timestamp prefix; a merged shard reuses the
+        # timestamp of the last shard it replaces, so it stays ahead of
+        # any shard appended while it was being written
+        if replaces:
+            stamp = Path(replaces[-1]).name.rsplit("_", 1)[0]
+        else:
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        shard_name = f"{stamp}_{uuid.uuid4().hex[:8]}"
+        tmp_path = self.root / f".{shard_name}.tmp"
+        tmp_path.mkdir(parents=True)
+
+        try:
+            for name, column in columns.items():
+                np.save(tmp_path / f"{name}.npy", column)
+
+            meta = {
+                "rows": n_rows,
+                "item_ids": list(plan.item_ids),
+                "domain_codes": plan.domain_codes,
+                "facet_names": plan.facet_names,
+                **{name: [str(row.get(name, "")) for row in metadata]
+                   for name in STRING_COLUMNS},
+            }
+            (tmp_path / META_FILE).write_text(json.dumps(meta))
+            if replaces:
+                (tmp_path / REPLACES_FILE).write_text(
+                    json.dumps([Path(path).name for path in replaces]))
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        # Once renamed, the shard (and what it replaces) takes effect at once
+        shard_path = self.root / shard_name
+        os.replace(tmp_path, shard_path)
+        logger.debug("Appended %d rows to results store shard %s", n_rows, shard_path)
+        return shard_path
+
+    def _read_shard(self, shard_path: Path, mmap: bool) -> ResultsTable:
+        """Read one shard; numeric columns are memory-mapped when requested."""
+        meta = json.loads((shard_path / META_FILE).read_text())
+        mmap_mode = "r" if mmap else None
+        arrays = {
+            name: np.load(shard_path / f"{name}.npy", mmap_mode=mmap_mode)
+            for name in ARRAY_COLUMNS
+            if (shard_path / f"{name}.npy").exists()
+        }
+        # Shards written before the early-stop columns existed
+        if "n_answered" not in arrays:
+            arrays["n_answered"] = (~np.isnan(arrays["responses"])).sum(axis=1)
+        if "stopped_early" not in arrays:
+            arrays["stopped_early"] = np.zeros(meta["rows"], dtype=bool)
+        return ResultsTable(
+            **{name: np.array(meta[name], dtype=object) for name in STRING_COLUMNS},
+            replicate=arrays["replicate"],
+            path=np.full(meta["rows"], str(shard_path), dtype=object),
+            item_ids=tuple(meta["item_ids"]),
+            responses=arrays["responses"],
+            domain_scores=arrays["domain_scores"],
+            facet_scores=arrays["facet_scores"],
+            n_answered=arrays["n_answered"],
+            stopped_early=arrays["stopped_early"],
+        )
+
+    def iter_shards(self, mmap: bool = True) -> Iterator[ResultsTable]:
+        """Yield each shard as a table, without concatenating."""
+        for shard_path in self.shard_paths():
+            yield self._read_shard(shard_path, mmap)
+
+    def load(self, mmap: bool = True) -> ResultsTable:
+        """
+        Load the whole store as one table.
+
+        A single-shard store is returned memory-mapped; several shards are
+        concatenated into memory (run compact() to merge them on disk).
+
+        Args:
+            mmap: Memory-map numeric columns instead of reading them
+
+        Returns:
+            ResultsTable with score columns
+        """
+        return self._concat(list(self.iter_shards(mmap=mmap)))
+
+    def _concat(self, shards: list[ResultsTable]) -> ResultsTable:
+        """Join shard tables in order; a single shard is returned as is."""
+        if len(shards) == 1:
+            return shards[0]
+        if not shards:
+            plan = get_scoring_plan()
+            return ResultsTable(
+                **{name: np.array([], dtype=object) for name in STRING_COLUMNS},
+                replicate=np.array([], dtype=np.int64),
+                path=np.array([], dtype=object),
+                item_ids=plan.item_ids,
+                responses=np.empty((0, len(plan.item_ids))),
+                domain_scores=np.empty((0, len(plan.domains))),
+                facet_scores=np.empty((0, len(plan.facet_names))),
+                n_answered=np.array([], dtype=np.int64),
+                stopped_early=np.array([], dtype=bool),
+            )
+
+        return ResultsTable(
+            **{
+                name: np.concatenate([getattr(shard, name) for shard in shards])
+                for name in (*STRING_COLUMNS, *ARRAY_COLUMNS, "path")
+            },
+            item_ids=shards[0].item_ids,
+        )
+
+    def compact(self) -> Optional[Path]:
+        """
+        Merge all shards into one, so later reads are a single memory map.
+
+        The merged shard is written under a temporary name and swapped in
+        with os.replace, and only then are the old shards removed. Until
+        they are gone, the merged shard's replaces list hides them, so a
+        crash in between leaves no duplicate rows; the leftovers are
+        removed by the next compaction. Shards appended while compact()
+        runs are left alone and keep sorting after the merged shard.
+
+        Returns:
+            Path of the merged shard, or None if there was nothing to merge
+        """
+        old_shards = self.shard_paths()
+
+        # Finish an interrupted compaction: its sources are already merged
+        for shard_path in old_shards:
+            if (shard_path / REPLACES_FILE).exists():
+                self._remove_replaced(shard_path)
+
+        if len(old_shards) < 2:
+            return None
+
+        # Read exactly the snapshot, so concurrent appends are not merged
+        table = self._concat([self._read_shard(path, mmap=True) for path in old_shards])
+        metadata = [
+            {
+                **{name: getattr(table, name)[idx] for name in STRING_COLUMNS},
+                "replicate": int(table.replicate[idx]),
+                "stopped_early": bool(table.stopped_early[idx]),
+            }
+            for idx in range(len(table))
+        ]
+        merged = self.append(
+            metadata, table.responses, table.domain_scores, table.facet_scores,
+            replaces=old_shards,
+        )
+
+        self._remove_replaced(merged)
+
+        logger.info("Compacted %d shards into %s", len(old_shards), merged)
+        return merged
+
+    def _remove_replaced(self, merged: Path) -> None:
+        """Delete the shards a merged shard replaces, then its replaces list."""
+        for name in json.loads((merged / REPLACES_FILE).read_text()):
+            shutil.rmtree(self.root / name, ignore_errors=True)
+        (merged / REPLACES_FILE).unlink()
@@ -0,0 +1,450 @@
+"""
+Run Catalog Module
+
+This module provides the database-backed catalog of survey runs. Runs,
+per-item answers (with request latency and token usage) and domain/facet
+scores are stored in indexed tables in the database configured by
+``database_url`` in settings: SQLite by default, PostgreSQL when
+``DATABASE__TYPE=postgresql`` (requires the optional ``psycopg`` package).
+
+Writes are buffered and flushed in batches inside one transaction, and
+connections come from a small pool shared by every thread in the process.
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from src.settings import app_settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id TEXT PRIMARY KEY,
+        persona TEXT NOT NULL,
+        model TEXT NOT NULL,
+        backend TEXT,
+        mode TEXT,
+        temperature REAL,
+        replicate INTEGER NOT NULL DEFAULT 0,
+        total_questions INTEGER,
+        stopped_early INTEGER NOT NULL DEFAULT 0,
+        started_at TEXT,
+        completed_at TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS answers (
+        run_id TEXT NOT NULL REFERENCES runs (run_id),
+        question_id INTEGER NOT NULL,
+        answer REAL NOT NULL,
+        latency_ms REAL,
+        prompt_tokens REAL,
+        completion_tokens REAL,
+        cached INTEGER,
+        PRIMARY KEY (run_id, question_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS scores (
+        run_id TEXT NOT NULL REFERENCES runs (run_id),
+        scale TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        score REAL NOT NULL,
+        PRIMARY KEY (run_id, scale)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_runs_persona_model ON runs (persona, model)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_model ON runs (model)",
+    "CREATE INDEX IF NOT EXISTS idx_scores_scale_score ON scores (scale, score)",
+)
+
+# Columns added after the first release, applied to existing databases
+MIGRATIONS = (
+    ("runs", "stopped_early", "INTEGER NOT NULL DEFAULT 0"),
+)
+
+UPSERT_RUN = """
+    INSERT INTO runs (run_id, persona, model, backend, mode, temperature,
+                      replicate, total_questions, stopped_early, started_at,
+                      completed_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (run_id) DO UPDATE SET
+        total_questions = excluded.total_questions,
+        stopped_early = excluded.stopped_early,
+        completed_at = excluded.completed_at
+"""
+
+UPSERT_ANSWER = """
+    INSERT INTO answers (run_id, question_id, answer, latency_ms,
+                         prompt_tokens, completion_tokens, cached)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (run_id, question_id) DO UPDATE SET
+        answer = excluded.answer,
+        latency_ms = excluded.latency_ms,
+        prompt_tokens = excluded.prompt_tokens,
+        completion_tokens = excluded.completion_tokens,
+        cached = excluded.cached
+"""
+
+UPSERT_SCORE = """
+    INSERT INTO scores (run_id, scale, kind, score)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (run_id, scale) DO UPDATE SET
+        kind = excluded.kind,
+        score = excluded.score
+"""
+
+# Buffered statements are flushed in this order so foreign keys resolve
+WRITE_ORDER = (UPSERT_RUN, UPSERT_ANSWER, UPSERT_SCORE)
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of DB-API connections.
+
+    Connections are created lazily up to ``size``; callers beyond that wait
+    for one to be returned.
+    """
+
+    def __init__(self, connect: Callable[[], Any], size: int):
+        self._connect = connect
+        self._pool: "queue.LifoQueue" = queue.LifoQueue()
+        self._created = 0
+        self._size = size
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Borrow a connection; commits on success, rolls back on error."""
+        conn = None
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if self._created < self._size:
+                    # Counted only once connected, so a failed connect
+                    # does not use up a slot
+                    conn = self._connect()
+                    self._created += 1
+            if conn is None:
+                conn = self._pool.get()
+
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    """Whether a SQLite URL names an in-memory database."""
+    return url.split("sqlite:///", 1)[-1] in ("", ":memory:")
+
+
+def _sqlite_connector(url: str) -> Callable[[], sqlite3.Connection]:
+    """Connection factory for a ``sqlite:///path`` URL."""
+    if _is_sqlite_memory(url):
+        path = ":memory:"
+    else:
+        path = Path(url.split("sqlite:///", 1)[1])
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    def connect() -> sqlite3.Connection:
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    return connect
+
+
+def _postgres_connector(url: str) -> Callable[[], Any]:
+    """Connection factory for a PostgreSQL URL (imports psycopg lazily)."""
+    try:
+        import psycopg
+    except ImportError as exc:
+        raise ImportError(
+            "PostgreSQL run catalog requires the psycopg package "
+            "(pip install 'psycopg[binary]')"
+        ) from exc
+
+    settings = app_settings.postgresql
+
+    def connect():
+        return psycopg.connect(
+            url,
+            sslmode=settings.ssl_mode,
+            options=f"-c search_path={settings.db_schema}",
+        )
+
+    return connect
+
+
+class RunCatalog:
+    """
+    Indexed store of survey runs, answers and scores.
+
+    ``record_*`` calls only buffer rows; they are written in one transaction
+    per ``flush``, which happens automatically once ``batch_size`` rows are
+    pending and on ``close``.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ):
+        """
+        Initialize the RunCatalog and create its tables if needed.
+
+        Args:
+            url: Database URL (defaults to settings.database_url)
+            pool_size: Maximum open connections (defaults to settings)
+            batch_size: Pending rows that trigger a flush (defaults to settings)
+        """
+        self.url = url or app_settings.database_url
+        self.batch_size = batch_size or app_settings.database.write_batch_size
+
+        if self.url.startswith("sqlite"):
+            connect = _sqlite_connector(self.url)
+            self._placeholder = "?"
+        elif self.url.startswith(("postgresql", "postgres")):
+            connect = _postgres_connector(self.url)
+            self._placeholder = "%s"
+        else:
+            raise ValueError(f"Unsupported run catalog database URL: {self.url}")
+
+        pool_size = pool_size or app_settings.database.pool_size
+        if self.url.startswith("sqlite") and _is_sqlite_memory(self.url):
+            # Every connection to :memory: opens its own empty database
+            pool_size = 1
+
+        self.pool = ConnectionPool(connect, pool_size)
+        self._pending: dict[str, list[tuple]] = {sql: [] for sql in WRITE_ORDER}
+        self._pending_rows = 0
+        self._lock = threading.Lock()
+        # Flushes run one at a time, so a run's row always commits before
+        # the answers and scores that reference it
+        self._flush_lock = threading.Lock()
+
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            for statement in SCHEMA:
+                cursor.execute(statement)
+        self._migrate()
+
+        logger.debug("Opened run catalog at %s", self.url.split("@")[-1])
+
+    def _migrate(self) -> None:
+        """Add columns missing from tables created by an older schema."""
+        for table, column, definition in MIGRATIONS:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"SELECT * FROM {table} LIMIT 0")
+                if column in [description[0] for description in cursor.description]:
+                    continue
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                logger.info("Added column %s.%s to the run catalog", table, column)
+
+    def _sql(self, statement: str) -> str:
+        """Adapt a ``?``-parameterized statement to the driver's paramstyle."""
+        return statement.replace("?", self._placeholder)
+
+    def _buffer(self, statement: str, rows: list[tuple]) -> None:
+        """Queue rows for writing and flush once the batch is full."""
+        with self._lock:
+            self._pending[statement].extend(rows)
+            self._pending_rows += len(rows)
+            full = self._pending_rows >= self.batch_size
+        if full:
+            self.flush()
+
+    def record_run(
+        self,
+        run_id: str,
+        persona: str,
+        model: str,
+        backend: Optional[str] = None,
+        mode: Optional[str] = None,
+        temperature: Optional[float] = None,
+        replicate: int = 0,
+        total_questions: Optional[int] = None,
+        stopped_early: bool = False,
+        started_at: Optional[str] = None,
+        completed_at: Optional[str] = None,
+    ) -> None:
+        """
+        Buffer one run record (re-recording a run updates its totals).
+
+        ``total_questions`` is the number of items answered; runs with
+        ``stopped_early`` set have scores that count missing items as neutral.
+        """
+        self._buffer(UPSERT_RUN, [(
+            run_id, persona, model, backend, mode, temperature, replicate,
+            total_questions, int(stopped_early), started_at,
+            completed_at or datetime.now().isoformat(),
+        )])
+
+    def record_answers(
+        self,
+        run_id: str,
+        answers: dict[int, float],
+        item_stats: Optional[dict[int, dict]] = None,
+    ) -> None:
+        """
+        Buffer a run's answers.
+
+        Args:
+            run_id: Run the answers belong to
+            answers: Dictionary mapping question IDs to responses
+            item_stats: Per-question request stats (latency_ms,
+                prompt_tokens, completion_tokens, cached), as collected in
+                PersonaAgent.item_stats
+        """
+        item_stats = item_stats or {}
+        rows = []
+        for question_id, answer in answers.items():
+            stats = item_stats.get(question_id, {})
+            cached = stats.get("cached")
+            rows.append((
+                run_id, int(question_id), float(answer),
+                stats.get("latency_ms"), stats.get("prompt_tokens"),
+                stats.get("completion_tokens"),
+                None if cached is None else int(cached),
+            ))
+        self._buffer(UPSERT_ANSWER, rows)
+
+    def record_scores(
+        self,
+        run_id: str,
+        domain_scores: dict[str, float],
+        facet_scores: dict[str, float],
+    ) -> None:
+        """Buffer a run's domain (by code) and facet (by name) scores."""
+        self._buffer(UPSERT_SCORE, [
+            *((run_id, code, "domain", score) for code, score in domain_scores.items()),
+            *((run_id, name, "facet", score) for name, score in facet_scores.items()),
+        ])
+
+    def flush(self) -> int:
+        """
+        Write all pending rows in a single transaction.
+
+        Flushes are serialized: rows buffered together are written in
+        WRITE_ORDER, and an earlier flush commits before a later one
+        starts. If the write fails the rows stay buffered for the next flush and
+        the error is re-raised.
+
+        Returns:
+            Number of rows written
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending = self._pending
+                written = self._pending_rows
+                self._pending = {sql: [] for sql in WRITE_ORDER}
+                self._pending_rows = 0
+
+            if not written:
+                return 0
+
+            try:
+                with self.pool.connection() as conn:
+                    cursor = conn.cursor()
+                    for statement in WRITE_ORDER:
+                        if pending[statement]:
+                            cursor.executemany(self._sql(statement), pending[statement])
+            except Exception:
+                # The transaction was rolled back; requeue the rows ahead of
+                # any buffered since, so the next flush retries them in order
+                with self._lock:
+                    for statement in WRITE_ORDER:
+                        self._pending[statement][:0] = pending[statement]
+                    self._pending_rows += written
+                logger.error("Run catalog flush failed; %d rows kept for retry", written)
+                raise
+
+        logger.debug("Flushed %d rows to the run catalog", written)
+        return written
+
+    def _query(self, statement: str, params: tuple = ()) -> list[dict]:
+        """Run a read query and return rows as dicts."""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(self._sql(statement), params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def find_runs(
+        self,
+        persona: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> list[dict]:
+        """
+        Look up runs by persona and/or model (served by the runs indexes).
+
+        Args:
+            persona: Persona name to match
+            model: Model to match
+
+        Returns:
+            Matching run records, oldest first
+        """
+        self.flush()
+        conditions, params = [], []
+        if persona is not None:
+            conditions.append("persona = ?")
+            params.append(persona)
+        if model is not None:
+            conditions.append("model = ?")
+            params.append(model)
+
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._query(
+            f"SELECT * FROM runs{where} ORDER BY started_at", tuple(params))
+
+    def get_answers(self, run_id: str) -> list[dict]:
+        """Answers and request stats of one run, in question order."""
+        self.flush()
+        return self._query(
+            "SELECT * FROM answers WHERE run_id = ? ORDER BY question_id", (run_id,))
+
+    def get_scores(self, run_id: str) -> dict[str, float]:
+        """Domain and facet scores of one run, keyed by scale."""
+        self.flush()
+        rows = self._query(
+            "SELECT scale, score FROM scores WHERE run_id = ?", (run_id,))
+        return {row["scale"]: row["score"] for row in rows}
+
+    def close(self) -> None:
+        """Flush pending rows and close pooled connections."""
+        self.flush()
+        self.pool.close()
+
+
+@lru_cache()
+def get_run_catalog() -> RunCatalog:
+    """Get the process-wide run catalog configured in settings."""
+    return RunCatalog()
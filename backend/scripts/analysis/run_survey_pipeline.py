@@ -5,26 +5,53 @@ This script runs the complete pipeline:
 1. Creates a PersonaAgent with the specified persona
 2. Has the agent take the BFI-2 survey
 3. Scores the responses
-4. Saves and displays results
+4. Saves and displays results (columnar results store by default, or
+   per-run JSON files)
+5. Prints a summary of the run's request metrics (latency, tokens,
+   retries, cache hits, parse failures), optionally exported as JSONL
+   and Prometheus text
 """
 
 import argparse
+import asyncio
 import json
 from datetime import datetime
 from pathlib import Path
 
-from scripts.agent_pretest.persona_agent import PersonaAgent
+from scripts.agent_pretest.llm_backends import available_backends
+from scripts.agent_pretest.persona_agent import PersonaAgent, list_personas
+from scripts.agent_pretest.request_metrics import format_summary, get_metrics
+from scripts.agent_pretest.survey_journal import SurveyJournal
 from scripts.analysis.bfi2_scorer import BFI2Scorer, print_results
+from scripts.analysis.incremental_scorer import UpdateCallback
+from scripts.analysis.results_store import ResultsStore
+from scripts.analysis.run_catalog import get_run_catalog
 from src.settings import app_settings
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+OUTPUT_FORMATS = ("columnar", "json")
+
 
 def run_pipeline(
     persona_name: str = "high_agreeableness",
     model: str | None = None,
     verbose: bool = True,
+    concurrency: int = 1,
+    batch_size: int | None = None,
+    replicate: int = 0,
+    use_cache: bool = True,
+    refresh_cache: bool = False,
+    logprobs: bool = False,
+    run_id: str | None = None,
+    backend: str | None = None,
+    stream: bool = False,
+    output_format: str = "columnar",
+    catalog: bool = True,
+    on_update: UpdateCallback | None = None,
+    metrics_jsonl: Path | None = None,
+    metrics_prometheus: Path | None = None,
 ) -> dict:
     """
     Run the complete BFI-2 survey pipeline for a persona.
@@ -33,20 +60,54 @@ def run_pipeline(
         persona_name: Name of the persona profile
         model: Model to use (defaults to settings)
         verbose: Whether to print progress
+        concurrency: Maximum in-flight requests; values above 1 use the
+            async survey mode
+        batch_size: If set, ask this many questions per request using the
+            batched structured-output mode (takes precedence over concurrency)
+        replicate: Replicate index, used to keep cached samples distinct
+        use_cache: Whether to read and write the LLM response cache
+        refresh_cache: Ignore cached responses and overwrite them
+        logprobs: Record per-item response distributions from token
+            logprobs and score their expected values
+        run_id: Run ID to resume; answers already in its journal are not
+            asked again (defaults to a new run)
+        backend: LLM backend name (defaults to settings)
+        stream: Stream single-question answers and stop at the first valid digit
+        output_format: "columnar" to append a row to the results store, or
+            "json" to write per-run responses and scored JSON files
+        catalog: Record the run, its answers (with latency and token
+            usage) and scores in the database run catalog
+        on_update: Called with the agent's live scores after every answer;
+            returning True stops the survey early
+        metrics_jsonl: Write the process's request metrics (histograms,
+            counters and per-request records) as JSONL to this file
+        metrics_prometheus: Write the request metrics in the Prometheus
+            text format to this file
 
     Returns:
-        Dictionary with responses and scored results
+        Dictionary with responses, scored results and the run's request
+        metrics summary
     """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unknown output format '{output_format}', expected one of {OUTPUT_FORMATS}")
+
     # Use model from settings if not specified
     model = model or app_settings.openrouter.model_name
 
     results_dir = Path(__file__).resolve().parent / "results"
     results_dir.mkdir(parents=True, exist_ok=True)
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    started_at = datetime.now()
+    timestamp = started_at.strftime("%Y%m%d_%H%M%S")
+
+    run_id = run_id or SurveyJournal.new_run_id(persona_name)
+    journal = SurveyJournal(run_id)
+    resuming = journal.exists
 
     logger.info(
-        f"Starting pipeline for persona: {persona_name}, model: {model}")
+        "%s pipeline run %s for persona: %s, model: %s",
+        "Resuming" if resuming else "Starting", run_id, persona_name, model)
 
     # Step 1: Create agent and take survey
     if verbose:
@@ -54,26 +115,64 @@ def run_pipeline(
         print(f"# STEP 1: Agent Taking BFI-2 Survey")
         print(f"# Persona: {persona_name}")
         print(f"# Model: {model}")
+        print(f"# Run ID: {run_id}{' (resumed)' if resuming else ''}")
         print(f"{'#' * 70}")
 
-    agent = PersonaAgent(persona_name=persona_name, model=model)
-    responses = agent.take_survey(verbose=verbose)
+    agent = PersonaAgent(
+        persona_name=persona_name,
+        model=model,
+        replicate=replicate,
+        use_cache=use_cache,
+        refresh_cache=refresh_cache,
+        backend=backend,
+        stream=stream,
+        run_id=run_id,
+    )
+    distributions = None
+    if logprobs:
+        mode = "logprobs"
+        distributions = agent.take_survey_distribution(
+            verbose=verbose, journal=journal, on_update=on_update)
+        responses = {
+            question_id: round(distribution.expected, 4)
+            for question_id, distribution in distributions.items()
+        }
+    elif batch_size:
+        mode = "batched"
+        responses = agent.take_survey_batched(
+            batch_size=batch_size, verbose=verbose, journal=journal,
+            on_update=on_update)
+    elif concurrency > 1:
+        mode = "async"
+        responses = asyncio.run(
+            agent.take_survey_async(
+                concurrency=concurrency, verbose=verbose, journal=journal,
+                on_update=on_update)
+        )
+    else:
+        mode = "sequential"
+        responses = agent.take_survey(
+            verbose=verbose, journal=journal, on_update=on_update)
 
-    # Save raw responses
-    responses_path = results_dir / f"{persona_name}_responses_{timestamp}.json"
     responses_data = {
         "persona": persona_name,
         "model": model,
+        "run_id": run_id,
         "timestamp": timestamp,
+        "replicate": replicate,
         "total_questions": len(responses),
         "responses": responses,
     }
-
-    responses_path.write_text(json.dumps(responses_data, indent=2))
-    logger.info(f"Responses saved to: {responses_path}")
-
-    if verbose:
-        print(f"\nResponses saved to: {responses_path}")
+    if agent.stopped_early:
+        responses_data["stopped_early"] = True
+        logger.warning(
+            "Run %s stopped early with %d of %d questions answered",
+            run_id, len(responses), len(agent.questions))
+    if distributions is not None:
+        responses_data["distributions"] = {
+            question_id: distribution.to_dict()
+            for question_id, distribution in distributions.items()
+        }
 
     # Step 2: Score the responses
     if verbose:
@@ -82,46 +181,96 @@ def run_pipeline(
         print(f"{'#' * 70}")
 
     scorer = BFI2Scorer()
-    result = scorer.score(responses, persona=persona_name)
+    if distributions is not None:
+        result = scorer.score_distributions(distributions, persona=persona_name)
+    else:
+        result = scorer.score(responses, persona=persona_name)
+    n_domains = len(scorer.plan.domains)
 
     # Print results
     if verbose:
         print_results(result)
 
-    # Save scored results
-    scored_path = results_dir / f"{persona_name}_scored_{timestamp}.json"
-    scored_path.write_text(json.dumps(result.to_dict(), indent=2))
-    logger.info(f"Scored results saved to: {scored_path}")
-
-    if verbose:
-        print(f"Scored results saved to: {scored_path}")
-
-    # Also save a "latest" version for easy access
-    latest_responses = results_dir / f"{persona_name}_responses.json"
-    latest_scored = results_dir / f"{persona_name}_scored.json"
-
-    latest_responses.write_text(json.dumps(responses_data, indent=2))
-    latest_scored.write_text(json.dumps(result.to_dict(), indent=2))
+    # Step 3: Save results
+    if output_format == "columnar":
+        # Per-item distributions stay in the run's journal
+        shard_path = ResultsStore().append(
+            metadata=[{
+                "persona": persona_name,
+                "model": model,
+                "run_id": run_id,
+                "timestamp": timestamp,
+                "replicate": replicate,
+                "stopped_early": agent.stopped_early,
+            }],
+            responses=scorer.responses_to_matrix([responses]),
+            domain_scores=[result.scores[:n_domains]],
+            facet_scores=[result.scores[n_domains:]],
+        )
+        paths = {"store": str(shard_path)}
+        logger.info("Results appended to store shard: %s", shard_path)
+    else:
+        responses_path = results_dir / f"{persona_name}_responses_{timestamp}.json"
+        responses_path.write_text(json.dumps(responses_data, indent=2))
+        logger.info("Responses saved to: %s", responses_path)
+
+        scored_path = results_dir / f"{persona_name}_scored_{timestamp}.json"
+        scored_path.write_text(json.dumps(result.to_dict(), indent=2))
+        logger.info("Scored results saved to: %s", scored_path)
+
+        paths = {"responses": str(responses_path), "scored": str(scored_path)}
+
+    if catalog:
+        run_catalog = get_run_catalog()
+        run_catalog.record_run(
+            run_id=run_id,
+            persona=persona_name,
+            model=model,
+            backend=agent.backend,
+            mode=mode,
+            temperature=agent.temperature,
+            replicate=replicate,
+            total_questions=len(responses),
+            stopped_early=agent.stopped_early,
+            started_at=started_at.isoformat(),
+        )
+        run_catalog.record_answers(run_id, responses, agent.item_stats)
+        run_catalog.record_scores(
+            run_id,
+            domain_scores=result.summary,
+            facet_scores=dict(zip(scorer.plan.facet_names, result.scores[n_domains:])),
+        )
+        run_catalog.flush()
+        logger.info("Run %s recorded in the run catalog", run_id)
+
+    metrics = get_metrics()
+    if metrics_jsonl is not None:
+        metrics.write_jsonl(metrics_jsonl)
+        paths["metrics_jsonl"] = str(metrics_jsonl)
+    if metrics_prometheus is not None:
+        metrics.write_prometheus(metrics_prometheus)
+        paths["metrics_prometheus"] = str(metrics_prometheus)
+    metrics_summary = metrics.summary(run_id=run_id)
 
     if verbose:
         print(f"\n{'#' * 70}")
         print(f"# PIPELINE COMPLETE")
         print(f"{'#' * 70}")
+        print(f"\nRequest metrics:")
+        for line in format_summary(metrics_summary).splitlines():
+            print(f"  {line}")
         print(f"\nFiles saved:")
-        print(f"  • {responses_path}")
-        print(f"  • {scored_path}")
-        print(f"  • {latest_responses} (latest)")
-        print(f"  • {latest_scored} (latest)")
+        for path in paths.values():
+            print(f"  • {path}")
 
+    logger.info("Request metrics: %s", metrics_summary)
     logger.info("Pipeline complete")
 
     return {
         "responses": responses_data,
         "result": result.to_dict(),
-        "paths": {
-            "responses": str(responses_path),
-            "scored": str(scored_path),
-        },
+        "paths": paths,
+        "metrics": metrics_summary,
     }
 
 
@@ -135,12 +284,7 @@ def main():
         "-p",
         type=str,
         default="high_agreeableness",
-        choices=[
-            "high_agreeableness",
-            "high_conscientiousness",
-            "high_neuroticism",
-            "neutral_control",
-        ],
+        choices=list_personas(),
         help="Persona name (default: high_agreeableness)",
     )
     parser.add_argument(
@@ -150,6 +294,86 @@ def main():
         default=None,
         help=f"Model to use (default: from settings - {app_settings.openrouter.model_name})",
     )
+    parser.add_argument(
+        "--concurrency",
+        "-c",
+        type=int,
+        default=1,
+        help="Maximum in-flight requests while taking the survey (default: 1)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        "-b",
+        type=int,
+        default=None,
+        help="Ask this many questions per request using JSON answers "
+        "(default: one question per request)",
+    )
+    parser.add_argument(
+        "--replicate",
+        "-r",
+        type=int,
+        default=0,
+        help="Replicate index; each index gets its own cached responses (default: 0)",
+    )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default=None,
+        choices=available_backends(),
+        help=f"LLM backend (default: from settings - {app_settings.backend.name})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the LLM response cache",
+    )
+    parser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Ignore cached responses and overwrite them with fresh ones",
+    )
+    parser.add_argument(
+        "--logprobs",
+        action="store_true",
+        help="Record response distributions from token logprobs (one call per item)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream answers and stop reading at the first valid 1-5 digit",
+    )
+    parser.add_argument(
+        "--run-id",
+        type=str,
+        default=None,
+        help="Resume the run with this ID, skipping questions already answered",
+    )
+    parser.add_argument(
+        "--output-format",
+        type=str,
+        default="columnar",
+        choices=OUTPUT_FORMATS,
+        help="Append to the columnar results store, or write per-run JSON "
+        "files (default: columnar)",
+    )
+    parser.add_argument(
+        "--no-catalog",
+        action="store_true",
+        help="Do not record the run in the database run catalog",
+    )
+    parser.add_argument(
+        "--metrics-jsonl",
+        type=Path,
+        default=None,
+        help="Write request metrics and per-request records as JSONL to this file",
+    )
+    parser.add_argument(
+        "--metrics-prometheus",
+        type=Path,
+        default=None,
+        help="Write request metrics in Prometheus text format to this file",
+    )
     parser.add_argument(
         "--quiet",
         "-q",
@@ -160,12 +384,30 @@ def main():
     args = parser.parse_args()
 
     logger.info(
-        f"CLI args: persona={args.persona}, model={args.model}, quiet={args.quiet}")
+        "CLI args: persona=%s, model=%s, concurrency=%s, batch_size=%s, "
+        "replicate=%s, no_cache=%s, refresh_cache=%s, logprobs=%s, stream=%s, "
+        "run_id=%s, output_format=%s, quiet=%s",
+        args.persona, args.model, args.concurrency, args.batch_size,
+        args.replicate, args.no_cache, args.refresh_cache, args.logprobs,
+        args.stream, args.run_id, args.output_format, args.quiet)
 
     run_pipeline(
         persona_name=args.persona,
         model=args.model,
         verbose=not args.quiet,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        replicate=args.replicate,
+        use_cache=not args.no_cache,
+        refresh_cache=args.refresh_cache,
+        logprobs=args.logprobs,
+        run_id=args.run_id,
+        backend=args.backend,
+        stream=args.stream,
+        output_format=args.output_format,
+        catalog=not args.no_catalog,
+        metrics_jsonl=args.metrics_jsonl,
+        metrics_prometheus=args.metrics_prometheus,
     )
 
 
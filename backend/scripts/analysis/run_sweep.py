@@ -0,0 +1,444 @@
+"""
+BFI-2 Sweep Runner
+
+This script runs the survey pipeline over a grid of conditions:
+1. Expands personas × models × temperatures × replicates into runs
+2. Runs the surveys concurrently, a bounded number at a time, under one
+   global request budget
+3. Scores each completed survey
+4. Writes one consolidated results table (CSV, one row per run) and
+   records every run in the database run catalog
+"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from scripts.agent_pretest.llm_backends import available_backends
+from scripts.agent_pretest.persona_agent import PersonaAgent, list_personas
+from scripts.agent_pretest.survey_journal import SurveyJournal
+from scripts.analysis.bfi2_scorer import BFI2Result, BFI2Scorer
+from scripts.analysis.run_catalog import RunCatalog, get_run_catalog
+from src.settings import app_settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_SWEEP_CONCURRENCY = 32
+# Surveys in progress at once; each queues one task per question
+DEFAULT_MAX_ACTIVE_RUNS = 8
+
+
+@dataclass(frozen=True)
+class SweepCondition:
+    """A single cell of the sweep grid."""
+    persona: str
+    model: str
+    temperature: float
+    replicate: int
+
+
+def build_grid(
+    personas: list[str],
+    models: list[str],
+    temperatures: list[float],
+    replicates: int,
+) -> list[SweepCondition]:
+    """Expand the sweep parameters into the full list of conditions."""
+    return [
+        SweepCondition(persona, model, temperature, replicate)
+        for persona, model, temperature, replicate in itertools.product(
+            personas, models, temperatures, range(replicates)
+        )
+    ]
+
+
+def _record_run(
+    catalog: RunCatalog,
+    run_id: str,
+    condition: SweepCondition,
+    agent: PersonaAgent,
+    responses: dict[int, int],
+    result: BFI2Result,
+    started_at: datetime,
+) -> str:
+    """
+    Record one completed sweep run, its answers and scores in the catalog.
+
+    Returns:
+        The catalog error, or "" if the run was recorded; a failed write
+        does not fail the run, whose rows stay buffered for the next flush
+    """
+    try:
+        catalog.record_run(
+            run_id=run_id,
+            persona=condition.persona,
+            model=condition.model,
+            backend=agent.backend,
+            mode="async",
+            temperature=condition.temperature,
+            replicate=condition.replicate,
+            total_questions=len(responses),
+            stopped_early=agent.stopped_early,
+            started_at=started_at.isoformat(),
+        )
+        catalog.record_answers(run_id, responses, agent.item_stats)
+        catalog.record_scores(
+            run_id,
+            domain_scores=result.summary,
+            facet_scores={
+                facet_name: facet.score
+                for domain in result.domains.values()
+                for facet_name, facet in domain.facets.items()
+            },
+        )
+    except Exception as exc:
+        logger.error("Recording run %s in the run catalog failed: %r", run_id, exc)
+        return repr(exc)
+    return ""
+
+
+async def _run_condition(
+    condition: SweepCondition,
+    scorer: BFI2Scorer,
+    semaphore: asyncio.Semaphore,
+    use_cache: bool,
+    refresh_cache: bool,
+    backend: Optional[str],
+    catalog: Optional[RunCatalog] = None,
+) -> dict:
+    """Run and score one survey, returning its results-table row."""
+    run_id = SurveyJournal.new_run_id(condition.persona)
+    started_at = datetime.now()
+    row = {
+        "run_id": run_id,
+        "persona": condition.persona,
+        "model": condition.model,
+        "temperature": condition.temperature,
+        "replicate": condition.replicate,
+    }
+    started = time.perf_counter()
+
+    try:
+        agent = PersonaAgent(
+            persona_name=condition.persona,
+            model=condition.model,
+            temperature=condition.temperature,
+            replicate=condition.replicate,
+            use_cache=use_cache,
+            refresh_cache=refresh_cache,
+            backend=backend,
+            run_id=run_id,
+        )
+        responses = await agent.take_survey_async(
+            verbose=False, semaphore=semaphore)
+    except Exception as exc:
+        logger.error("Sweep run failed for %s: %r", condition, exc)
+        row.update(status="failed", error=repr(exc),
+                   duration_s=round(time.perf_counter() - started, 3))
+        return row
+
+    result = scorer.score(responses, persona=condition.persona)
+
+    row.update(status="ok", error="", stopped_early=agent.stopped_early,
+               n_answered=len(responses),
+               duration_s=round(time.perf_counter() - started, 3))
+    for domain in result.domains.values():
+        row[domain.code] = domain.score
+        for facet_name, facet in domain.facets.items():
+            row[f"{domain.code}:{facet_name}"] = facet.score
+    for question_id, answer in sorted(responses.items()):
+        row[f"q{question_id}"] = answer
+
+    if catalog is not None:
+        # Recording may flush to the database; keep that off the event loop
+        row["catalog_error"] = await asyncio.to_thread(
+            _record_run, catalog, run_id, condition, agent, responses, result,
+            started_at)
+
+    return row
+
+
+async def run_sweep_async(
+    conditions: list[SweepCondition],
+    concurrency: int = DEFAULT_SWEEP_CONCURRENCY,
+    use_cache: bool = True,
+    refresh_cache: bool = False,
+    backend: Optional[str] = None,
+    verbose: bool = True,
+    catalog: Optional[RunCatalog] = None,
+    max_active_runs: int = DEFAULT_MAX_ACTIVE_RUNS,
+) -> list[dict]:
+    """
+    Run the conditions concurrently under one global request budget.
+
+    Args:
+        conditions: Sweep grid cells to run
+        concurrency: Maximum in-flight requests across all runs
+        use_cache: Whether to read and write the LLM response cache
+        refresh_cache: Ignore cached responses and overwrite them
+        backend: LLM backend name (defaults to settings)
+        verbose: Whether to print progress
+        catalog: Run catalog to record each completed run in
+        max_active_runs: Maximum surveys in progress at once
+
+    Returns:
+        One results row per condition, in grid order
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    run_slots = asyncio.Semaphore(max_active_runs)
+    scorer = BFI2Scorer()
+    completed = 0
+
+    async def _run(condition: SweepCondition) -> dict:
+        nonlocal completed
+        async with run_slots:
+            row = await _run_condition(
+                condition, scorer, semaphore, use_cache, refresh_cache, backend,
+                catalog)
+        completed += 1
+        if verbose:
+            print(
+                f"[{completed:{len(str(len(conditions)))}d}/{len(conditions)}] "
+                f"{condition.persona} | {condition.model} | "
+                f"T={condition.temperature} | rep {condition.replicate} "
+                f"-> {row['status']} ({row['duration_s']:.1f}s)"
+            )
+        return row
+
+    return await asyncio.gather(*(_run(c) for c in conditions))
+
+
+def write_results_table(rows: list[dict], output_path: Path) -> Path:
+    """Write sweep rows to a CSV table, taking columns from all rows."""
+    fieldnames: list[str] = []
+    for row in rows:
+        fieldnames.extend(key for key in row if key not in fieldnames)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with output_path.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    return output_path
+
+
+def run_sweep(
+    personas: Optional[list[str]] = None,
+    models: Optional[list[str]] = None,
+    temperatures: Optional[list[float]] = None,
+    replicates: int = 1,
+    concurrency: int = DEFAULT_SWEEP_CONCURRENCY,
+    max_active_runs: int = DEFAULT_MAX_ACTIVE_RUNS,
+    use_cache: bool = True,
+    refresh_cache: bool = False,
+    backend: Optional[str] = None,
+    output_path: Optional[Path] = None,
+    verbose: bool = True,
+    catalog: bool = True,
+) -> dict:
+    """
+    Run the BFI-2 survey over a persona × model × temperature × replicate grid.
+
+    Args:
+        personas: Persona profiles to run (defaults to all personas)
+        models: Models to run (defaults to settings)
+        temperatures: Sampling temperatures (defaults to the agent default)
+        replicates: Number of replicate surveys per condition
+        concurrency: Maximum in-flight requests across the whole sweep
+        max_active_runs: Maximum surveys in progress at once
+        use_cache: Whether to read and write the LLM response cache
+        refresh_cache: Ignore cached responses and overwrite them
+        backend: LLM backend name (defaults to settings)
+        output_path: CSV path for the results table (defaults to results dir)
+        verbose: Whether to print progress
+        catalog: Record every run in the database run catalog
+
+    Returns:
+        Dictionary with result rows and the results table path
+    """
+    personas = personas or list_personas()
+    models = models or [app_settings.openrouter.model_name]
+    temperatures = temperatures or [PersonaAgent.TEMPERATURE]
+
+    conditions = build_grid(personas, models, temperatures, replicates)
+
+    if output_path is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = (
+            Path(__file__).resolve().parent / "results" / f"sweep_{timestamp}.csv"
+        )
+
+    logger.info(
+        "Starting sweep: %d personas × %d models × %d temperatures × "
+        "%d replicates = %d runs (concurrency=%d, %d runs at a time)",
+        len(personas), len(models), len(temperatures), replicates,
+        len(conditions), concurrency, max_active_runs,
+    )
+
+    if verbose:
+        print(f"\n{'#' * 70}")
+        print(f"# BFI-2 SWEEP: {len(conditions)} runs")
+        print(f"# Personas: {', '.join(personas)}")
+        print(f"# Models: {', '.join(models)}")
+        print(f"# Temperatures: {', '.join(str(t) for t in temperatures)}")
+        print(f"# Replicates: {replicates}  |  Concurrency: {concurrency}")
+        print(f"{'#' * 70}\n")
+
+    run_catalog = get_run_catalog() if catalog else None
+
+    started = time.perf_counter()
+    rows = asyncio.run(
+        run_sweep_async(
+            conditions,
+            concurrency=concurrency,
+            use_cache=use_cache,
+            refresh_cache=refresh_cache,
+            backend=backend,
+            verbose=verbose,
+            catalog=run_catalog,
+            max_active_runs=max_active_runs,
+        )
+    )
+    if run_catalog is not None:
+        try:
+            run_catalog.flush()
+        except Exception as exc:
+            logger.error("Final run catalog flush failed: %r", exc)
+    elapsed = time.perf_counter() - started
+
+    write_results_table(rows, output_path)
+    failed = sum(1 for row in rows if row["status"] != "ok")
+
+    logger.info(
+        "Sweep complete in %.1fs: %d ok, %d failed; results saved to %s",
+        elapsed, len(rows) - failed, failed, output_path,
+    )
+
+    if verbose:
+        print(f"\n{'#' * 70}")
+        print(f"# SWEEP COMPLETE in {elapsed:.1f}s "
+              f"({len(rows) - failed} ok, {failed} failed)")
+        print(f"{'#' * 70}")
+        print(f"\nResults table saved to: {output_path}")
+
+    return {"rows": rows, "path": str(output_path)}
+
+
+def main():
+    """Main entry point with CLI argument parsing."""
+    parser = argparse.ArgumentParser(
+        description="Run the BFI-2 survey over a grid of personas and models"
+    )
+    parser.add_argument(
+        "--personas",
+        "-p",
+        nargs="+",
+        choices=list_personas(),
+        default=None,
+        help="Persona names (default: all personas)",
+    )
+    parser.add_argument(
+        "--models",
+        "-m",
+        nargs="+",
+        default=None,
+        help=f"Models to use (default: from settings - {app_settings.openrouter.model_name})",
+    )
+    parser.add_argument(
+        "--temperatures",
+        "-t",
+        nargs="+",
+        type=float,
+        default=None,
+        help=f"Sampling temperatures (default: {PersonaAgent.TEMPERATURE})",
+    )
+    parser.add_argument(
+        "--replicates",
+        "-r",
+        type=int,
+        default=1,
+        help="Replicate surveys per condition (default: 1)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        "-c",
+        type=int,
+        default=DEFAULT_SWEEP_CONCURRENCY,
+        help=f"Maximum in-flight requests across the sweep (default: {DEFAULT_SWEEP_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--max-active-runs",
+        type=int,
+        default=DEFAULT_MAX_ACTIVE_RUNS,
+        help=f"Maximum surveys in progress at once (default: {DEFAULT_MAX_ACTIVE_RUNS})",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=Path,
+        default=None,
+        help="CSV path for the results table (default: results/sweep_<timestamp>.csv)",
+    )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default=None,
+        choices=available_backends(),
+        help=f"LLM backend (default: from settings - {app_settings.backend.name})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the LLM response cache",
+    )
+    parser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Ignore cached responses and overwrite them with fresh ones",
+    )
+    parser.add_argument(
+        "--no-catalog",
+        action="store_true",
+        help="Do not record runs in the database run catalog",
+    )
+    parser.add_argument(
+        "--quiet",
+        "-q",
+        action="store_true",
+        help="Suppress verbose output",
+    )
+
+    args = parser.parse_args()
+
+    logger.info(
+        "CLI args: personas=%s, models=%s, temperatures=%s, replicates=%s, "
+        "concurrency=%s, max_active_runs=%s",
+        args.personas, args.models, args.temperatures, args.replicates,
+        args.concurrency, args.max_active_runs)
+
+    run_sweep(
+        personas=args.personas,
+        models=args.models,
+        temperatures=args.temperatures,
+        replicates=args.replicates,
+        concurrency=args.concurrency,
+        max_active_runs=args.max_active_runs,
+        use_cache=not args.no_cache,
+        refresh_cache=args.refresh_cache,
+        backend=args.backend,
+        output_path=args.output,
+        verbose=not args.quiet,
+        catalog=not args.no_catalog,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+BFI-2 Stream Scorer
+
+This script scores a JSONL stream of BFI-2 response records:
+1. Reads records from a file or stdin, one JSON object per line
+2. Scores them chunk by chunk through the vectorized batch path
+3. Writes one scored record per line as each chunk completes
+
+Memory use is bounded by the chunk size, not the input size. Each input
+record needs a "responses" object mapping question IDs to answers from 1
+to 5 (null for unanswered); records that do not are logged and skipped
+rather than aborting the stream. Every other field (persona, model,
+run_id, ...) is passed through to the output.
+"""
+
+import argparse
+import itertools
+import json
+import sys
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Optional
+
+import numpy as np
+
+from scripts.analysis.bfi2_scorer import BFI2Scorer
+from scripts.analysis.results_loader import parse_responses
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+def _parse_records(
+    lines: Iterable[str], column_index: dict[int, int]
+) -> Iterator[tuple[dict, list[float]]]:
+    """
+    Parse JSONL lines into records and response rows in column order.
+
+    Blank lines are ignored; unreadable lines and records without a valid
+    responses object are logged and skipped.
+    """
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning("Skipping unreadable line %d", line_no)
+            continue
+        if not isinstance(record, dict):
+            logger.warning("Skipping line %d: not a JSON object", line_no)
+            continue
+        try:
+            row = parse_responses(record.get("responses"), column_index)
+        except (ValueError, TypeError) as exc:
+            logger.warning("Skipping line %d: %s", line_no, exc)
+            continue
+        yield record, row
+
+
+def score_stream(
+    lines: Iterable[str],
+    scorer: Optional[BFI2Scorer] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[dict]:
+    """
+    Score a stream of JSONL response records in fixed-size chunks.
+
+    Args:
+        lines: JSONL lines (e.g. an open file or sys.stdin)
+        scorer: Scorer to use (defaults to a new BFI2Scorer)
+        chunk_size: Records scored per batch
+
+    Yields:
+        One scored record per valid input record, in input order, with the
+        input metadata plus total_questions, domain scores, interpretations
+        and facet scores
+    """
+    scorer = scorer or BFI2Scorer()
+    records = _parse_records(lines, scorer.plan.column_index)
+
+    while True:
+        chunk = list(itertools.islice(records, chunk_size))
+        if not chunk:
+            return
+
+        batch = scorer.score_batch(
+            np.array([row for _, row in chunk], dtype=np.float64),
+            personas=[record.get("persona", "unknown") for record, _ in chunk],
+        )
+        domain_scores = batch.domain_scores.tolist()
+        facet_scores = batch.facet_scores.tolist()
+
+        for idx, (record, _) in enumerate(chunk):
+            responses = record.pop("responses")
+            yield {
+                **record,
+                "total_questions": len(responses),
+                "summary": dict(zip(batch.domain_codes, domain_scores[idx])),
+                "interpretations": dict(
+                    zip(batch.domain_codes, batch.interpretation(idx))),
+                "facets": dict(zip(batch.facet_names, facet_scores[idx])),
+            }
+
+
+def score_jsonl(
+    input_stream: IO[str],
+    output_stream: IO[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Score a JSONL stream and write scored records as JSONL.
+
+    Args:
+        input_stream: Readable text stream of response records
+        output_stream: Writable text stream for scored records
+        chunk_size: Records scored per batch
+
+    Returns:
+        Number of records scored
+    """
+    count = 0
+    for scored in score_stream(input_stream, chunk_size=chunk_size):
+        output_stream.write(json.dumps(scored) + "\n")
+        count += 1
+        if count % chunk_size == 0:
+            output_stream.flush()
+            logger.info("Scored %d records", count)
+
+    output_stream.flush()
+    return count
+
+
+def main():
+    """Main entry point with CLI argument parsing."""
+    parser = argparse.ArgumentParser(
+        description="Score a JSONL stream of BFI-2 response records"
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="JSONL file of response records (default: stdin)",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=Path,
+        default=None,
+        help="JSONL file for scored records (default: stdout)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Records scored per batch (default: {DEFAULT_CHUNK_SIZE})",
+    )
+
+    args = parser.parse_args()
+
+    input_stream = sys.stdin if args.input == "-" else open(args.input)
+    output_stream = sys.stdout if args.output is None else args.output.open("w")
+
+    try:
+        count = score_jsonl(input_stream, output_stream, chunk_size=args.chunk_size)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    logger.info("Stream scoring complete: %d records", count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+BFI-2 Scoring Plan Module
+
+This module provides the precompiled form of the BFI-2 scoring
+configuration. ``scoring.json`` is compiled once per process into an
+immutable ScoringPlan holding per-domain and per-facet item tuples, reverse
+masks, the linear operator used for batch scoring and a bisect-able
+interpretation table, so scorers never walk the raw config per call.
+"""
+
+import json
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, Union
+
+import numpy as np
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCORING_CONFIG_PATH = (
+    Path(__file__).resolve().parent.parent.parent / "data" / "bfi2" / "scoring.json"
+)
+
+
+@dataclass(frozen=True)
+class FacetPlan:
+    """Compiled items and reverse keying for one facet."""
+    name: str
+    items: tuple[int, ...]
+    reverse_mask: tuple[bool, ...]
+
+    @classmethod
+    def compile(cls, name: str, config: dict) -> "FacetPlan":
+        reverse_items = set(config.get("reverseItems", []))
+        items = tuple(config["items"])
+        return cls(
+            name=name,
+            items=items,
+            reverse_mask=tuple(item in reverse_items for item in items),
+        )
+
+
+@dataclass(frozen=True)
+class DomainPlan:
+    """Compiled items, reverse keying and facets for one domain."""
+    name: str
+    code: str
+    items: tuple[int, ...]
+    reverse_mask: tuple[bool, ...]
+    facets: tuple[FacetPlan, ...]
+
+    @classmethod
+    def compile(cls, name: str, config: dict) -> "DomainPlan":
+        facet = FacetPlan.compile(name, config)
+        return cls(
+            name=name,
+            code=config["code"],
+            items=facet.items,
+            reverse_mask=facet.reverse_mask,
+            facets=tuple(
+                FacetPlan.compile(facet_name, facet_config)
+                for facet_name, facet_config in config.get("facets", {}).items()
+            ),
+        )
+
+
+@dataclass(frozen=True, eq=False)
+class ScoringPlan:
+    """
+    Immutable, precompiled BFI-2 scoring configuration.
+
+    Every domain and facet score is a mean of (possibly reversed) items, so
+    batch scoring is ``responses @ weights + offsets`` with weight ±1/n per
+    item and an offset of 6/n per reversed item. Columns of ``weights`` are
+    the domains followed by all facets, in config order.
+    """
+    config: Mapping
+    domains: tuple[DomainPlan, ...]
+    item_ids: tuple[int, ...]
+    column_index: Mapping[int, int]
+    # Domains followed by all facets (the score order), with each group's
+    # positions in item_ids
+    groups: tuple[Union[DomainPlan, FacetPlan], ...]
+    group_columns: tuple[tuple[int, ...], ...]
+    weights: np.ndarray  # items × (domains + facets), read-only
+    offsets: np.ndarray  # (domains + facets,), read-only
+    range_mins: tuple[float, ...]
+    range_maxs: tuple[float, ...]
+    range_labels: tuple[str, ...]
+
+    @property
+    def domain_names(self) -> list[str]:
+        return [domain.name for domain in self.domains]
+
+    @property
+    def domain_codes(self) -> list[str]:
+        return [domain.code for domain in self.domains]
+
+    @property
+    def facet_names(self) -> list[str]:
+        return [facet.name for domain in self.domains for facet in domain.facets]
+
+    def interpret(self, score: float) -> str:
+        """
+        Interpret a domain/facet score based on predefined ranges.
+
+        Args:
+            score: Mean score (1.0-5.0)
+
+        Returns:
+            Interpretation label (e.g., "High", "Very High")
+        """
+        idx = bisect_right(self.range_mins, score) - 1
+        if idx >= 0 and score < self.range_maxs[idx]:
+            return self.range_labels[idx]
+
+        # Handle edge case for max score
+        if score >= 5.0:
+            return "Very High"
+        return "Average"
+
+    @property
+    def interpretation_labels(self) -> tuple[str, ...]:
+        """Labels indexed by interpret_codes: the ranges, then the fallbacks."""
+        return (*self.range_labels, "Very High", "Average")
+
+    def interpret_codes(self, scores: np.ndarray) -> np.ndarray:
+        """
+        Vectorized interpret returning indexes into interpretation_labels.
+
+        Args:
+            scores: Array of mean scores (1.0-5.0)
+
+        Returns:
+            int8 array of label codes, shaped like ``scores``
+        """
+        range_mins = np.asarray(self.range_mins)
+        range_maxs = np.asarray(self.range_maxs)
+
+        idx = np.searchsorted(range_mins, scores, side="right") - 1
+        safe_idx = idx.clip(0)
+        in_range = (idx >= 0) & (scores < range_maxs[safe_idx])
+
+        n_ranges = len(self.range_labels)
+        # Same fallbacks as interpret: "Very High" at 5.0, else "Average"
+        fallback = np.where(scores >= 5.0, n_ranges, n_ranges + 1)
+        return np.where(in_range, safe_idx, fallback).astype(np.int8)
+
+    def interpret_array(self, scores: np.ndarray) -> np.ndarray:
+        """Vectorized interpret over an array of scores (object array of labels)."""
+        labels = np.asarray(self.interpretation_labels, dtype=object)
+        return labels[self.interpret_codes(scores)]
+
+
+def _freeze(value):
+    """Deep read-only copy of parsed JSON: dicts to mapping proxies, lists to tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def compile_scoring_plan(config: Mapping) -> ScoringPlan:
+    """
+    Compile a BFI-2 scoring configuration into a ScoringPlan.
+
+    Args:
+        config: Parsed scoring configuration (the contents of scoring.json)
+
+    Returns:
+        Immutable ScoringPlan (holding a deep read-only copy of ``config``)
+    """
+    domains = tuple(
+        DomainPlan.compile(name, domain_config)
+        for name, domain_config in config["domains"].items()
+    )
+
+    groups = (*domains, *(facet for domain in domains for facet in domain.facets))
+
+    item_ids = tuple(sorted({item for domain in domains for item in domain.items}))
+    column_index = {item: idx for idx, item in enumerate(item_ids)}
+
+    weights = np.zeros((len(item_ids), len(groups)))
+    offsets = np.zeros(len(groups))
+    for group_idx, group in enumerate(groups):
+        weight = 1.0 / len(group.items)
+        for item, is_reverse in zip(group.items, group.reverse_mask):
+            if is_reverse:
+                weights[column_index[item], group_idx] -= weight
+                offsets[group_idx] += 6 * weight
+            else:
+                weights[column_index[item], group_idx] += weight
+    weights.flags.writeable = False
+    offsets.flags.writeable = False
+
+    ranges = sorted(
+        config["interpretation"]["ranges"].values(), key=lambda r: r["min"])
+
+    return ScoringPlan(
+        config=_freeze(config),
+        domains=domains,
+        item_ids=item_ids,
+        column_index=MappingProxyType(column_index),
+        groups=groups,
+        group_columns=tuple(
+            tuple(column_index[item] for item in group.items) for group in groups
+        ),
+        weights=weights,
+        offsets=offsets,
+        range_mins=tuple(r["min"] for r in ranges),
+        range_maxs=tuple(r["max"] for r in ranges),
+        range_labels=tuple(r["label"] for r in ranges),
+    )
+
+
+@lru_cache()
+def get_scoring_plan(scoring_path: Path = SCORING_CONFIG_PATH) -> ScoringPlan:
+    """Get the process-wide ScoringPlan compiled from a scoring config file."""
+    config = json.loads(Path(scoring_path).read_text())
+    logger.debug("Compiled scoring plan from %s", scoring_path)
+    return compile_scoring_plan(config)
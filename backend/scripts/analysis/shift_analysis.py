@@ -0,0 +1,628 @@
+"""
+Shift Analysis Module
+
+This module provides the main-effect and mediation analyses of the study
+plan on batch-scored pre/post BFI-2 tables:
+
+1. Difference-in-differences: the pre → post shift of every domain and
+   facet in each experimental condition, relative to the control condition
+2. Serial mediation (Group → Norm → Comparison → Shift): indirect effects
+   through the perceived group norm, through social comparison and through
+   both in sequence, with indicator-coded conditions against the control
+
+Both are ordinary least squares fits, solved for every scale and every
+resample at once as batched normal equations. Bootstrap resamples
+(stratified by condition) and label permutations are generated in blocks
+on a process pool; each block draws from its own child of one
+SeedSequence, so results for a given seed do not depend on the pool size.
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from scripts.analysis.bfi2_scorer import BFI2BatchResult, BFI2Scorer
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CONTROL_CONDITION = "neutral_control"
+
+DEFAULT_RESAMPLES = 10_000
+DEFAULT_CONFIDENCE = 0.95
+
+# Resamples per pool task; fixed so the seed streams do not depend on the
+# number of workers
+RESAMPLES_PER_TASK = 500
+
+# Mediation effects reported per contrast and scale
+MEDIATION_EFFECTS = (
+    "via_norm",
+    "via_comparison",
+    "serial",
+    "total_indirect",
+    "direct",
+    "total",
+)
+
+# Analysis inputs shared with pool workers via the initializer
+_worker_data: Optional[dict] = None
+
+
+@dataclass
+class ShiftData:
+    """
+    Per-participant pre/post scale scores, condition and mediators.
+
+    Scales are the 5 domains (by code) followed by the 15 facets; rows of
+    every array belong to ``participants``.
+    """
+    participants: list[str]
+    conditions: np.ndarray  # N condition labels
+    scale_names: list[str]
+    pre: np.ndarray  # N × S
+    post: np.ndarray  # N × S
+    norm: Optional[np.ndarray] = None  # N perceived group norm ratings
+    comparison: Optional[np.ndarray] = None  # N social comparison ratings
+
+    @property
+    def shift(self) -> np.ndarray:
+        """Post minus pre score, N × S."""
+        return self.post - self.pre
+
+    @property
+    def has_mediators(self) -> bool:
+        return self.norm is not None and self.comparison is not None
+
+    @classmethod
+    def from_batches(
+        cls,
+        pre: BFI2BatchResult,
+        post: BFI2BatchResult,
+        conditions: Sequence[str],
+        norm: Optional[Sequence[float]] = None,
+        comparison: Optional[Sequence[float]] = None,
+    ) -> "ShiftData":
+        """
+        Pair pre- and post-test batch scores by participant.
+
+        Args:
+            pre: Pre-test scores; ``personas`` holds the participant IDs
+            post: Post-test scores, matched to ``pre`` by participant ID
+            conditions: Condition of each ``pre`` participant
+            norm: Perceived group norm rating of each ``pre`` participant
+            comparison: Social comparison rating of each ``pre`` participant
+
+        Returns:
+            ShiftData over the participants present in both tables
+        """
+        post_rows = {}
+        for idx, participant in enumerate(post.personas):
+            if participant in post_rows:
+                raise ValueError(f"Duplicate post-test participant {participant!r}")
+            post_rows[participant] = idx
+
+        missing = [p for p in pre.personas if p not in post_rows]
+        if missing:
+            logger.warning(
+                "Dropping %d participants without a post-test: %s%s",
+                len(missing), ", ".join(missing[:5]),
+                "..." if len(missing) > 5 else "")
+
+        keep = np.array([p in post_rows for p in pre.personas], dtype=bool)
+        pre_idx = np.flatnonzero(keep)
+        post_idx = np.array([post_rows[pre.personas[i]] for i in pre_idx], dtype=np.intp)
+
+        def _scales(batch: BFI2BatchResult, rows: np.ndarray) -> np.ndarray:
+            return np.hstack([batch.domain_scores[rows], batch.facet_scores[rows]])
+
+        def _column(values: Optional[Sequence[float]]) -> Optional[np.ndarray]:
+            if values is None:
+                return None
+            return np.asarray(values, dtype=np.float64)[pre_idx]
+
+        return cls(
+            participants=[pre.personas[i] for i in pre_idx],
+            conditions=np.asarray(conditions, dtype=str)[pre_idx],
+            scale_names=[*pre.domain_codes, *pre.facet_names],
+            pre=_scales(pre, pre_idx),
+            post=_scales(post, post_idx),
+            norm=_column(norm),
+            comparison=_column(comparison),
+        )
+
+
+@dataclass
+class EffectTable:
+    """Effects by contrast (rows) and scale (columns) with bootstrap CIs."""
+    contrasts: list[str]
+    scales: list[str]
+    estimate: np.ndarray  # k × S
+    ci_low: np.ndarray  # k × S
+    ci_high: np.ndarray  # k × S
+    p_value: Optional[np.ndarray] = None  # k × S permutation p-values
+
+    def to_records(self) -> list[dict]:
+        """One record per contrast and scale."""
+        records = []
+        for i, contrast in enumerate(self.contrasts):
+            for j, scale in enumerate(self.scales):
+                record = {
+                    "contrast": contrast,
+                    "scale": scale,
+                    "estimate": round(float(self.estimate[i, j]), 4),
+                    "ci_low": round(float(self.ci_low[i, j]), 4),
+                    "ci_high": round(float(self.ci_high[i, j]), 4),
+                }
+                if self.p_value is not None:
+                    record["p_value"] = round(float(self.p_value[i, j]), 5)
+                records.append(record)
+        return records
+
+
+@dataclass
+class ShiftAnalysisResult:
+    """DiD and serial mediation results for one study dataset."""
+    n_participants: int
+    condition_counts: dict[str, int]
+    control: str
+    n_resamples: int
+    n_permutations: int
+    confidence: float
+    seed: Optional[int]
+    did: EffectTable
+    mediation: dict[str, EffectTable] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "n_participants": self.n_participants,
+            "condition_counts": self.condition_counts,
+            "control": self.control,
+            "n_resamples": self.n_resamples,
+            "n_permutations": self.n_permutations,
+            "confidence": self.confidence,
+            "seed": self.seed,
+            "did": self.did.to_records(),
+            "mediation": {
+                name: table.to_records() for name, table in self.mediation.items()
+            },
+        }
+
+
+def batched_ols(
+    design: np.ndarray, outcome: np.ndarray, weights: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Least squares coefficients for many resamples at once.
+
+    A bootstrap resample is the full sample weighted by how often each row
+    was drawn, so its normal equations are X'WX b = X'WY.
+
+    Args:
+        design: N × p or B × N × p design matrices
+        outcome: N × S or B × N × S outcomes
+        weights: B × N row weights (defaults to 1 per row)
+
+    Returns:
+        B × p × S coefficients (B = 1 without batched inputs or weights)
+    """
+    if design.ndim == 2:
+        design = design[np.newaxis]
+    weighted = design if weights is None else weights[:, :, np.newaxis] * design
+    weighted_t = weighted.transpose(0, 2, 1)
+    # pinv keeps degenerate resamples (e.g. a constant mediator) finite
+    return np.linalg.pinv(weighted_t @ design) @ (weighted_t @ outcome)
+
+
+def _did_effects(
+    design: np.ndarray, shift: np.ndarray, weights: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Condition-vs-control differences in mean shift, B × k × S."""
+    return batched_ols(design, shift, weights)[:, 1:, :]
+
+
+def _mediation_effects(
+    design: np.ndarray,
+    norm: np.ndarray,
+    comparison: np.ndarray,
+    shift: np.ndarray,
+    weights: Optional[np.ndarray] = None,
+) -> dict[str, np.ndarray]:
+    """
+    Serial mediation path products (Hayes model 6), each B × k × S.
+
+    Fits Norm ~ Group, Comparison ~ Group + Norm and
+    Shift ~ Group + Norm + Comparison.
+    """
+    n_contrasts = design.shape[1] - 1
+
+    a1 = batched_ols(design, norm[:, np.newaxis], weights)[:, 1:, 0]
+    comparison_fit = batched_ols(
+        np.column_stack([design, norm]), comparison[:, np.newaxis], weights)[:, :, 0]
+    a2 = comparison_fit[:, 1:n_contrasts + 1]
+    d21 = comparison_fit[:, n_contrasts + 1]
+    outcome_fit = batched_ols(
+        np.column_stack([design, norm, comparison]), shift, weights)
+    direct = outcome_fit[:, 1:n_contrasts + 1, :]
+    b1 = outcome_fit[:, n_contrasts + 1, np.newaxis, :]
+    b2 = outcome_fit[:, n_contrasts + 2, np.newaxis, :]
+
+    via_norm = a1[:, :, np.newaxis] * b1
+    via_comparison = a2[:, :, np.newaxis] * b2
+    serial = (a1 * d21[:, np.newaxis])[:, :, np.newaxis] * b2
+    total_indirect = via_norm + via_comparison + serial
+    return {
+        "via_norm": via_norm,
+        "via_comparison": via_comparison,
+        "serial": serial,
+        "total_indirect": total_indirect,
+        "direct": direct,
+        "total": direct + total_indirect,
+    }
+
+
+def _init_worker(data: dict) -> None:
+    global _worker_data
+    _worker_data = data
+
+
+def _bootstrap_task(seed: np.random.SeedSequence, n_resamples: int) -> dict[str, np.ndarray]:
+    """DiD and mediation effects over one block of stratified resamples."""
+    data = _worker_data
+    rng = np.random.default_rng(seed)
+
+    # Resample within each condition so group sizes stay fixed
+    weights = np.zeros((n_resamples, data["shift"].shape[0]))
+    for members in data["strata"]:
+        weights[:, members] = rng.multinomial(
+            len(members), np.full(len(members), 1 / len(members)), size=n_resamples)
+
+    effects = {"did": _did_effects(data["design"], data["shift"], weights)}
+    if data["norm"] is not None:
+        effects.update(_mediation_effects(
+            data["design"], data["norm"], data["comparison"], data["shift"], weights))
+    return effects
+
+
+def _permutation_task(seed: np.random.SeedSequence, n_permutations: int) -> np.ndarray:
+    """DiD effects over one block of condition-label permutations."""
+    data = _worker_data
+    rng = np.random.default_rng(seed)
+    n = data["shift"].shape[0]
+    order = rng.permuted(np.tile(np.arange(n), (n_permutations, 1)), axis=1)
+    return _did_effects(data["design"][order], data["shift"])
+
+
+def _blocks(n_resamples: int) -> list[int]:
+    sizes = [RESAMPLES_PER_TASK] * (n_resamples // RESAMPLES_PER_TASK)
+    if n_resamples % RESAMPLES_PER_TASK:
+        sizes.append(n_resamples % RESAMPLES_PER_TASK)
+    return sizes
+
+
+def _run_blocks(task, seed_seq, n_resamples: int, data: dict, workers: int) -> list:
+    """Run ``task`` over blocks of resamples, in-process or on a pool."""
+    sizes = _blocks(n_resamples)
+    seeds = seed_seq.spawn(len(sizes))
+    workers = min(workers, len(sizes))
+    if workers <= 1:
+        _init_worker(data)
+        return [task(block_seed, size) for block_seed, size in zip(seeds, sizes)]
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(data,)
+    ) as pool:
+        return list(pool.map(task, seeds, sizes))
+
+
+def _effect_table(
+    estimate: np.ndarray,
+    resampled: np.ndarray,
+    contrasts: list[str],
+    scales: list[str],
+    confidence: float,
+) -> EffectTable:
+    tail = (1 - confidence) / 2 * 100
+    ci_low, ci_high = np.nanpercentile(resampled, [tail, 100 - tail], axis=0)
+    return EffectTable(
+        contrasts=contrasts,
+        scales=scales,
+        estimate=estimate,
+        ci_low=ci_low,
+        ci_high=ci_high,
+    )
+
+
+def analyze_shift(
+    data: ShiftData,
+    control: str = CONTROL_CONDITION,
+    n_resamples: int = DEFAULT_RESAMPLES,
+    n_permutations: int = 0,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: Optional[int] = 0,
+    workers: Optional[int] = None,
+) -> ShiftAnalysisResult:
+    """
+    Run the DiD and (when mediators are given) serial mediation analyses.
+
+    Args:
+        data: Paired pre/post scores with conditions and mediators
+        control: Reference condition of the contrasts
+        n_resamples: Stratified bootstrap resamples for the CIs
+        n_permutations: Condition-label permutations for DiD p-values
+            (0 to skip)
+        confidence: Confidence level of the percentile intervals
+        seed: Seed of the resampling SeedSequence (None for fresh entropy)
+        workers: Process pool size (defaults to the CPU count; 1 runs
+            in-process)
+
+    Returns:
+        ShiftAnalysisResult with DiD and mediation effect tables
+    """
+    conditions = sorted(set(data.conditions.tolist()))
+    if control not in conditions:
+        raise ValueError(f"Control condition {control!r} not in data: {conditions}")
+    treatments = [c for c in conditions if c != control]
+    if not treatments:
+        raise ValueError("Need at least one condition besides the control")
+    if n_resamples < 1:
+        raise ValueError("n_resamples must be at least 1")
+
+    # Intercept plus one indicator per experimental condition
+    design = np.column_stack(
+        [np.ones(len(data.conditions))]
+        + [(data.conditions == c).astype(np.float64) for c in treatments])
+    shift = data.shift
+    contrasts = [f"{c} - {control}" for c in treatments]
+
+    shared = {
+        "design": design,
+        "shift": shift,
+        "norm": data.norm if data.has_mediators else None,
+        "comparison": data.comparison if data.has_mediators else None,
+        "strata": [np.flatnonzero(data.conditions == c) for c in conditions],
+    }
+    seed_seq = np.random.SeedSequence(seed)
+    boot_seed, perm_seed = seed_seq.spawn(2)
+    workers = workers or os.cpu_count() or 1
+
+    logger.info(
+        "Shift analysis: %d participants, %d contrasts, %d scales, "
+        "%d resamples, %d permutations on %d workers",
+        len(shift), len(contrasts), shift.shape[1], n_resamples,
+        n_permutations, workers)
+
+    blocks = _run_blocks(_bootstrap_task, boot_seed, n_resamples, shared, workers)
+    resampled = {
+        name: np.concatenate([block[name] for block in blocks])
+        for name in blocks[0]
+    }
+
+    did = _effect_table(
+        _did_effects(design, shift)[0], resampled["did"],
+        contrasts, data.scale_names, confidence)
+
+    if n_permutations > 0:
+        null = np.concatenate(
+            _run_blocks(_permutation_task, perm_seed, n_permutations, shared, workers))
+        extreme = (np.abs(null) >= np.abs(did.estimate) - 1e-12).sum(axis=0)
+        did.p_value = (extreme + 1) / (n_permutations + 1)
+
+    mediation = {}
+    if data.has_mediators:
+        point = _mediation_effects(design, data.norm, data.comparison, shift)
+        for name in MEDIATION_EFFECTS:
+            mediation[name] = _effect_table(
+                point[name][0], resampled[name], contrasts, data.scale_names, confidence)
+    else:
+        logger.info("No norm/comparison ratings given; skipping mediation")
+
+    return ShiftAnalysisResult(
+        n_participants=len(shift),
+        condition_counts={c: int((data.conditions == c).sum()) for c in conditions},
+        control=control,
+        n_resamples=n_resamples,
+        n_permutations=n_permutations,
+        confidence=confidence,
+        seed=seed,
+        did=did,
+        mediation=mediation,
+    )
+
+
+def load_scored_jsonl(path: Path, scorer: Optional[BFI2Scorer] = None) -> tuple[BFI2BatchResult, list[dict]]:
+    """
+    Batch-score a JSONL file of participant response records.
+
+    Each record needs a "participant" ID and a "responses" object; other
+    fields (condition, norm, comparison, ...) are returned as metadata.
+
+    Args:
+        path: JSONL file
+        scorer: Scorer to use (defaults to a new BFI2Scorer)
+
+    Returns:
+        Tuple of (batch scores with participant IDs as personas, metadata
+        per record)
+    """
+    scorer = scorer or BFI2Scorer()
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Skipping unreadable line %d of %s", line_no, path)
+                continue
+            if "participant" not in record or not isinstance(record.get("responses"), dict):
+                logger.warning("Skipping line %d of %s: no participant or responses", line_no, path)
+                continue
+            records.append(record)
+
+    batch = scorer.score_batch(
+        [record.pop("responses") for record in records],
+        personas=[str(record["participant"]) for record in records],
+    )
+    return batch, records
+
+
+def print_results(result: ShiftAnalysisResult) -> None:
+    """Pretty print the domain-level effects to console."""
+    print(f"\n{'=' * 72}")
+    print(f"SHIFT ANALYSIS (N = {result.n_participants}, "
+          f"{result.n_resamples} resamples, {result.confidence:.0%} CIs)")
+    print(f"{'=' * 72}")
+    print("Conditions: " + ", ".join(
+        f"{name} ({count})" for name, count in result.condition_counts.items()))
+
+    tables = [("DIFFERENCE-IN-DIFFERENCES", result.did)]
+    if result.mediation:
+        tables.append(("TOTAL INDIRECT EFFECT (NORM -> COMPARISON)",
+                       result.mediation["total_indirect"]))
+
+    for title, table in tables:
+        print(f"\n{title}")
+        print(f"{'-' * 72}")
+        for record in table.to_records():
+            if record["scale"] not in result.did.scales[:5]:
+                continue
+            line = (f"{record['contrast']:<42}{record['scale']:>3} "
+                    f"{record['estimate']:>+7.3f} "
+                    f"[{record['ci_low']:+.3f}, {record['ci_high']:+.3f}]")
+            if "p_value" in record:
+                line += f"  p={record['p_value']:.4f}"
+            print(line)
+
+    print(f"{'=' * 72}\n")
+
+
+def main():
+    """Main entry point with CLI argument parsing."""
+    parser = argparse.ArgumentParser(
+        description="DiD and serial mediation analysis of pre/post BFI-2 responses"
+    )
+    parser.add_argument(
+        "--pre",
+        type=Path,
+        required=True,
+        help="Pre-test JSONL (participant, responses)",
+    )
+    parser.add_argument(
+        "--post",
+        type=Path,
+        required=True,
+        help="Post-test JSONL (participant, responses, condition and "
+        "optional norm and comparison ratings)",
+    )
+    parser.add_argument(
+        "--control",
+        type=str,
+        default=CONTROL_CONDITION,
+        help=f"Control condition label (default: {CONTROL_CONDITION})",
+    )
+    parser.add_argument(
+        "--resamples",
+        "-n",
+        type=int,
+        default=DEFAULT_RESAMPLES,
+        help=f"Bootstrap resamples (default: {DEFAULT_RESAMPLES})",
+    )
+    parser.add_argument(
+        "--permutations",
+        type=int,
+        default=0,
+        help="Label permutations for DiD p-values (default: 0)",
+    )
+    parser.add_argument(
+        "--no-mediation",
+        action="store_true",
+        help="Run the DiD analysis only (post-test has no norm/comparison ratings)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Resampling seed (default: 0)",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=None,
+        help="Process pool size (default: CPU count)",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=Path,
+        default=None,
+        help="Write the full results as JSON to this file",
+    )
+
+    args = parser.parse_args()
+
+    scorer = BFI2Scorer()
+    pre, _ = load_scored_jsonl(args.pre, scorer)
+    post, post_meta = load_scored_jsonl(args.post, scorer)
+
+    # Conditions and mediator ratings are collected at post-test
+    by_participant = {str(meta["participant"]): meta for meta in post_meta}
+    covariates = [by_participant.get(p, {}) for p in pre.personas]
+
+    # Only participants kept for the pre/post merge need mediator ratings
+    has_mediators = not args.no_mediation
+    if has_mediators:
+        lacking = [
+            p for p, c in zip(pre.personas, covariates)
+            if p in by_participant
+            and (c.get("norm") is None or c.get("comparison") is None)
+        ]
+        if lacking:
+            print(
+                f"Error: {len(lacking)} participants have no norm/comparison rating: "
+                f"{', '.join(lacking[:5])}{'...' if len(lacking) > 5 else ''} "
+                "(use --no-mediation for the DiD analysis only)",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+
+    data = ShiftData.from_batches(
+        pre,
+        post,
+        conditions=[c.get("condition", "") for c in covariates],
+        norm=[c.get("norm") for c in covariates] if has_mediators else None,
+        comparison=[c.get("comparison") for c in covariates] if has_mediators else None,
+    )
+
+    try:
+        result = analyze_shift(
+            data,
+            control=args.control,
+            n_resamples=args.resamples,
+            n_permutations=args.permutations,
+            seed=args.seed,
+            workers=args.workers,
+        )
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    print_results(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result.to_dict(), f, indent=2)
+        print(f"Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Benchmarks Module
+
+This module provides the offline benchmark suite for the PersonaMirror
+survey agent, scorer and pipeline.
+"""
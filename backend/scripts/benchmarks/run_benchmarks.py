@@ -0,0 +1,434 @@
+"""
+Benchmark Runner
+
+This script benchmarks the scorer, the survey agent and the pipeline
+offline, against the mock LLM backend:
+1. Scorer throughput: BFI2Scorer.score on single response sets and
+   score_batch at N = 1, 1k and 1M response sets
+2. Survey latency: one full survey per concurrency level (sequential,
+   async at increasing concurrency, batched)
+3. End-to-end pipeline time for one run_pipeline call
+4. Peak traced memory of every case, measured in a separate pass so
+   tracing does not skew the timings
+
+Results are written as a JSON baseline; the ``compare`` command checks a
+new result against a baseline and exits non-zero on regressions.
+
+Usage:
+    python -m scripts.benchmarks.run_benchmarks run [--quick] [-o FILE]
+    python -m scripts.benchmarks.run_benchmarks compare BASELINE [CURRENT]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+SUITES = ("scorer", "survey", "pipeline")
+
+DEFAULT_PERSONA = "high_agreeableness"
+DEFAULT_MOCK_LATENCY_MS = 20.0
+DEFAULT_MOCK_TOKEN_LATENCY_MS = 1.0
+SURVEY_CONCURRENCY_LEVELS = (1, 4, 16, 64)
+SURVEY_BATCH_SIZE = 20
+
+# Relative slowdown (or memory growth) reported as a regression
+DEFAULT_TIME_THRESHOLD = 0.10
+DEFAULT_MEMORY_THRESHOLD = 0.10
+# Memory growth below this is allocator noise, whatever the relative change
+MIN_MEMORY_DELTA_MB = 1.0
+
+# Scorer cases: name -> (response sets per call, calls per timed repeat)
+SCORER_CASES = {
+    "scorer.batch_1": (1, 2000),
+    "scorer.batch_1k": (1_000, 200),
+    "scorer.batch_1m": (1_000_000, 1),
+}
+SCORE_SINGLE_CALLS = 2000
+
+
+def configure_offline_environment(
+    mock_latency_ms: float, mock_token_latency_ms: float
+) -> dict:
+    """
+    Point settings at the mock backend with rate limits, cache and noisy
+    logging out of the way.
+
+    Must run before anything reads settings (they are resolved lazily on
+    first use). Values exported in the environment take precedence, except
+    for the backend and cache, which are always forced offline.
+
+    Returns:
+        The benchmark configuration recorded with the results
+    """
+    os.environ["BACKEND__NAME"] = "mock"
+    os.environ["CACHE__ENABLED"] = "false"
+    os.environ["BACKEND__MOCK_LATENCY_MS"] = str(mock_latency_ms)
+    os.environ["BACKEND__MOCK_TOKEN_LATENCY_MS"] = str(mock_token_latency_ms)
+    os.environ["BACKEND__MOCK_RATE_LIMIT_RATE"] = "0"
+    os.environ["BACKEND__MOCK_TIMEOUT_RATE"] = "0"
+    os.environ.setdefault("SCHEDULER__REQUESTS_PER_MINUTE", "100000000")
+    os.environ.setdefault("SCHEDULER__TOKENS_PER_MINUTE", "100000000000")
+    os.environ.setdefault("LOG__LOG_LEVEL", "WARNING")
+    # The mock backend needs no credentials, but Settings requires them
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("OPENROUTER__API_KEY", "benchmark")
+
+    return {
+        "backend": "mock",
+        "mock_latency_ms": mock_latency_ms,
+        "mock_token_latency_ms": mock_token_latency_ms,
+    }
+
+
+def _time(fn: Callable[[], object], repeats: int, inner: int = 1) -> dict:
+    """Median and best wall time per call of ``fn`` over ``repeats`` runs."""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(inner):
+            fn()
+        timings.append((time.perf_counter() - started) / inner)
+    return {
+        "median_s": round(statistics.median(timings), 9),
+        "min_s": round(min(timings), 9),
+        "repeats": repeats,
+        "calls_per_repeat": inner,
+    }
+
+
+def _peak_memory_mb(fn: Callable[[], object]) -> float:
+    """Peak memory traced by tracemalloc (Python and numpy) during ``fn``."""
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 2 ** 20, 3)
+
+
+def _measure(fn: Callable[[], object], repeats: int, inner: int = 1) -> dict:
+    result = _time(fn, repeats, inner)
+    result["peak_mem_mb"] = _peak_memory_mb(fn)
+    return result
+
+
+def bench_scorer(repeats: int) -> dict:
+    """Scorer throughput on single response sets and batches."""
+    import numpy as np
+
+    from scripts.analysis.bfi2_scorer import BFI2Scorer
+
+    scorer = BFI2Scorer()
+    rng = np.random.default_rng(0)
+    n_items = len(scorer.plan.item_ids)
+    results = {}
+
+    responses = {
+        item: int(value)
+        for item, value in zip(scorer.plan.item_ids, rng.integers(1, 6, n_items))
+    }
+    case = _measure(lambda: scorer.score(responses), repeats, SCORE_SINGLE_CALLS)
+    case["n_sets"] = 1
+    results["scorer.score_single"] = case
+
+    for name, (n_sets, inner) in SCORER_CASES.items():
+        matrix = rng.integers(1, 6, (n_sets, n_items), dtype=np.int8)
+        case = _measure(lambda: scorer.score_batch(matrix), repeats, inner)
+        case["n_sets"] = n_sets
+        results[name] = case
+
+    for name, case in results.items():
+        case["sets_per_s"] = round(case["n_sets"] / case["median_s"])
+        print(f"  {name:<24} {case['median_s'] * 1000:10.3f} ms  "
+              f"{case['sets_per_s']:>12,} sets/s  {case['peak_mem_mb']:9.2f} MB")
+    return results
+
+
+def bench_survey(repeats: int, persona: str = DEFAULT_PERSONA) -> dict:
+    """Full-survey wall time and request latency per survey mode."""
+    from scripts.agent_pretest.persona_agent import PersonaAgent
+    from scripts.agent_pretest.request_metrics import MetricsRegistry
+
+    def _run(concurrency: Optional[int], batch_size: Optional[int], metrics: MetricsRegistry):
+        agent = PersonaAgent(persona, use_cache=False, backend="mock", metrics=metrics)
+        if batch_size is not None:
+            return agent.take_survey_batched(batch_size=batch_size, verbose=False)
+        if concurrency == 1:
+            return agent.take_survey(verbose=False)
+        return asyncio.run(agent.take_survey_async(concurrency=concurrency, verbose=False))
+
+    cases = [(f"survey.concurrency_{c}", c, None) for c in SURVEY_CONCURRENCY_LEVELS]
+    cases.append((f"survey.batched_{SURVEY_BATCH_SIZE}", None, SURVEY_BATCH_SIZE))
+
+    results = {}
+    for name, concurrency, batch_size in cases:
+        metrics = MetricsRegistry()
+        case = _measure(lambda: _run(concurrency, batch_size, metrics), repeats)
+        summary = metrics.summary()
+        case["requests_per_survey"] = round(summary["requests"] / (repeats + 1), 1)
+        case["request_latency_ms"] = summary["latency_ms"]
+        results[name] = case
+        print(f"  {name:<24} {case['median_s'] * 1000:10.1f} ms  "
+              f"p50 request {summary['latency_ms']['p50']} ms  "
+              f"{case['peak_mem_mb']:9.2f} MB")
+    return results
+
+
+def bench_pipeline(repeats: int, persona: str = DEFAULT_PERSONA) -> dict:
+    """End-to-end run_pipeline time, cleaning up the files each run writes."""
+    from scripts.agent_pretest.survey_journal import SurveyJournal
+    from scripts.analysis.run_survey_pipeline import run_pipeline
+
+    def _run():
+        run_id = SurveyJournal.new_run_id(persona)
+        result = run_pipeline(
+            persona_name=persona,
+            verbose=False,
+            concurrency=8,
+            use_cache=False,
+            run_id=run_id,
+            backend="mock",
+            catalog=False,
+        )
+        shutil.rmtree(result["paths"]["store"], ignore_errors=True)
+        SurveyJournal(run_id).path.unlink(missing_ok=True)
+
+    case = _measure(_run, repeats)
+    print(f"  {'pipeline.run':<24} {case['median_s'] * 1000:10.1f} ms  "
+          f"{case['peak_mem_mb']:21.2f} MB")
+    return {"pipeline.run": case}
+
+
+def run_benchmarks(
+    suites: tuple[str, ...] = SUITES,
+    repeats: int = 3,
+    mock_latency_ms: float = DEFAULT_MOCK_LATENCY_MS,
+    mock_token_latency_ms: float = DEFAULT_MOCK_TOKEN_LATENCY_MS,
+) -> dict:
+    """
+    Run the selected benchmark suites.
+
+    Args:
+        suites: Suites to run ("scorer", "survey", "pipeline")
+        repeats: Timed repetitions per case (the median is reported)
+        mock_latency_ms: Mock LLM time to first token
+        mock_token_latency_ms: Mock LLM time per generated token
+
+    Returns:
+        Result document with run metadata and one entry per case
+    """
+    config = configure_offline_environment(mock_latency_ms, mock_token_latency_ms)
+
+    import numpy as np
+
+    benchmarks = {}
+    runners = {"scorer": bench_scorer, "survey": bench_survey, "pipeline": bench_pipeline}
+    for suite in suites:
+        print(f"\n[{suite}]")
+        benchmarks.update(runners[suite](repeats))
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeats": repeats,
+            "suites": list(suites),
+            "config": config,
+            # ru_maxrss is in KiB on Linux
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        },
+        "benchmarks": benchmarks,
+    }
+
+
+def compare_results(
+    baseline: dict,
+    current: dict,
+    time_threshold: float = DEFAULT_TIME_THRESHOLD,
+    memory_threshold: float = DEFAULT_MEMORY_THRESHOLD,
+) -> list[dict]:
+    """
+    Compare the cases two result documents have in common.
+
+    Args:
+        baseline: Baseline result document
+        current: New result document
+        time_threshold: Relative median-time increase flagged as a regression
+        memory_threshold: Relative peak-memory increase flagged as a
+            regression (increases under MIN_MEMORY_DELTA_MB are ignored)
+
+    Returns:
+        One row per case and metric with baseline, current, relative change
+        and a ``regression`` flag
+    """
+    rows = []
+    for name, base_case in baseline["benchmarks"].items():
+        case = current["benchmarks"].get(name)
+        if case is None:
+            continue
+        for metric, threshold in (("median_s", time_threshold),
+                                  ("peak_mem_mb", memory_threshold)):
+            before, after = base_case.get(metric), case.get(metric)
+            if not before or after is None:
+                continue
+            change = after / before - 1
+            regression = change > threshold
+            if metric == "peak_mem_mb" and after - before < MIN_MEMORY_DELTA_MB:
+                regression = False
+            rows.append({
+                "benchmark": name,
+                "metric": metric,
+                "baseline": before,
+                "current": after,
+                "change": round(change, 4),
+                "regression": regression,
+            })
+    return rows
+
+
+def print_comparison(rows: list[dict], baseline: dict, current: dict) -> None:
+    """Pretty print a comparison table to console."""
+    if baseline["meta"].get("config") != current["meta"].get("config"):
+        print("Warning: baseline and current were run with different configs:")
+        print(f"  baseline: {baseline['meta'].get('config')}")
+        print(f"  current:  {current['meta'].get('config')}")
+
+    print(f"\n{'Benchmark':<26}{'Metric':<13}{'Baseline':>14}{'Current':>14}{'Change':>10}")
+    print("-" * 77)
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['benchmark']:<26}{row['metric']:<13}"
+              f"{row['baseline']:>14.6g}{row['current']:>14.6g}"
+              f"{row['change']:>+10.1%}{flag}")
+
+    regressions = sum(row["regression"] for row in rows)
+    print(f"\n{regressions} regression(s) in {len(rows)} comparisons")
+
+
+def _latest_result() -> Optional[Path]:
+    results = sorted(RESULTS_DIR.glob("bench_*.json"))
+    return results[-1] if results else None
+
+
+def main():
+    """Main entry point with CLI argument parsing."""
+    parser = argparse.ArgumentParser(
+        description="Offline benchmarks for the scorer, survey agent and pipeline"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run benchmarks and save the results")
+    run_parser.add_argument(
+        "--suite",
+        "-s",
+        action="append",
+        choices=SUITES,
+        default=None,
+        help="Suite to run; repeat for several (default: all)",
+    )
+    run_parser.add_argument(
+        "--repeats",
+        "-r",
+        type=int,
+        default=3,
+        help="Timed repetitions per case (default: 3)",
+    )
+    run_parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="One repetition per case",
+    )
+    run_parser.add_argument(
+        "--mock-latency-ms",
+        type=float,
+        default=DEFAULT_MOCK_LATENCY_MS,
+        help=f"Mock LLM time to first token (default: {DEFAULT_MOCK_LATENCY_MS})",
+    )
+    run_parser.add_argument(
+        "--mock-token-latency-ms",
+        type=float,
+        default=DEFAULT_MOCK_TOKEN_LATENCY_MS,
+        help=f"Mock LLM time per token (default: {DEFAULT_MOCK_TOKEN_LATENCY_MS})",
+    )
+    run_parser.add_argument(
+        "--output",
+        "-o",
+        type=Path,
+        default=None,
+        help="Result file (default: results/bench_<timestamp>.json)",
+    )
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Compare results against a baseline")
+    compare_parser.add_argument("baseline", type=Path, help="Baseline result file")
+    compare_parser.add_argument(
+        "current",
+        type=Path,
+        nargs="?",
+        default=None,
+        help="Result file to check (default: latest in results/)",
+    )
+    compare_parser.add_argument(
+        "--time-threshold",
+        type=float,
+        default=DEFAULT_TIME_THRESHOLD,
+        help=f"Relative slowdown flagged as a regression (default: {DEFAULT_TIME_THRESHOLD})",
+    )
+    compare_parser.add_argument(
+        "--memory-threshold",
+        type=float,
+        default=DEFAULT_MEMORY_THRESHOLD,
+        help=f"Relative memory growth flagged as a regression "
+        f"(default: {DEFAULT_MEMORY_THRESHOLD})",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run_benchmarks(
+            suites=tuple(args.suite or SUITES),
+            repeats=1 if args.quick else args.repeats,
+            mock_latency_ms=args.mock_latency_ms,
+            mock_token_latency_ms=args.mock_token_latency_ms,
+        )
+        output = args.output or (
+            RESULTS_DIR / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2))
+        print(f"\nResults saved to: {output}")
+        return
+
+    current_path = args.current or _latest_result()
+    if current_path is None:
+        print("Error: no result file to compare", file=sys.stderr)
+        sys.exit(2)
+
+    baseline = json.loads(args.baseline.read_text())
+    current = json.loads(current_path.read_text())
+    print(f"Baseline: {args.baseline}\nCurrent:  {current_path}")
+
+    rows = compare_results(baseline, current, args.time_threshold, args.memory_threshold)
+    print_comparison(rows, baseline, current)
+    if any(row["regression"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
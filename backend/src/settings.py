@@ -4,8 +4,8 @@ from datetime import datetime
 from enum import Enum
 from functools import lru_cache
 from pathlib import Path
+from typing import Any, cast
 
-import requests
 from pydantic import BaseModel, computed_field
 from pydantic_settings import BaseSettings
 
@@ -32,6 +32,8 @@ class PostgreSQLSettings(BaseModel):
 class DatabaseSettings(BaseModel):
     type: str = "sqlite"
     url: str = "sqlite:///./personamirror.db"
+    pool_size: int = 5
+    write_batch_size: int = 500
 
 
 class OpenRouterSettings(BaseModel):
@@ -41,12 +43,51 @@ class OpenRouterSettings(BaseModel):
     embedding_model_name: str = "openai/text-embedding-3-small"
 
 
+class HttpSettings(BaseModel):
+    max_connections: int = 100
+    max_keepalive_connections: int = 50
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 10.0
+    http2: bool = True
+
+
+class BackendSettings(BaseModel):
+    name: str = "openrouter"
+    mock_latency_ms: float = 300.0
+    mock_latency_sigma: float = 0.5
+    mock_token_latency_ms: float = 20.0
+    mock_preamble: str = ""
+    mock_rate_limit_rate: float = 0.0
+    mock_timeout_rate: float = 0.0
+    mock_seed: int = 0
+
+
+class SchedulerSettings(BaseModel):
+    requests_per_minute: int = 600
+    tokens_per_minute: int = 400_000
+    request_timeout: float = 60.0
+    max_retries: int = 6
+    backoff_base: float = 1.0
+    backoff_max: float = 60.0
+    breaker_threshold: int = 10
+    breaker_cooldown: float = 30.0
+
+
+class CacheSettings(BaseModel):
+    enabled: bool = True
+    path: Path = Path.cwd() / "cache" / "llm_responses.sqlite3"
+    max_entries: int = 200_000
+    max_age_days: float = 30.0
+
+
 class LoggingSettings(BaseModel):
     logs_dir: Path = Path.cwd() / "logs"
     log_format: str = (
         "%(asctime)s | " "%(name)s | " "%(levelname)s | " "%(pathname)s:%(funcName)s:%(lineno)d | " "%(message)s"
     )
     log_level: str = "DEBUG"
+    use_queue: bool = True
+    json_format: bool = False
     run_timestamp: str = datetime.now().strftime("%Y%m%d_%H%M%S")
 
 
@@ -62,6 +103,10 @@ class Settings(BaseSettings):
     database: DatabaseSettings = DatabaseSettings()
     postgresql: PostgreSQLSettings = PostgreSQLSettings()
     openrouter: OpenRouterSettings
+    backend: BackendSettings = BackendSettings()
+    http: HttpSettings = HttpSettings()
+    scheduler: SchedulerSettings = SchedulerSettings()
+    cache: CacheSettings = CacheSettings()
     log: LoggingSettings = LoggingSettings()
 
     @computed_field
@@ -73,11 +118,40 @@ class Settings(BaseSettings):
         return self.database.url
 
 
+class _LoggingOnlySettings(BaseSettings):
+    """The log section on its own, loadable without any credentials."""
+
+    class Config:
+        env_file = os.getenv("ENV_FILE", ".env")
+        env_file_encoding = "utf-8"
+        env_nested_delimiter = "__"
+        extra = "ignore"
+
+    log: LoggingSettings = LoggingSettings()
+
+
 @lru_cache()
 def get_settings() -> Settings:
     """Get singleton settings instance."""
     return Settings()
 
 
-# Singleton instance
-app_settings = get_settings()
+@lru_cache()
+def get_logging_settings() -> LoggingSettings:
+    """Get the logging settings without requiring secret_key or API keys."""
+    return _LoggingOnlySettings().log
+
+
+class _LazySettings:
+    """Stand-in for the settings singleton that builds it on first access."""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
+    def __repr__(self) -> str:
+        return repr(get_settings())
+
+
+# Singleton instance, resolved lazily so importing modules never reads .env
+# or requires credentials until a setting is actually used
+app_settings = cast(Settings, _LazySettings())
@@ -1,81 +1,155 @@
+import atexit
+import copy
+import json
 import logging
 import os
+import queue
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import Optional
 
-from src.settings import app_settings
+from src.settings import get_logging_settings
 
+# Attributes every LogRecord has; anything else was passed via ``extra``
+_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__) | {"message", "asctime"}
 
-class ExtraFormatter(logging.Formatter):
-    """Custom formatter that includes extra fields in log output."""
+_exc_formatter = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatter that writes one JSON object per record, including extra fields."""
 
     def format(self, record):
-        # Get the standard formatted message
-        msg = super().format(record)
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "location": f"{record.pathname}:{record.funcName}:{record.lineno}",
+        }
 
         # Add extra fields if they exist
-        extra_fields = []
         for key, value in record.__dict__.items():
-            # Skip standard logging fields
-            if key not in [
-                "name",
-                "msg",
-                "args",
-                "levelname",
-                "levelno",
-                "pathname",
-                "filename",
-                "module",
-                "lineno",
-                "funcName",
-                "created",
-                "msecs",
-                "relativeCreated",
-                "thread",
-                "threadName",
-                "processName",
-                "process",
-                "message",
-                "exc_info",
-                "exc_text",
-                "stack_info",
-                "asctime",
-            ]:
-                extra_fields.append(f"{key}={value}")
-
-        if extra_fields:
-            msg += f" | EXTRA: {', '.join(extra_fields)}"
-
-        return msg
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(QueueHandler):
+    """
+    QueueHandler that keeps exception details for the listener's formatter
+    and falls back to writing directly in forked child processes, where the
+    parent's listener thread does not run.
+    """
+
+    def prepare(self, record):
+        # Merge args and render the traceback now, since neither is safe to
+        # pickle or defer, but leave the layout to the listener's formatter
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        if os.getpid() != _owner_pid:
+            for handler in _handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+            return
+        super().emit(record)
+
+
+# Process-wide handlers, shared by every module logger
+_handlers: list[logging.Handler] = []
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+_owner_pid: Optional[int] = None
+_setup_lock = threading.Lock()
+
+
+def _build_handlers() -> list[logging.Handler]:
+    """Create the file and console handlers from settings."""
+    settings = get_logging_settings()
+    logs_dir = settings.logs_dir
+    os.makedirs(logs_dir, exist_ok=True)
 
+    log_filename = f"log_{settings.run_timestamp}.log"
+    file_handler = logging.FileHandler(logs_dir / log_filename)
+    stream_handler = logging.StreamHandler()
 
-def get_logger(logger_name: str, logs_dir: Path = None):
+    if settings.json_format:
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(fmt=settings.log_format, datefmt="%Y-%m-%d %H:%M:%S")
 
-    logs_dir = app_settings.log.logs_dir
+    for handler in (file_handler, stream_handler):
+        handler.setLevel(settings.log_level)
+        handler.setFormatter(formatter)
 
-    log_filename = f"log_{app_settings.log.run_timestamp}.log"
-    logs_output_fp = logs_dir / log_filename
+    return [file_handler, stream_handler]
 
-    logger = logging.getLogger(logger_name)
 
-    # Avoid adding handlers multiple times
-    if logger.handlers:
-        return logger
+def _setup_handlers() -> list[logging.Handler]:
+    """
+    Create the shared handlers once per process.
 
-    logger.setLevel(app_settings.log.log_level)
+    With ``log.use_queue`` the file and console handlers run on a background
+    QueueListener thread and module loggers only enqueue records, so log I/O
+    never blocks request or scoring threads.
+    """
+    global _queue_handler, _listener, _owner_pid
 
-    os.makedirs(logs_dir, exist_ok=True)
+    with _setup_lock:
+        if _handlers:
+            return [_queue_handler] if _queue_handler is not None else _handlers
 
-    file_handler = logging.FileHandler(logs_output_fp)
-    file_handler.setLevel(app_settings.log.log_level)
+        _handlers.extend(_build_handlers())
+        if not get_logging_settings().use_queue:
+            return _handlers
 
-    stream_handler = logging.StreamHandler()
-    stream_handler.setLevel(app_settings.log.log_level)
+        _owner_pid = os.getpid()
+        log_queue = queue.SimpleQueue()
+        _queue_handler = _QueueHandler(log_queue)
+        # Drop records no handler wants before they are copied and enqueued
+        _queue_handler.setLevel(min(handler.level for handler in _handlers))
+        _listener = QueueListener(log_queue, *_handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+        return [_queue_handler]
+
+
+def stop_logging() -> None:
+    """Drain queued records and stop the background listener thread."""
+    global _listener
+    if _listener is not None and os.getpid() == _owner_pid:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(logger_name: str, logs_dir: Path = None):
+
+    logger = logging.getLogger(logger_name)
+
+    # Avoid adding handlers multiple times
+    if logger.handlers:
+        return logger
 
-    formatter = logging.Formatter(fmt=app_settings.log.log_format, datefmt="%Y-%m-%d %H:%M:%S")
-    file_handler.setFormatter(formatter)
-    stream_handler.setFormatter(formatter)
+    logger.setLevel(get_logging_settings().log_level)
 
-    logger.addHandler(file_handler)
-    logger.addHandler(stream_handler)
+    for handler in _setup_handlers():
+        logger.addHandler(handler)
 
     return logger
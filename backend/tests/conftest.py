@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Settings need a secret key and a writable log folder; tests never call a
+# live endpoint, so placeholders are enough
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("OPENROUTER__API_KEY", "test")
+os.environ.setdefault("LOG__LOGS_DIR", tempfile.mkdtemp(prefix="personamirror-logs-"))
+os.environ.setdefault("LOG__LOG_LEVEL", "WARNING")
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
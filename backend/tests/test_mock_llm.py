@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from scripts.agent_pretest.llm_backends import get_mock_llm
+from scripts.agent_pretest.persona_agent import PersonaAgent
+
+PERSONA = "neutral_control"
+N_QUESTIONS = 20
+
+
+@pytest.fixture(autouse=True)
+def fast_mock():
+    llm = get_mock_llm()
+    saved = llm.latency_ms, llm.token_latency_ms, llm.rate_limit_rate, llm.timeout_rate
+    llm.latency_ms = llm.token_latency_ms = 0.0
+    llm.rate_limit_rate = llm.timeout_rate = 0.0
+    yield
+    llm.latency_ms, llm.token_latency_ms, llm.rate_limit_rate, llm.timeout_rate = saved
+
+
+def _answers(replicate: int) -> list[int]:
+    agent = PersonaAgent(PERSONA, replicate=replicate, use_cache=False, backend="mock")
+    return [agent.answer_question(question) for question in agent.questions[:N_QUESTIONS]]
+
+
+def test_replicate_answers_do_not_depend_on_order():
+    forward = {replicate: _answers(replicate) for replicate in (0, 1)}
+    backward = {replicate: _answers(replicate) for replicate in (1, 0)}
+
+    assert forward == backward
+    assert forward[0] != forward[1]
+
+
+def test_concurrent_replicates_are_deterministic():
+    async def run(order):
+        agents = {
+            replicate: PersonaAgent(
+                PERSONA, replicate=replicate, use_cache=False, backend="mock")
+            for replicate in order
+        }
+        questions = agents[0].questions[:N_QUESTIONS]
+        results = await asyncio.gather(*(
+            asyncio.gather(*(agent.answer_question_async(q) for q in questions))
+            for agent in agents.values()
+        ))
+        return dict(zip(agents, results))
+
+    assert asyncio.run(run((0, 1))) == asyncio.run(run((1, 0)))
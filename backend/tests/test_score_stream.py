@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from scripts.analysis.bfi2_scorer import BFI2Scorer
+from scripts.analysis.score_stream import score_stream
+
+
+def _record(run_id: str, answer: int) -> str:
+    return json.dumps({
+        "run_id": run_id,
+        "persona": "neutral_control",
+        "responses": {str(item): answer for item in range(1, 61)},
+    })
+
+
+@pytest.mark.parametrize("bad_line", [
+    json.dumps({"run_id": "bad", "responses": {"abc": 3}}),
+    json.dumps({"run_id": "bad", "responses": {"1": "n/a"}}),
+    json.dumps({"run_id": "bad", "responses": {"1": 9}}),
+    json.dumps({"run_id": "bad", "responses": [3, 3, 3]}),
+    "{not json",
+])
+def test_malformed_record_is_skipped(bad_line):
+    lines = [_record("first", 2), bad_line, _record("last", 4)]
+
+    scored = list(score_stream(lines, chunk_size=2))
+
+    assert [record["run_id"] for record in scored] == ["first", "last"]
+    expected = BFI2Scorer().score({item: 4 for item in range(1, 61)})
+    assert scored[1]["summary"] == pytest.approx(expected.summary)